@@ -9,9 +9,12 @@ Main FastAPI application with production features:
 """
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
 import os
+import json
+import asyncio
+import threading
 import time
 from datetime import datetime
 from dotenv import load_dotenv
@@ -19,61 +22,107 @@ from dotenv import load_dotenv
 from .models import (
     AddCompanyRequest, AddCompanyResponse,
     AddMultipleRequest, QuestionRequest, QuestionResponse,
+    QueryOptions, BatchQuestionRequest, BatchQuestionResponse, BatchAnswer,
+    ScreenRequest, ScreenResponse, ScreenResult,
     StatsResponse, ErrorResponse
 )
-from src.pipeline import RAGPipeline
+from src.config.settings import settings
+from src.jobs.ingest_queue import IngestJobQueue
 
 # Load environment
 load_dotenv()
 
 # Global variables
 pipeline = None
+ingest_queue = None
 request_count = 0  # Track API usage
+startup = {"state": "starting", "error": None, "started_at": time.time(), "ready_in": None}
 
 
 # ============================================================
 # STARTUP & SHUTDOWN (Lifecycle Management)
 # ============================================================
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+def start_pipeline():
     """
-    What happens when API starts and stops
+    Build the pipeline, load the vector store and warm up the models
     
-    Startup: Initialize pipeline, load data
-    Shutdown: Clean up resources
+    The heavy libraries (torch, FAISS, yfinance, google-genai) are first
+    imported here, not when the app module loads, so with STARTUP_MODE=background
+    /health answers at once and /ready turns 200 when this finishes.
     """
-    global pipeline
-    
-    # STARTUP
-    print("\n" + "="*70)
-    print("🚀 STARTING QUANT RAG ASSISTANT API")
-    print("="*70)
+    global pipeline, ingest_queue
     
     try:
-        # Initialize pipeline
-        print("Initializing RAG pipeline...")
-        pipeline = RAGPipeline(store_name="indian_stocks")
+        from src.pipeline import RAGPipeline
+        
+        # Initialize pipeline (reader workers serve the published snapshot read-only)
+        startup["state"] = "loading"
+        read_only = settings.SERVE_MODE == "reader"
+        print(f"Initializing RAG pipeline ({settings.SERVE_MODE} mode)...")
+        new_pipeline = RAGPipeline(store_name="indian_stocks", read_only=read_only)
         
         # Try to load existing vector store
         try:
-            pipeline.load_vectorstore()
-            print(f"✓ Loaded existing vector store ({pipeline.vector_manager.get_count()} chunks)")
+            new_pipeline.load_vectorstore()
+            print(f"✓ Loaded existing vector store ({new_pipeline.vector_manager.get_count()} chunks)")
         except Exception as e:
             print("⚠ No existing vector store (will create on first ingest)")
         
-        print("✓ API Ready!")
-        print("="*70 + "\n")
+        if read_only:
+            # Pick up snapshots published by the writer process
+            new_pipeline.watch_snapshots()
+        else:
+            # Background ingestion workers
+            ingest_queue = IngestJobQueue(new_pipeline)
+        pipeline = new_pipeline
+        
+        # Otherwise the first question loads the embedding model
+        if settings.WARMUP_MODELS:
+            startup["state"] = "warming"
+            pipeline.warmup()
+        
+        startup["ready_in"] = round(time.time() - startup["started_at"], 2)
+        startup["state"] = "ready"
+        print(f"✓ API Ready! ({startup['ready_in']}s)")
         
     except Exception as e:
+        startup["error"] = str(e)
+        startup["state"] = "failed"
         print(f"❌ FAILED TO START: {e}")
         raise
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    What happens when API starts and stops
+    
+    Startup: Initialize pipeline, load data (in a background thread unless
+    STARTUP_MODE=blocking)
+    Shutdown: Clean up resources
+    """
+    # STARTUP
+    print("\n" + "="*70)
+    print("🚀 STARTING QUANT RAG ASSISTANT API")
+    print("="*70)
+    
+    if settings.STARTUP_MODE == "blocking":
+        start_pipeline()
+    else:
+        threading.Thread(target=start_pipeline, name="api-startup", daemon=True).start()
+        print("✓ Accepting requests (pipeline loading in background, see /ready)")
+    print("="*70 + "\n")
     
     yield  # API runs here
     
     # SHUTDOWN
     print("\n" + "="*70)
     print("Shutting down API...")
+    if ingest_queue is not None:
+        ingest_queue.shutdown(wait=True)
+    if pipeline is not None:
+        pipeline.close()
     print(f"Total requests served: {request_count}")
     print("="*70)
 
@@ -156,16 +205,43 @@ def root():
 @app.get("/health", tags=["Health"])
 def health_check():
     """
-    Health check - Is API alive?
+    Health check - Is API alive? (liveness; see /ready for readiness)
     """
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
+        "startup": startup["state"],
         "pipeline_loaded": pipeline is not None,
-        "vectorstore_loaded": pipeline.vector_manager.vectorstore is not None if pipeline else False
+        "vectorstore_loaded": pipeline.vector_manager.vectorstore is not None if pipeline else False,
+        "mode": settings.SERVE_MODE,
+        "snapshot_version": pipeline.vector_manager.loaded_version if pipeline else 0
     }
 
 
+@app.get("/ready", tags=["Health"])
+def readiness_check():
+    """
+    Readiness check - Can this worker answer questions yet?
+    
+    503 while the pipeline is loading or warming up (or failed to start),
+    200 once the vector store is loaded and the models are warm
+    """
+    ready = startup["state"] == "ready"
+    content = {
+        "ready": ready,
+        "state": startup["state"],
+        "error": startup["error"],
+        "ready_in": startup["ready_in"],
+        "mode": settings.SERVE_MODE,
+        "vectorstore_loaded": pipeline.vector_manager.vectorstore is not None if pipeline else False,
+        "snapshot_version": pipeline.vector_manager.loaded_version if pipeline else 0
+    }
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=content
+    )
+
+
 @app.get("/stats", response_model=StatsResponse, tags=["Info"])
 def get_statistics():
     """
@@ -175,7 +251,7 @@ def get_statistics():
     if pipeline is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Pipeline not initialized"
+            detail=f"Pipeline not initialized ({startup['state']})"
         )
     
     stats = pipeline.get_stats()
@@ -212,7 +288,7 @@ def list_companies():
 # ============================================================
 
 @app.post("/ingest/single", response_model=AddCompanyResponse, tags=["Ingestion"])
-def add_single_company(request: AddCompanyRequest):
+async def add_single_company(request: AddCompanyRequest):
     """
     Add a single company to the system
     
@@ -223,33 +299,35 @@ def add_single_company(request: AddCompanyRequest):
     4. Generate embeddings
     5. Store in vector database
     
+    Runs through the ingestion queue and waits for it to finish.
     Takes ~30 seconds per company
     """
-    if pipeline is None:
+    require_writer()
+    if pipeline is None or ingest_queue is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Pipeline not initialized"
+            detail=f"Pipeline not initialized ({startup['state']})"
         )
     
     try:
         print(f"\n📊 Adding {request.ticker}...")
         
-        # Ingest the stock
-        success = pipeline.ingest_stock(request.ticker, save_doc=True)
+        # Ingest the stock (collapsed with any in-flight request for it)
+        job = ingest_queue.submit([request.ticker])
+        # Block a worker thread, not the event loop, until the job finishes
+        await asyncio.get_running_loop().run_in_executor(None, job.wait)
         
-        if not success:
+        task = next(iter(job.tasks.values()))
+        if task.status != "success":
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to fetch data for {request.ticker}"
+                detail=task.error or f"Failed to fetch data for {request.ticker}"
             )
         
-        # Save vector store
-        pipeline.save_vectorstore()
-        
         return AddCompanyResponse(
             success=True,
-            ticker=request.ticker,
-            message=f"Successfully added {request.ticker}",
+            ticker=task.ticker,
+            message=f"Successfully added {task.ticker}",
             total_companies=len(list_company_files())
         )
     
@@ -262,41 +340,94 @@ def add_single_company(request: AddCompanyRequest):
         )
 
 
-@app.post("/ingest/multiple", tags=["Ingestion"])
+@app.post("/ingest/multiple", status_code=status.HTTP_202_ACCEPTED, tags=["Ingestion"])
 def add_multiple_companies(request: AddMultipleRequest):
     """
     Add multiple companies at once
     
-    More efficient than adding one-by-one
-    Returns success/failure for each ticker
+    Returns immediately with a job id; poll /jobs/{job_id} for
+    per-ticker status and timings
     """
-    if pipeline is None:
+    require_writer()
+    if ingest_queue is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Pipeline not initialized"
+            detail=f"Pipeline not initialized ({startup['state']})"
         )
     
     try:
-        print(f"\n📊 Adding {len(request.tickers)} companies...")
-        
-        results = pipeline.ingest_multiple_stocks(request.tickers)
-        
-        # Save after all ingestions
-        pipeline.save_vectorstore()
-        
-        return {
-            "success_count": len(results['success']),
-            "failed_count": len(results['failed']),
-            "successful": results['success'],
-            "failed": results['failed'],
-            "total_companies": len(list_company_files())
-        }
+        print(f"\n📊 Queueing {len(request.tickers)} companies...")
+        job = ingest_queue.submit(request.tickers)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "tickers": list(job.tasks),
+        "status_url": f"/jobs/{job.job_id}"
+    }
+
+
+@app.get("/jobs/{job_id}", tags=["Ingestion"])
+def get_job(job_id: str):
+    """
+    Ingestion job progress
+    Shows per-ticker status and timings
+    """
+    job = ingest_queue.get(job_id) if ingest_queue else None
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    
+    result = job.to_dict()
+    result["total_companies"] = len(list_company_files())
+    return result
+
+
+@app.delete("/companies/{ticker}", tags=["Ingestion"])
+def delete_company(ticker: str):
+    """
+    Remove a company from the system
+    
+    Deletes its chunks (the index is compacted), its report file
+    and any cached answers that used it
+    """
+    require_writer()
+    if pipeline is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Pipeline not initialized ({startup['state']})"
+        )
     
+    ticker = ticker.strip().upper()
+    if not pipeline.delete_stock(ticker):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{ticker} is not in the system"
+        )
+    
+    try:
+        if pipeline.vector_manager.vectorstore is not None:
+            pipeline.save_vectorstore()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error: {str(e)}"
         )
+    
+    return {
+        "success": True,
+        "ticker": ticker,
+        "message": f"Removed {ticker}",
+        "total_companies": len(list_company_files()),
+        "total_chunks": pipeline.vector_manager.get_count()
+    }
 
 
 # ============================================================
@@ -304,7 +435,7 @@ def add_multiple_companies(request: AddMultipleRequest):
 # ============================================================
 
 @app.post("/ask", response_model=QuestionResponse, tags=["Query"])
-def ask_question(request: QuestionRequest):
+async def ask_question(request: QuestionRequest):
     """
     Ask a question about your companies
     
@@ -314,23 +445,18 @@ def ask_question(request: QuestionRequest):
     3. Generate answer with citations
     4. Return answer + confidence score
     
-    Takes ~3-5 seconds
+    Takes ~3-5 seconds. Runs on the event loop: embedding/FAISS work goes
+    to the pipeline's query executor and the LLM call is awaited, so many
+    questions can be in flight on one worker.
     """
     if pipeline is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Pipeline not initialized"
+            detail=f"Pipeline not initialized ({startup['state']})"
         )
     
-    # Check if we have data
-    if pipeline.vector_manager.vectorstore is None:
-        try:
-            pipeline.load_vectorstore()
-        except:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No companies in system. Please add companies first using /ingest/single"
-            )
+    # Check if we have data (loaded at startup; ingestion swaps new versions in)
+    require_vectorstore()
     
     try:
         print(f"\n❓ Question: {request.question}")
@@ -338,9 +464,13 @@ def ask_question(request: QuestionRequest):
         start_time = time.time()
         
         # Query the pipeline
-        result = pipeline.query(
+        result = await pipeline.aquery(
             question=request.question,
-            k=request.num_results
+            k=request.num_results,
+            nprobe=request.nprobe,
+            ef_search=request.ef_search,
+            search_filter=request_filter(request),
+            detect_tickers=request.detect_tickers
         )
         
         response_time = time.time() - start_time
@@ -350,6 +480,10 @@ def ask_question(request: QuestionRequest):
             answer=result['answer'],
             sources=result['sources'],
             confidence=round(result['confidence'], 2),
+            num_docs=result.get('num_docs', 0),
+            cached=result.get('cached', False),
+            route=result.get('route', 'rag'),
+            context=result.get('context'),
             response_time=round(response_time, 2)
         )
     
@@ -360,10 +494,199 @@ def ask_question(request: QuestionRequest):
         )
 
 
+@app.post("/ask/stream", tags=["Query"])
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Ask a question and stream the answer (Server-Sent Events)
+    
+    Events:
+    - meta: sources, confidence, num_docs, cached (for the chunks in the prompt, sent before the first token)
+    - token: {"text": ...} for each piece of the answer
+    - done: {"answer": ..., "response_time": ...}
+    - error: {"detail": ...}
+    """
+    if pipeline is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Pipeline not initialized ({startup['state']})"
+        )
+    
+    require_vectorstore()
+    
+    print(f"\n❓ Question (stream): {request.question}")
+    
+    async def event_stream():
+        start_time = time.time()
+        try:
+            async for event in pipeline.aquery_stream(
+                request.question, k=request.num_results, nprobe=request.nprobe, ef_search=request.ef_search,
+                search_filter=request_filter(request), detect_tickers=request.detect_tickers
+            ):
+                data = event['data']
+                if event['event'] == 'done':
+                    data = {**data, 'response_time': round(time.time() - start_time, 2)}
+                yield format_sse(event['event'], data)
+        except Exception as e:
+            yield format_sse('error', {'detail': f"Error processing query: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/ask/batch", response_model=BatchQuestionResponse, tags=["Query"])
+async def ask_questions_batch(request: BatchQuestionRequest):
+    """
+    Ask many questions in one call
+    
+    All questions are embedded in one batch and searched with one FAISS
+    matrix search; answers are then generated concurrently (at most
+    max_concurrency LLM calls at a time). A failed question gets an
+    `error` instead of failing the whole batch.
+    """
+    if pipeline is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Pipeline not initialized ({startup['state']})"
+        )
+    
+    if len(request.questions) > settings.BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_QUESTIONS} questions per batch"
+        )
+    
+    require_vectorstore()
+    
+    try:
+        print(f"\n❓ Batch: {len(request.questions)} questions")
+        
+        start_time = time.time()
+        batch = await pipeline.aquery_batch(
+            request.questions,
+            k=request.num_results,
+            nprobe=request.nprobe,
+            ef_search=request.ef_search,
+            search_filter=request_filter(request),
+            detect_tickers=request.detect_tickers,
+            max_concurrency=request.max_concurrency
+        )
+        
+        results = [
+            BatchAnswer(
+                question=result['question'],
+                answer=result['answer'],
+                sources=result['sources'],
+                confidence=round(result['confidence'], 2),
+                num_docs=result.get('num_docs', 0),
+                cached=result.get('cached', False),
+                response_time=result['response_time'],
+                error=result.get('error')
+            )
+            for result in batch['results']
+        ]
+        
+        return BatchQuestionResponse(
+            results=results,
+            count=len(results),
+            failed=sum(1 for result in results if result.error),
+            retrieval_time=batch['timings']['retrieval'],
+            response_time=round(time.time() - start_time, 2)
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing batch: {str(e)}"
+        )
+
+
+@app.post("/screen", response_model=ScreenResponse, tags=["Query"])
+def screen_companies(request: ScreenRequest):
+    """
+    Filter and rank ingested companies on their latest metrics
+    
+    Example: where "roe > 20% and d/e < 1", sort_by "pe". Conditions
+    and sorting are evaluated over whole metric columns at once, no LLM
+    involved. Companies missing a metric fail conditions on it.
+    """
+    if pipeline is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Pipeline not initialized ({startup['state']})"
+        )
+    
+    from src.vectorstore.vector_manager import SearchFilter
+    
+    try:
+        result = pipeline.screen(
+            request.where,
+            sort_by=request.sort_by,
+            limit=request.limit,
+            columns=request.columns,
+            search_filter=SearchFilter(
+                tickers=request.tickers,
+                sectors=request.sectors,
+                industries=request.industries
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return ScreenResponse(
+        results=[ScreenResult(**row) for row in result['results']],
+        matched=result['matched'],
+        total=result['total'],
+        fields=result['fields'],
+        response_time=result['response_time']
+    )
+
+
 # ============================================================
 # UTILITY FUNCTIONS
 # ============================================================
 
+def require_vectorstore():
+    """Helper: 400 until a vector store version has been published"""
+    if pipeline.vector_manager.vectorstore is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No companies in system. Please add companies first using /ingest/single"
+        )
+
+
+def require_writer():
+    """Helper: Reject writes on read-only (reader) workers"""
+    if settings.SERVE_MODE == "reader":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="This worker is read-only (SERVE_MODE=reader); send ingestion to the writer process"
+        )
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Helper: Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def request_filter(request: QueryOptions):
+    """Helper: Metadata filter from a question request"""
+    from src.vectorstore.vector_manager import SearchFilter
+    
+    return SearchFilter(
+        tickers=request.tickers,
+        sectors=request.sectors,
+        industries=request.industries,
+        report_date_from=request.report_date_from,
+        report_date_to=request.report_date_to
+    )
+
+
 def list_company_files():
     """Helper: List all company files"""
     from pathlib import Path
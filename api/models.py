@@ -4,7 +4,7 @@ Data models - These define what requests/responses look like
 Think of it like a form: "Name must be text, Age must be number"
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 # ============================================================
@@ -32,10 +32,22 @@ class AddMultipleRequest(BaseModel):
         }
 
 
-class QuestionRequest(BaseModel):
+class QueryOptions(BaseModel):
+    """Retrieval options shared by single and batch questions"""
+    num_results: int = Field(3, description="How many sources to use (1-10)")
+    nprobe: Optional[int] = Field(None, description="IVF lists to probe (recall vs speed)")
+    ef_search: Optional[int] = Field(None, description="HNSW search depth (recall vs speed)")
+    tickers: Optional[List[str]] = Field(None, description="Only search these companies")
+    sectors: Optional[List[str]] = Field(None, description="Only search companies in these sectors")
+    industries: Optional[List[str]] = Field(None, description="Only search companies in these industries")
+    report_date_from: Optional[str] = Field(None, description="Only reports on/after this date (YYYY-MM-DD)")
+    report_date_to: Optional[str] = Field(None, description="Only reports on/before this date (YYYY-MM-DD)")
+    detect_tickers: bool = Field(True, description="Restrict to companies named in the question when no filter is given")
+
+
+class QuestionRequest(QueryOptions):
     """When user asks a question"""
     question: str = Field(..., description="Your question")
-    num_results: int = Field(3, description="How many sources to use (1-10)")
     
     class Config:
         json_schema_extra = {
@@ -46,6 +58,40 @@ class QuestionRequest(BaseModel):
         }
 
 
+class BatchQuestionRequest(QueryOptions):
+    """When a job asks many questions at once"""
+    questions: List[str] = Field(..., min_length=1, description="Your questions")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="LLM calls in flight (default from settings)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": ["What is TCS's revenue?", "What is Infosys's profit margin?"],
+                "num_results": 3
+            }
+        }
+
+
+class ScreenRequest(BaseModel):
+    """When user wants to filter and rank companies on their metrics"""
+    where: str = Field("", description="Conditions like 'roe > 20% and debt_to_equity < 1' (and/or, %, cr)")
+    sort_by: Optional[str] = Field(None, description="Field to sort by; '-field' or 'field desc' for descending")
+    limit: int = Field(20, ge=1, le=1000, description="How many companies to return")
+    columns: Optional[List[str]] = Field(None, description="Extra fields to include in each result")
+    tickers: Optional[List[str]] = Field(None, description="Only screen these companies")
+    sectors: Optional[List[str]] = Field(None, description="Only screen companies in these sectors")
+    industries: Optional[List[str]] = Field(None, description="Only screen companies in these industries")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "where": "roe > 20% and debt_to_equity < 1",
+                "sort_by": "pe",
+                "limit": 10
+            }
+        }
+
+
 # ============================================================
 # RESPONSE MODELS (What API sends back to user)
 # ============================================================
@@ -64,9 +110,44 @@ class QuestionResponse(BaseModel):
     answer: str
     sources: List[str]
     confidence: float
+    num_docs: int = 0
+    cached: bool = False  # Served from the answer cache
+    route: str = "rag"  # rag | metrics (answered from the metrics table)
+    context: Optional[Dict[str, int]] = None  # Prompt token accounting (tokens, raw_tokens, chunks, budget...)
     response_time: float  # How long it took
 
 
+class BatchAnswer(QuestionResponse):
+    """One answer inside a batch response"""
+    error: Optional[str] = None
+
+
+class BatchQuestionResponse(BaseModel):
+    """Response with answers to a batch of questions"""
+    results: List[BatchAnswer]
+    count: int
+    failed: int
+    retrieval_time: float  # One embedding batch + matrix search for all questions
+    response_time: float
+
+
+class ScreenResult(BaseModel):
+    """One company that passed the screen"""
+    ticker: str
+    company: str
+    sector: Optional[str] = None
+    values: Dict[str, Optional[float]]  # Fields used in the screen (+ requested columns)
+
+
+class ScreenResponse(BaseModel):
+    """Response with the companies that passed a screen"""
+    results: List[ScreenResult]
+    matched: int  # Before the limit
+    total: int  # Companies screened
+    fields: List[str]
+    response_time: float
+
+
 class StatsResponse(BaseModel):
     """System statistics"""
     total_companies: int
@@ -0,0 +1,119 @@
+# benchmark_embeddings.py
+"""
+Parity check and benchmark: torch (HuggingFace) vs ONNX embedding backends
+
+Embeds the saved company reports (chunked) and a set of questions with
+each backend, compares the ONNX vectors to torch by cosine similarity and
+reports single-query latency and batch throughput.
+
+Usage:
+    python benchmark_embeddings.py [--model NAME] [--rounds 50]
+
+Exits with 1 if an ONNX variant falls below its parity threshold; the
+parity check alone runs as tests/test_embedding_parity.py.
+"""
+import argparse
+import sys
+import time
+import numpy as np
+
+from src.config.settings import settings
+from src.document_processing.chunkers import TextChunker
+from src.embeddings.onnx_embeddings import OnnxEmbeddings
+
+# Minimum cosine similarity to the torch vector, per text
+PARITY = {'onnx-fp32': 0.999, 'onnx-int8': 0.98}
+
+QUESTIONS = [
+    "What is TCS revenue?",
+    "Compare the profit margins of HDFC Bank and TCS",
+    "Which company has the highest P/E ratio?",
+    "What is the debt to equity ratio of HDFC Bank?",
+    "How did quarterly net income change?",
+    "What sector does TCS operate in?",
+    "Summarize the balance sheet",
+    "What is the market capitalization?",
+]
+
+
+def load_texts() -> list:
+    """Report chunks from data/documents (sample questions if there are none)"""
+    chunker = TextChunker()
+    texts = []
+    for path in sorted(settings.DOCUMENTS_DIR.glob("*_report.txt")):
+        texts.extend(chunk.page_content for chunk in chunker.chunk_text(path.read_text(encoding='utf-8')))
+    return texts or QUESTIONS * 8
+
+
+def bench(embeddings, texts: list, rounds: int) -> dict:
+    """Document vectors plus latency/throughput numbers for one backend"""
+    embeddings.embed_query("warmup")
+    
+    latencies = []
+    for _ in range(rounds):
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            embeddings.embed_query(question)
+            latencies.append((time.perf_counter() - start) * 1000)
+    
+    start = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'vectors': vectors,
+        'questions': np.asarray(embeddings.embed_documents(QUESTIONS), dtype=np.float32),
+        'p50': np.percentile(latencies, 50),
+        'p95': np.percentile(latencies, 95),
+        'throughput': len(texts) / elapsed
+    }
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity"""
+    return (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare torch and ONNX embedding backends")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL, help="Model name (default: EMBEDDING_MODEL)")
+    parser.add_argument("--rounds", type=int, default=50, help="Passes over the questions for latency")
+    args = parser.parse_args()
+    
+    from langchain_huggingface import HuggingFaceEmbeddings
+    
+    texts = load_texts()
+    print(f"Benchmarking {args.model} on {len(texts)} chunks, {len(QUESTIONS) * args.rounds} queries\n")
+    
+    backends = {
+        'torch': lambda: HuggingFaceEmbeddings(model_name=args.model, model_kwargs={'device': 'cpu'}),
+        'onnx-fp32': lambda: OnnxEmbeddings(args.model, settings.EMBEDDING_ONNX_DIR, quantize=False),
+        'onnx-int8': lambda: OnnxEmbeddings(args.model, settings.EMBEDDING_ONNX_DIR, quantize=True),
+    }
+    results = {name: bench(make(), texts, args.rounds) for name, make in backends.items()}
+    
+    print("\n" + "="*78)
+    print(f"{'backend':<12}{'p50 ms':>10}{'p95 ms':>10}{'chunks/s':>12}{'min cos':>12}{'mean cos':>12}{'':>10}")
+    print("="*78)
+    
+    failed = False
+    reference = results['torch']
+    for name, result in results.items():
+        line = f"{name:<12}{result['p50']:>10.2f}{result['p95']:>10.2f}{result['throughput']:>12.1f}"
+        if name in PARITY:
+            similarity = np.concatenate([
+                cosine(reference['vectors'], result['vectors']),
+                cosine(reference['questions'], result['questions'])
+            ])
+            ok = similarity.min() >= PARITY[name]
+            failed = failed or not ok
+            line += f"{similarity.min():>12.4f}{similarity.mean():>12.4f}{'✅' if ok else '❌':>10}"
+        print(line)
+    
+    speedup = reference['p50'] / results['onnx-int8']['p50']
+    print(f"\nonnx-int8 query latency: {speedup:.1f}x vs torch")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
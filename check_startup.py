@@ -0,0 +1,72 @@
+# check_startup.py
+"""
+Import-time budget for the API
+
+Imports each module in a fresh interpreter and fails (exit code 1) if it
+takes longer than its budget or pulls in a heavy library that should only
+load on first use. Run before shipping: python check_startup.py
+(tests/test_startup.py runs the same checks under pytest)
+"""
+import json
+import os
+import subprocess
+import sys
+
+BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", 1.5))  # seconds for `import api.main`
+
+# Model/network libraries that must stay lazy
+HEAVY = ["torch", "sentence_transformers", "transformers", "onnxruntime", "langchain_huggingface", "yfinance", "google.genai"]
+
+checks = {
+    # Module: (budget in seconds, modules it must not import)
+    'api.main': (BUDGET, HEAVY + ["src.pipeline", "faiss", "langchain_community"]),
+    'src.pipeline': (BUDGET * 3, HEAVY),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module: str, forbidden: list) -> dict:
+    """Import `module` in a fresh interpreter: seconds taken and which forbidden modules it loaded"""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, forbidden=forbidden)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise ImportError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    print("Checking import times...\n")
+    
+    failed = False
+    for module, (budget, forbidden) in checks.items():
+        try:
+            report = probe(module, forbidden)
+        except ImportError as e:
+            print(f"❌ {module} - import FAILED:\n{e}")
+            failed = True
+            continue
+        
+        elapsed, loaded = report["elapsed"], report["loaded"]
+        if loaded:
+            print(f"❌ {module} - imports {', '.join(loaded)} at startup")
+            failed = True
+        elif elapsed > budget:
+            print(f"❌ {module} - {elapsed:.2f}s (budget {budget:.2f}s)")
+            failed = True
+        else:
+            print(f"✅ {module} - {elapsed:.2f}s (budget {budget:.2f}s)")
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
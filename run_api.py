@@ -7,6 +7,14 @@ import os
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
+    workers = int(os.getenv("API_WORKERS", 1))
+    
+    # Several workers share one memory-mapped index and only answer queries;
+    # ingestion goes to a separate writer: SERVE_MODE=writer PORT=8001 python run_api.py
+    if workers > 1:
+        os.environ.setdefault("SERVE_MODE", "reader")
+        if os.environ["SERVE_MODE"] != "reader":
+            raise SystemExit("API_WORKERS > 1 needs SERVE_MODE=reader (run one writer separately)")
     
     print("\n" + "="*70)
     print("🚀 STARTING QUANT RAG ASSISTANT API")
@@ -14,6 +22,8 @@ if __name__ == "__main__":
     print(f"📍 Server URL:  http://localhost:{port}")
     print(f"📚 API Docs:    http://localhost:{port}/docs")
     print(f"📖 Alt Docs:    http://localhost:{port}/redoc")
+    if workers > 1:
+        print(f"👥 Workers:     {workers} ({os.environ['SERVE_MODE']} mode)")
     print("="*70)
     print("\n💡 Tip: Open /docs in your browser for interactive testing!")
     print("\nPress CTRL+C to stop the server\n")
@@ -22,6 +32,7 @@ if __name__ == "__main__":
         "api.main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,  # Auto-reload on code changes
+        reload=workers == 1,  # Auto-reload on code changes (single process only)
+        workers=workers,
         log_level="info"
     )
\ No newline at end of file
@@ -17,6 +17,7 @@ class Settings:
     DATA_DIR: Path = PROJECT_ROOT / "data"
     DOCUMENTS_DIR: Path = DATA_DIR / "documents"
     VECTORSTORE_DIR: Path = DATA_DIR / "vectorstore"
+    METRICS_DIR: Path = DATA_DIR / "metrics"  # structured metrics table per store
     
     # API Keys
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY")
@@ -26,17 +27,87 @@ class Settings:
     # Embedding settings
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
     EMBEDDING_DEVICE: str = "cpu"
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")  # torch (HuggingFace) | onnx (ONNX Runtime, CPU)
+    EMBEDDING_ONNX_QUANTIZE: bool = os.getenv("EMBEDDING_ONNX_QUANTIZE", "true").lower() == "true"  # int8 dynamic quantization
+    EMBEDDING_ONNX_DIR: Path = DATA_DIR / "models" / "onnx"  # exported models
+    EMBEDDING_ONNX_THREADS: int = int(os.getenv("EMBEDDING_ONNX_THREADS", 0))  # ONNX Runtime intra-op threads, 0 = min(cores, 8)
+    QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", 1024))
+    QUERY_CACHE_TTL: float = float(os.getenv("QUERY_CACHE_TTL", 3600))  # seconds, 0 = never expire
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH: Path = DATA_DIR / "cache" / "embeddings.sqlite"
+    EMBEDDING_MICRO_BATCH: bool = os.getenv("EMBEDDING_MICRO_BATCH", "true").lower() == "true"  # batch concurrent query embeddings
+    EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", 32))  # queries per forward pass
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", 2.0))  # wait for a batch to fill (only under load)
     
     # Chunking settings
     CHUNK_SIZE: int = 800
     CHUNK_OVERLAP: int = 150
     
+    # Market data cache (raw Yahoo Finance results)
+    MARKET_CACHE_ENABLED: bool = os.getenv("MARKET_CACHE_ENABLED", "true").lower() == "true"
+    MARKET_CACHE_DIR: Path = DATA_DIR / "cache" / "market"
+    MARKET_CACHE_TTL: float = float(os.getenv("MARKET_CACHE_TTL", 6 * 3600))  # seconds
+    MARKET_DATA_OFFLINE: bool = os.getenv("MARKET_DATA_OFFLINE", "false").lower() == "true"  # serve only from cache
+    
+    # Ingestion settings
+    FETCH_WORKERS: int = int(os.getenv("FETCH_WORKERS", 8))  # concurrent Yahoo Finance fetches
+    FETCH_RATE_LIMIT: float = float(os.getenv("FETCH_RATE_LIMIT", 2.0))  # fetches per second, 0 = unlimited
+    FETCH_RATE_BURST: int = int(os.getenv("FETCH_RATE_BURST", 4))
+    INGEST_MAX_BATCH: int = int(os.getenv("INGEST_MAX_BATCH", 50))  # tickers per save
+    INGEST_JOB_HISTORY: int = int(os.getenv("INGEST_JOB_HISTORY", 200))  # finished jobs kept for /jobs
+    
+    # Serving
+    SERVE_MODE: str = os.getenv("SERVE_MODE", "single")  # single | writer (ingests, publishes snapshots) | reader (read-only, mmap)
+    API_WORKERS: int = int(os.getenv("API_WORKERS", 1))  # uvicorn worker processes (reader mode when > 1)
+    SNAPSHOT_POLL_INTERVAL: float = float(os.getenv("SNAPSHOT_POLL_INTERVAL", 2.0))  # seconds between reader version checks
+    SNAPSHOT_MAX_STALENESS: float = float(os.getenv("SNAPSHOT_MAX_STALENESS", 30.0))  # writer: seconds a saved change may wait for the next published base
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "background")  # background (answer /health at once, load in a thread) | blocking
+    WARMUP_MODELS: bool = os.getenv("WARMUP_MODELS", "true").lower() == "true"  # load models before /ready, else on first question
+    
+    # Vector store persistence
+    DOCSTORE_BACKEND: str = os.getenv("DOCSTORE_BACKEND", "sqlite")  # sqlite | pickle
+    VECTORSTORE_COMPACT_SEGMENTS: int = int(os.getenv("VECTORSTORE_COMPACT_SEGMENTS", 20))  # segments before compaction
+    DOCSTORE_PURGE_DELAY: float = float(os.getenv("DOCSTORE_PURGE_DELAY", 30.0))  # seconds reader workers get to leave a replaced published base before its removed chunks are deleted
+    
+    # FAISS index settings
+    FAISS_INDEX_TYPE: str = os.getenv("FAISS_INDEX_TYPE", "hnsw")  # flat | ivf_flat | hnsw | ivf_pq
+    FAISS_METRIC: str = os.getenv("FAISS_METRIC", "l2")  # l2 | ip (inner product over normalized vectors), new stores only
+    FAISS_ANN_THRESHOLD: int = int(os.getenv("FAISS_ANN_THRESHOLD", 50000))  # vectors before leaving flat
+    FAISS_NLIST: int = int(os.getenv("FAISS_NLIST", 0))  # IVF lists, 0 = ~4*sqrt(n)
+    FAISS_NPROBE: int = int(os.getenv("FAISS_NPROBE", 16))
+    FAISS_PQ_M: int = int(os.getenv("FAISS_PQ_M", 16))  # PQ sub-quantizers (must divide embedding size)
+    FAISS_PQ_BITS: int = int(os.getenv("FAISS_PQ_BITS", 8))
+    FAISS_HNSW_M: int = int(os.getenv("FAISS_HNSW_M", 32))
+    FAISS_HNSW_EF_CONSTRUCTION: int = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", 200))
+    FAISS_HNSW_MAX_DELETED: float = float(os.getenv("FAISS_HNSW_MAX_DELETED", 0.2))  # HNSW deletes only hide vectors; the graph is rebuilt (O(n)) past this dead fraction and when a base is written
+    FAISS_EF_SEARCH: int = int(os.getenv("FAISS_EF_SEARCH", 64))
+    
     # Retrieval settings
     DEFAULT_TOP_K: int = 3
+    AUTO_TICKER_FILTER: bool = os.getenv("AUTO_TICKER_FILTER", "true").lower() == "true"  # restrict to companies named in the question
+    METRICS_ROUTER: bool = os.getenv("METRICS_ROUTER", "true").lower() == "true"  # answer direct metric lookups from the metrics table, no LLM
+    HYBRID_SEARCH: bool = os.getenv("HYBRID_SEARCH", "true").lower() == "true"  # BM25 + vector, merged by reciprocal rank fusion
+    HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", 20))  # chunks taken from each ranking before fusion
+    RRF_K: int = int(os.getenv("RRF_K", 60))  # reciprocal rank fusion constant
+    BM25_K1: float = float(os.getenv("BM25_K1", 1.5))
+    BM25_B: float = float(os.getenv("BM25_B", 0.75))
+    KEYWORD_QUERY_MAX_TERMS: int = int(os.getenv("KEYWORD_QUERY_MAX_TERMS", 4))  # shorter non-questions rank keyword hits first
+    QUERY_WORKERS: int = int(os.getenv("QUERY_WORKERS", 4))  # threads for embedding/FAISS on the async path
+    BATCH_MAX_QUESTIONS: int = int(os.getenv("BATCH_MAX_QUESTIONS", 500))  # per /ask/batch call
+    BATCH_LLM_CONCURRENCY: int = int(os.getenv("BATCH_LLM_CONCURRENCY", 8))  # LLM calls in flight per batch
     
     # LLM settings
     LLM_MODEL: str = "gemini-2.5-flash"  # gemini-2.5-flash
     LLM_TEMPERATURE: float = 0.1
+    LLM_COALESCE: bool = os.getenv("LLM_COALESCE", "true").lower() == "true"  # identical prompts in flight share one call
+    CONTEXT_MAX_TOKENS: int = int(os.getenv("CONTEXT_MAX_TOKENS", 1500))  # retrieved text per prompt
+    CONTEXT_CHARS_PER_TOKEN: float = float(os.getenv("CONTEXT_CHARS_PER_TOKEN", 4.0))  # for estimating token counts
+    
+    # Answer cache settings
+    ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_SIZE: int = int(os.getenv("ANSWER_CACHE_SIZE", 512))
+    ANSWER_CACHE_MAX_BYTES: int = int(os.getenv("ANSWER_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+    ANSWER_CACHE_SIMILARITY: float = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.97))
     
     def __post_init__(self):
         """Create directories"""
@@ -0,0 +1,100 @@
+"""Local TTL cache of raw market data"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+import pandas as pd
+
+
+class MarketDataCache:
+    """
+    Raw Yahoo Finance results stored per ticker:
+    info.json plus one Parquet file per statement (quarterly financials,
+    balance sheet). Entries older than `ttl` seconds are treated as missing
+    unless the cache is offline.
+    """
+    
+    FRAMES = ('financials', 'balance_sheet')
+    
+    def __init__(self, cache_dir: Path, ttl: float = 6 * 3600, offline: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.offline = offline
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _ticker_dir(self, ticker: str) -> Path:
+        return self.cache_dir / ticker.upper().replace('/', '_')
+    
+    def _fetched_at(self, ticker: str) -> Optional[float]:
+        meta = self._ticker_dir(ticker) / "meta.json"
+        if not meta.exists():
+            return None
+        with open(meta, encoding='utf-8') as f:
+            return json.load(f).get('fetched_at')
+    
+    def is_fresh(self, ticker: str) -> bool:
+        """Cached and within TTL (always true offline if cached)"""
+        fetched_at = self._fetched_at(ticker)
+        if fetched_at is None:
+            return False
+        return self.offline or not self.ttl or time.time() - fetched_at < self.ttl
+    
+    def load(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Cached info dict and statements, or None if missing/stale"""
+        if not self.is_fresh(ticker):
+            return None
+        try:
+            with open(self._ticker_dir(ticker) / "info.json", encoding='utf-8') as f:
+                raw = {'info': json.load(f)}
+            for name in self.FRAMES:
+                raw[name] = self._read_frame(ticker, name)
+            return raw
+        except (OSError, ValueError) as e:
+            print(f"⚠ Ignoring unreadable cache for {ticker}: {e}")
+            return None
+    
+    def load_frame(self, ticker: str, name: str) -> Optional[pd.DataFrame]:
+        """One cached statement, or None if missing/stale"""
+        if not self.is_fresh(ticker):
+            return None
+        try:
+            return self._read_frame(ticker, name)
+        except (OSError, ValueError):
+            return None
+    
+    def store(self, ticker: str, info: Dict[str, Any], **frames: pd.DataFrame) -> None:
+        """Write raw results; meta.json goes last so partial writes never look fresh"""
+        ticker_dir = self._ticker_dir(ticker)
+        ticker_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._atomic_write(ticker_dir / "info.json", json.dumps(info, default=str).encode('utf-8'))
+        for name, frame in frames.items():
+            self._write_frame(ticker_dir / f"{name}.parquet", frame)
+        self._atomic_write(ticker_dir / "meta.json", json.dumps({'ticker': ticker, 'fetched_at': time.time()}).encode('utf-8'))
+    
+    def _read_frame(self, ticker: str, name: str) -> pd.DataFrame:
+        path = self._ticker_dir(ticker) / f"{name}.parquet"
+        if not path.exists():
+            return pd.DataFrame()
+        frame = pd.read_parquet(path)
+        # Period columns were stored as ISO strings
+        frame.columns = pd.to_datetime(frame.columns)
+        return frame
+    
+    @classmethod
+    def _write_frame(cls, path: Path, frame: Optional[pd.DataFrame]) -> None:
+        frame = frame if frame is not None else pd.DataFrame()
+        frame = frame.apply(pd.to_numeric, errors='coerce')
+        frame.columns = [pd.Timestamp(col).isoformat() for col in frame.columns]
+        frame.index = frame.index.astype(str)
+        tmp = path.with_suffix(".tmp")
+        frame.to_parquet(tmp)
+        os.replace(tmp, path)
+    
+    @staticmethod
+    def _atomic_write(path: Path, payload: bytes) -> None:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
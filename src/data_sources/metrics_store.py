@@ -0,0 +1,166 @@
+"""Structured per-company metrics (ticker x metric x period)"""
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class MetricValue:
+    """One reported value"""
+    ticker: str
+    metric: str          # e.g. "Net Income", "P/E Ratio"
+    period: str          # "Sep 2025" for quarters, "TTM" / "Current" for company info
+    period_end: str      # ISO date of the quarter end, "" if not a quarterly figure
+    value: float
+    unit: str            # INR | INR/share | percent | ratio | count
+    statement: str       # info | financials | balance_sheet
+    source: str          # report file the RAG path would cite
+    as_of: str           # ISO date the data was ingested
+    
+    def is_quarterly(self) -> bool:
+        return bool(self.period_end)
+
+
+COLUMNS = list(MetricValue.__dataclass_fields__)
+
+
+class MetricsStore:
+    """
+    Columnar table of the values behind each company report
+    
+    Persisted as one Parquet file per store. In memory it is indexed as
+    ticker -> metric -> values (newest period first), swapped as a whole on
+    every write, so lookups are a couple of dict reads and never lock.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._index: Dict[str, Dict[str, List[MetricValue]]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._loaded_mtime: Optional[float] = None
+        self._latest: Optional[Tuple[int, pd.DataFrame]] = None
+        self.version = 0
+    
+    def __len__(self) -> int:
+        return sum(len(values) for metrics in self._index.values() for values in metrics.values())
+    
+    def tickers(self) -> List[str]:
+        return list(self._index)
+    
+    def metrics(self, ticker: str) -> List[str]:
+        return list(self._index.get(ticker, {}))
+    
+    # ---------- writes ----------
+    
+    @staticmethod
+    def _group(values: List[MetricValue]) -> Dict[str, List[MetricValue]]:
+        grouped: Dict[str, List[MetricValue]] = {}
+        for value in sorted(values, key=lambda v: v.period_end, reverse=True):
+            grouped.setdefault(value.metric, []).append(value)
+        return grouped
+    
+    def upsert(self, ticker: str, values: List[MetricValue]) -> None:
+        """Replace all of a ticker's values"""
+        with self._lock:
+            index = dict(self._index)
+            index[ticker] = self._group(values)
+            self._publish(index)
+    
+    def delete(self, ticker: str) -> bool:
+        with self._lock:
+            if ticker not in self._index:
+                return False
+            index = dict(self._index)
+            del index[ticker]
+            self._publish(index)
+            return True
+    
+    def _publish(self, index: Dict[str, Dict[str, List[MetricValue]]]) -> None:
+        self._index = index
+        self._dirty = True
+        self.version += 1
+    
+    # ---------- reads ----------
+    
+    def lookup(self, ticker: str, metric: str, period_end: str = None,
+               quarterly: Optional[bool] = None) -> Optional[MetricValue]:
+        """
+        A metric's value for one quarter (period_end 'YYYY-MM'), else the
+        latest one; `quarterly` restricts to statement (True) or company
+        info (False) figures
+        """
+        for value in self._index.get(ticker, {}).get(metric, ()):
+            if quarterly is not None and value.is_quarterly() != quarterly:
+                continue
+            if period_end and not value.period_end.startswith(period_end):
+                continue
+            return value
+        return None
+    
+    def latest(self) -> pd.DataFrame:
+        """Newest value of every metric as a wide table (ticker x metric), rebuilt only after writes"""
+        cached = self._latest
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        
+        version, index = self.version, self._index
+        table = pd.DataFrame.from_dict(
+            {ticker: {metric: values[0].value for metric, values in metrics.items()}
+             for ticker, metrics in index.items()},
+            orient='index', dtype=float
+        )
+        self._latest = (version, table)
+        return table
+    
+    def frame(self) -> pd.DataFrame:
+        """All values as a long DataFrame (one row per ticker, metric and period)"""
+        rows = [
+            asdict(value)
+            for metrics in self._index.values() for values in metrics.values() for value in values
+        ]
+        return pd.DataFrame(rows, columns=COLUMNS)
+    
+    # ---------- persistence ----------
+    
+    def save(self) -> None:
+        """Write the table if it changed since the last save/load"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            frame = self.frame()
+            frame.to_parquet(tmp, index=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+            self._loaded_mtime = self.path.stat().st_mtime
+        print(f"✓ Saved {len(frame)} metric values to: {self.path}")
+    
+    def load(self) -> bool:
+        """(Re)read the table if the file changed on disk"""
+        if not self.path.exists():
+            return False
+        mtime = self.path.stat().st_mtime
+        if mtime == self._loaded_mtime:
+            return True
+        
+        frame = pd.read_parquet(self.path)
+        values: Dict[str, List[MetricValue]] = {}
+        for row in frame.itertuples(index=False):
+            value = MetricValue(**{column: getattr(row, column) for column in COLUMNS})
+            values.setdefault(value.ticker, []).append(value)
+        
+        with self._lock:
+            self._index = {ticker: self._group(ticker_values) for ticker, ticker_values in values.items()}
+            self._dirty = False
+            self._loaded_mtime = mtime
+            self.version += 1
+        print(f"✓ Loaded {len(frame)} metric values for {len(values)} companies")
+        return True
+    
+    def get_stats(self) -> Dict:
+        return {'companies': len(self._index), 'values': len(self), 'path': str(self.path)}
@@ -1,43 +1,156 @@
 """Yahoo Finance data source"""
-import yfinance as yf
 import pandas as pd
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional
+from datetime import date
 from .base import BaseDataSource
+from .rate_limiter import RateLimiter
+from .market_cache import MarketDataCache
+from .metrics_store import MetricValue
+from ..config.settings import settings
+
+
+# Company info fields kept as structured metrics: name -> (info key, period, unit)
+INFO_METRICS = {
+    'Revenue (TTM)': ('totalRevenue', 'TTM', 'INR'),
+    'Net Profit Margin': ('profitMargins', 'TTM', 'percent'),
+    'Operating Margin': ('operatingMargins', 'TTM', 'percent'),
+    'Return on Equity': ('returnOnEquity', 'TTM', 'percent'),
+    'Debt to Equity': ('debtToEquity', 'Current', 'ratio'),
+    'Current Ratio': ('currentRatio', 'Current', 'ratio'),
+    'P/E Ratio': ('trailingPE', 'TTM', 'ratio'),
+    'EPS': ('trailingEps', 'TTM', 'INR/share'),
+    'Market Cap': ('marketCap', 'Current', 'INR'),
+    'Employees': ('fullTimeEmployees', 'Current', 'count'),
+}
+
+
+def statement_unit(metric: str) -> str:
+    """Unit of a quarterly statement row"""
+    if 'EPS' in metric:
+        return 'INR/share'
+    if 'Shares' in metric or 'Share Number' in metric:
+        return 'count'
+    if 'Rate' in metric:
+        return 'ratio'
+    return 'INR'
 
 
 class YahooFinanceSource(BaseDataSource):
     """Yahoo Finance data source"""
     
-    def __init__(self):
+    def __init__(self, rate_limiter: RateLimiter = None, cache: MarketDataCache = None):
         super().__init__("YahooFinance")
+        # Shared by all fetch threads so concurrent ingestion stays polite
+        self.rate_limiter = rate_limiter or RateLimiter(
+            rate=settings.FETCH_RATE_LIMIT,
+            burst=settings.FETCH_RATE_BURST
+        )
+        self.cache = cache
+        if self.cache is None and settings.MARKET_CACHE_ENABLED:
+            self.cache = MarketDataCache(
+                settings.MARKET_CACHE_DIR,
+                ttl=settings.MARKET_CACHE_TTL,
+                offline=settings.MARKET_DATA_OFFLINE
+            )
     
     def fetch_company_data(self, ticker: str) -> Optional[Dict[str, Any]]:
         """Fetch company data from Yahoo Finance"""
         try:
-            print(f"Fetching data for {ticker}...")
-            stock = yf.Ticker(ticker)
+            raw = self.cache.load(ticker) if self.cache else None
+            
+            if raw is not None:
+                print(f"✓ Using cached data for {ticker}")
+            elif self.cache and self.cache.offline:
+                print(f"✗ No cached data for {ticker} (offline mode)")
+                return None
+            else:
+                raw = self._fetch_raw(ticker)
             
-            data = {
+            return {
                 'ticker': ticker,
-                'info': stock.info,
-                'financials': stock.quarterly_financials,
-                'balance_sheet': stock.quarterly_balance_sheet,
-                'company_name': stock.info.get('longName', ticker)
+                'info': raw['info'],
+                'financials': raw['financials'],
+                'balance_sheet': raw['balance_sheet'],
+                'company_name': raw['info'].get('longName', ticker)
             }
             
-            print(f"✓ Fetched data for {ticker}")
-            return data
-            
         except Exception as e:
             print(f"✗ Error fetching {ticker}: {e}")
             return None
     
+    def _fetch_raw(self, ticker: str) -> Dict[str, Any]:
+        """Fetch info and statements from Yahoo Finance and cache them"""
+        self.rate_limiter.acquire()
+        print(f"Fetching data for {ticker}...")
+        import yfinance as yf  # deferred: only ingestion needs it
+        stock = yf.Ticker(ticker)
+        
+        # stock.info is a network call - read it once
+        raw = {
+            'info': stock.info,
+            'financials': stock.quarterly_financials,
+            'balance_sheet': stock.quarterly_balance_sheet
+        }
+        
+        if self.cache:
+            try:
+                self.cache.store(ticker, raw['info'], financials=raw['financials'], balance_sheet=raw['balance_sheet'])
+            except Exception as e:
+                print(f"⚠ Could not cache {ticker}: {e}")
+        
+        print(f"✓ Fetched data for {ticker}")
+        return raw
+    
     def get_financials(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get quarterly financials"""
+        if self.cache:
+            financials = self.cache.load_frame(ticker, 'financials')
+            if financials is not None:
+                return financials
         data = self.fetch_company_data(ticker)
         return data['financials'] if data else None
     
+    @staticmethod
+    def company_metadata(data: Dict[str, Any]) -> Dict[str, str]:
+        """Company name, sector and industry for chunk metadata"""
+        info = data['info']
+        metadata = {'company': data['company_name']}
+        for key in ('sector', 'industry'):
+            if info.get(key):
+                metadata[key] = info[key]
+        return metadata
+    
+    @staticmethod
+    def extract_metrics(data: Dict[str, Any]) -> List[MetricValue]:
+        """The figures behind create_document's report as structured values"""
+        ticker = data['ticker']
+        info = data['info']
+        source = f"{ticker}_report.txt"
+        as_of = date.today().isoformat()
+        
+        values = []
+        for name, (key, period, unit) in INFO_METRICS.items():
+            value = info.get(key)
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or pd.isna(value):
+                continue
+            if key == 'debtToEquity':
+                value = value / 100  # Yahoo reports D/E as a percentage
+            values.append(MetricValue(ticker, name, period, "", float(value), unit, 'info', source, as_of))
+        
+        for statement in ('financials', 'balance_sheet'):
+            frame = data.get(statement)
+            if frame is None or frame.empty:
+                continue
+            frame = frame.apply(pd.to_numeric, errors='coerce')
+            for col in frame.columns:
+                quarter = pd.Timestamp(col)
+                for metric, value in frame[col].dropna().items():
+                    values.append(MetricValue(
+                        ticker, str(metric), quarter.strftime('%b %Y'), quarter.date().isoformat(),
+                        float(value), statement_unit(str(metric)), statement, source, as_of
+                    ))
+        return values
+    
     def create_document(self, data: Dict[str, Any]) -> str:
         """Create formatted financial document"""
         
@@ -50,7 +163,6 @@ class YahooFinanceSource(BaseDataSource):
 {'='*70}
 {company_name} - FINANCIAL ANALYSIS REPORT
 {'='*70}
-Report Generated: {datetime.now().strftime('%d-%m-%Y %H:%M')}
 
 COMPANY OVERVIEW
 {'='*70}
@@ -1,7 +1,6 @@
 """Document loaders"""
 from pathlib import Path
 from typing import List
-from langchain_community.document_loaders import TextLoader, DirectoryLoader
 from langchain_core.documents import Document
 
 
@@ -12,6 +11,7 @@ class DocumentLoader:
     def load_text_file(filepath: str) -> List[Document]:
         """Load a single text file"""
         print(f"Loading: {filepath}")
+        from langchain_community.document_loaders import TextLoader
         loader = TextLoader(filepath)
         docs = loader.load()
         print(f"✓ Loaded {len(docs)} documents")
@@ -21,6 +21,7 @@ class DocumentLoader:
     def load_directory(directory: str, glob: str = "**/*.txt") -> List[Document]:
         """Load all files from directory"""
         print(f"Loading from: {directory}")
+        from langchain_community.document_loaders import TextLoader, DirectoryLoader
         loader = DirectoryLoader(directory, glob=glob, loader_cls=TextLoader)
         docs = loader.load()
         print(f"✓ Loaded {len(docs)} documents")
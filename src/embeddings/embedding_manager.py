@@ -1,34 +1,167 @@
 # src/embeddings/embedding_manager.py
 """Embedding generation"""
-from typing import List
-from langchain_huggingface import HuggingFaceEmbeddings
+import threading
+from typing import Dict, List
+import numpy as np
+from langchain_core.embeddings import Embeddings
 from ..config.settings import settings
+from .query_cache import QueryEmbeddingCache, normalize_query
+from .embedding_cache import EmbeddingCache, text_hash
+from .micro_batcher import MicroBatcher
+
+
+class LazyEmbeddings(Embeddings):
+    """
+    Embeddings that import their backend and load the model on first use
+    
+    Keeps process start (and /health) fast; call load() to warm up early.
+    Backends: "torch" (HuggingFace / sentence-transformers) or "onnx"
+    (ONNX Runtime, optionally int8-quantized, CPU only).
+    """
+    
+    def __init__(self, model_name: str, device: str, backend: str = "torch"):
+        self.model_name = model_name
+        self.device = device
+        self.backend = backend
+        self._model = None
+        self._lock = threading.Lock()
+    
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+    
+    def load(self) -> Embeddings:
+        """Load the model (once; concurrent callers wait for the first)"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    print(f"Loading embeddings: {self.model_name} ({self.backend})...")
+                    if self.backend == "onnx":
+                        from .onnx_embeddings import OnnxEmbeddings
+                        self._model = OnnxEmbeddings(
+                            self.model_name,
+                            settings.EMBEDDING_ONNX_DIR,
+                            quantize=settings.EMBEDDING_ONNX_QUANTIZE,
+                            threads=settings.EMBEDDING_ONNX_THREADS
+                        )
+                    else:
+                        from langchain_huggingface import HuggingFaceEmbeddings
+                        self._model = HuggingFaceEmbeddings(
+                            model_name=self.model_name,
+                            model_kwargs={'device': self.device}
+                        )
+                    print("✓ Embeddings loaded")
+        return self._model
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.load().embed_query(text)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.load().embed_documents(texts)
 
 
 class EmbeddingManager:
     """Manages embedding generation"""
     
-    def __init__(self, model_name: str = None, device: str = None):
+    def __init__(self, model_name: str = None, device: str = None, backend: str = None):
         self.model_name = model_name or settings.EMBEDDING_MODEL
         self.device = device or settings.EMBEDDING_DEVICE
+        self.backend = backend or settings.EMBEDDING_BACKEND
+        if self.backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown embedding backend {self.backend!r} (expected torch or onnx)")
         
-        print(f"Loading embeddings: {self.model_name}...")
+        # Quantized vectors differ slightly, so they get their own cache entries
+        self.cache_key = self.model_name
+        if self.backend == "onnx" and settings.EMBEDDING_ONNX_QUANTIZE:
+            self.cache_key = f"{self.model_name}@onnx-int8"
         
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=self.model_name,
-            model_kwargs={'device': self.device}
+        # The model itself is loaded on first use (or by warmup())
+        self.embeddings = LazyEmbeddings(self.model_name, self.device, self.backend)
+        self.query_cache = QueryEmbeddingCache(
+            max_size=settings.QUERY_CACHE_SIZE,
+            ttl=settings.QUERY_CACHE_TTL
         )
+        self.document_cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH) if settings.EMBEDDING_CACHE_ENABLED else None
         
-        print("✓ Embeddings loaded")
+        # Concurrent query misses share one forward pass
+        self.batcher = MicroBatcher(
+            self.embeddings.embed_documents,
+            max_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait=settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000
+        ) if settings.EMBEDDING_MICRO_BATCH else None
+    
+    def warmup(self) -> None:
+        """Load the model and run one embedding so the first query pays nothing extra"""
+        self.embeddings.load().embed_query("warmup")
+    
+    def embed_query_vector(self, text: str) -> np.ndarray:
+        """Embed a single query as a read-only float32 vector (cached)"""
+        vector = self.query_cache.get(self.cache_key, text)
+        if vector is None:
+            embedding = self.batcher.embed(text) if self.batcher else self.embeddings.embed_query(text)
+            vector = self.query_cache.put(self.cache_key, text, np.asarray(embedding, dtype=np.float32))
+        return vector
+    
+    def embed_query_vectors(self, texts: List[str]) -> np.ndarray:
+        """Embed many queries as a (n, dim) float32 matrix: cache hits plus one batch for the rest"""
+        vectors = [self.query_cache.get(self.cache_key, text) for text in texts]
+        
+        # Each distinct missing question is embedded once
+        missing = {normalize_query(text): text for text, vector in zip(texts, vectors) if vector is None}
+        if missing:
+            fresh = dict(zip(missing, self.embed_documents(list(missing.values()))))
+            for row, text in enumerate(texts):
+                if vectors[row] is None:
+                    key = normalize_query(text)
+                    vectors[row] = self.query_cache.put(self.cache_key, text, np.asarray(fresh[key], dtype=np.float32))
+        
+        print(f"✓ Embedded {len(missing)} new queries ({len(texts) - len(missing)} from cache)")
+        return np.vstack(vectors)
+    
+    def close(self) -> None:
+        """Stop the micro-batching thread"""
+        if self.batcher is not None:
+            self.batcher.close()
     
     def embed_query(self, text: str) -> List[float]:
         """Embed a single query"""
-        return self.embeddings.embed_query(text)
+        return self.embed_query_vector(text).tolist()
     
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Embed multiple documents"""
         return self.embeddings.embed_documents(texts)
     
+    def embed_documents_cached(self, texts: List[str]) -> np.ndarray:
+        """Embed documents, reusing vectors for chunk texts embedded before"""
+        if self.document_cache is None:
+            return np.asarray(self.embed_documents(texts), dtype=np.float32)
+        
+        hashes = [text_hash(text) for text in texts]
+        cached = self.document_cache.get_many(self.cache_key, hashes)
+        
+        # Batch-embed only the misses (each distinct text once)
+        missing = {h: text for h, text in zip(hashes, texts) if h not in cached}
+        if missing:
+            new_vectors = self.embed_documents(list(missing.values()))
+            fresh = {h: np.asarray(v, dtype=np.float32) for h, v in zip(missing, new_vectors)}
+            self.document_cache.put_many(self.cache_key, fresh)
+            cached.update(fresh)
+        
+        print(f"✓ Embedded {len(missing)} new chunks ({len(texts) - len(missing)} from cache)")
+        return np.vstack([cached[h] for h in hashes]) if hashes else np.empty((0, 0), dtype=np.float32)
+    
     def get_model(self):
         """Get the embeddings model"""
-        return self.embeddings
\ No newline at end of file
+        return self.embeddings
+    
+    def get_stats(self) -> Dict:
+        """Get embedding statistics"""
+        return {
+            'model_name': self.model_name,
+            'device': self.device,
+            'backend': self.backend,
+            'loaded': self.embeddings.loaded,
+            'query_cache': self.query_cache.get_stats(),
+            'document_cache': self.document_cache.get_stats() if self.document_cache else None,
+            'micro_batch': self.batcher.get_stats() if self.batcher else None
+        }
@@ -0,0 +1,114 @@
+# src/embeddings/micro_batcher.py
+"""Micro-batching of concurrent query embeddings"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-text embedding calls into batched forward passes
+    
+    One dispatcher thread takes whatever requests are queued (up to
+    `max_size`) and embeds them in one call, resolving each caller's future.
+    A lone request on an idle system goes straight through; while requests
+    keep arriving together (the last batch had more than one), the
+    dispatcher waits up to `max_wait` seconds for the batch to fill.
+    """
+    
+    def __init__(self, embed_fn: Callable[[List[str]], List[List[float]]],
+                 max_size: int = 32, max_wait: float = 0.002):
+        self.embed_fn = embed_fn
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._busy = False
+        
+        # Stats
+        self.batches = 0
+        self.requests = 0
+        self.largest = 0
+    
+    def submit(self, text: str) -> Future:
+        """Queue one text; the future resolves to its embedding"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Embedding batcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+                self._thread.start()
+            self._queue.put((text, future))
+        return future
+    
+    def embed(self, text: str) -> List[float]:
+        """Embed one text, batched with whatever else is in flight"""
+        return self.submit(text).result()
+    
+    def _collect(self) -> List[Tuple[str, Future]]:
+        item = self._queue.get()
+        if item is None:
+            return []
+        batch = [item]
+        
+        deadline = time.monotonic() + (self.max_wait if self._busy else 0)
+        while len(batch) < self.max_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+    
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            self._busy = len(batch) > 1
+            
+            # Identical questions in one batch are embedded once
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = dict(zip(texts, self.embed_fn(texts)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for text, future in batch:
+                future.set_result(vectors[text])
+            
+            self.batches += 1
+            self.requests += len(batch)
+            self.largest = max(self.largest, len(batch))
+    
+    def close(self) -> None:
+        """Finish queued requests and stop the dispatcher"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+    
+    def get_stats(self) -> Dict:
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'avg_batch': round(self.requests / self.batches, 2) if self.batches else 0.0,
+            'largest_batch': self.largest,
+            'max_size': self.max_size,
+            'max_wait_ms': self.max_wait * 1000
+        }
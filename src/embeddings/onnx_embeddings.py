@@ -0,0 +1,180 @@
+# src/embeddings/onnx_embeddings.py
+"""
+ONNX Runtime embedding backend (optionally int8-quantized) for CPU serving
+
+Export ahead of time (e.g. in the image build) so workers never need torch:
+    python -m src.embeddings.onnx_embeddings
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from ..config.settings import settings
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+MAX_SEQ_LENGTH = 256  # sentence-transformers' limit for all-MiniLM-L6-v2
+BATCH_SIZE = 32
+
+
+def export_dir(root: Path, model_name: str) -> Path:
+    """Where the exported copy of a model lives"""
+    return Path(root) / re.sub(r"[^\w.-]+", "__", model_name)
+
+
+def export_model(model_name: str, out_dir: Path, quantize: bool = True) -> Path:
+    """
+    Export a HuggingFace/sentence-transformers encoder to ONNX (one-off)
+    
+    Needs torch and transformers; serving afterwards only needs onnxruntime
+    and tokenizers. Quantization is dynamic int8 on the weights.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Exporting {model_name} to ONNX...")
+    
+    # Build in a private directory and move files into place, so workers
+    # exporting at the same time never read a half-written model
+    tmp = out_dir / f".export-{os.getpid()}"
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(str(tmp))
+    
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    
+    class Encoder(torch.nn.Module):
+        """Positional inputs in tokenizer order -> last hidden state"""
+        def __init__(self):
+            super().__init__()
+            self.model = model
+        
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+    
+    with torch.no_grad():
+        torch.onnx.export(
+            Encoder(),
+            tuple(sample[name] for name in input_names),
+            str(tmp / MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            dynamo=False
+        )
+    files = [TOKENIZER_FILE, MODEL_FILE]
+    
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(tmp / MODEL_FILE), str(tmp / QUANTIZED_FILE), weight_type=QuantType.QInt8)
+        files.append(QUANTIZED_FILE)
+    
+    for name in files:
+        os.replace(tmp / name, out_dir / name)
+    shutil.rmtree(tmp, ignore_errors=True)
+    print(f"✓ Exported to {out_dir} ({', '.join(files[1:])})")
+    return out_dir
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Sentence embeddings from an exported ONNX encoder
+    
+    Mean-pools the last hidden state over the attention mask and
+    L2-normalizes, matching the sentence-transformers pipeline of
+    all-MiniLM-L6-v2. The model is exported on first use if missing.
+    """
+    
+    def __init__(self, model_name: str, model_dir: Path, quantize: bool = True, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        
+        self.model_name = model_name
+        self.model_dir = export_dir(model_dir, model_name)
+        self.quantize = quantize
+        
+        model_file = self.model_dir / (QUANTIZED_FILE if quantize else MODEL_FILE)
+        if not model_file.exists() or not (self.model_dir / TOKENIZER_FILE).exists():
+            export_model(model_name, self.model_dir, quantize=quantize)
+        
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads or min(os.cpu_count() or 1, 8)
+        self.session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self._lock = threading.Lock()  # tokenizer padding/truncation state is shared
+        
+        print(f"✓ ONNX embeddings ready: {model_file.name}")
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        with self._lock:
+            encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self.input_names:
+            feeds['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        
+        # Mean pooling over real tokens, then unit length
+        mask = attention_mask[:, :, np.newaxis].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as a (n, dim) float32 matrix, BATCH_SIZE at a time"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        # Similar lengths together keeps padding (and wasted compute) low
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), BATCH_SIZE):
+            rows = order[start:start + BATCH_SIZE]
+            batch = self._encode([texts[i] for i in rows]).astype(np.float32)
+            if vectors.shape[1] == 0:
+                vectors = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            vectors[rows] = batch
+        return vectors
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_array([text])[0].tolist()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX for EMBEDDING_BACKEND=onnx")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL, help="Model name (default: EMBEDDING_MODEL)")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 copy")
+    args = parser.parse_args()
+    
+    try:
+        export_model(args.model, export_dir(settings.EMBEDDING_ONNX_DIR, args.model), quantize=not args.no_quantize)
+    except Exception as e:
+        print(f"✗ Export failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# src/generation/answer_cache.py
+"""Semantic cache of generated answers"""
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional
+import numpy as np
+
+
+@dataclass
+class _CacheEntry:
+    vector: np.ndarray
+    chunk_ids: FrozenSet[str]
+    tickers: FrozenSet[str]
+    result: Dict
+    size: int
+
+
+class AnswerCache:
+    """
+    LRU cache of answers keyed by query-embedding similarity.
+    
+    A cached answer is only reused when the new question is close enough to
+    the cached one AND retrieval returned exactly the same chunks, so the LLM
+    would have seen identical context.
+    """
+    
+    def __init__(self, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024,
+                 similarity_threshold: float = 0.97):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._by_chunks: Dict[FrozenSet[str], List[int]] = {}
+        self._next_key = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def _unit(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    @staticmethod
+    def _size_of(vector: np.ndarray, result: Dict) -> int:
+        return vector.nbytes + sum(sys.getsizeof(v) for v in result.values())
+    
+    def lookup(self, query_vector: np.ndarray, chunk_ids: Iterable[str]) -> Optional[Dict]:
+        """Return a cached result for a similar question over the same chunks"""
+        chunk_set = frozenset(chunk_ids)
+        query = self._unit(query_vector)
+        
+        with self._lock:
+            best_key, best_score = None, self.similarity_threshold
+            for key in self._by_chunks.get(chunk_set, []):
+                score = float(np.dot(self._entries[key].vector, query))
+                if score >= best_score:
+                    best_key, best_score = key, score
+            
+            if best_key is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return dict(self._entries[best_key].result)
+    
+    def store(self, query_vector: np.ndarray, chunk_ids: Iterable[str],
+              tickers: Iterable[str], result: Dict) -> None:
+        """Cache a generated result"""
+        vector = self._unit(query_vector)
+        entry = _CacheEntry(
+            vector=vector,
+            chunk_ids=frozenset(chunk_ids),
+            tickers=frozenset(tickers),
+            result=dict(result),
+            size=self._size_of(vector, result)
+        )
+        
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = entry
+            self._by_chunks.setdefault(entry.chunk_ids, []).append(key)
+            self._bytes += entry.size
+            
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+    
+    def _remove(self, key: int) -> None:
+        """Remove one entry (lock must be held)"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        keys = self._by_chunks[entry.chunk_ids]
+        keys.remove(key)
+        if not keys:
+            del self._by_chunks[entry.chunk_ids]
+    
+    def invalidate_ticker(self, ticker: str) -> int:
+        """Drop every answer built from chunks of this ticker"""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if ticker in entry.tickers]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+            return len(stale)
+    
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._by_chunks.clear()
+            self._bytes = 0
+    
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / total if total else 0.0
+            }
@@ -1,23 +1,26 @@
 """Answer generation"""
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 from langchain_core.documents import Document
+from .context_builder import Context, ContextBuilder, estimate_tokens
 from .llm_manager import LLMManager
+from ..vectorstore.vector_manager import RetrievalResult
 
 
 class AnswerGenerator:
     """Generates answers from retrieved documents"""
     
-    def __init__(self, llm_manager: LLMManager):
+    def __init__(self, llm_manager: LLMManager, context_builder: ContextBuilder = None):
         self.llm_manager = llm_manager
+        self.context_builder = context_builder or ContextBuilder()
     
-    def generate_answer(self, query: str, documents: List[Document]) -> Dict:
-        """Generate answer from documents"""
-        
-        # Combine context
-        context = "\n\n---\n\n".join([doc.page_content for doc in documents])
-        
-        # Create prompt
-        prompt = f"""You are a financial analyst assistant for Indian stocks.
+    def build_prompt(self, query: str, documents: List[Document]) -> str:
+        """Build the LLM prompt from the question and documents"""
+        return self.prompt_for(query, self.context_builder.build(documents))
+    
+    @staticmethod
+    def prompt_for(query: str, context: Context) -> str:
+        """The LLM prompt for a question and its packed context"""
+        return f"""You are a financial analyst assistant for Indian stocks.
 
 Answer using ONLY the information in the context below.
 
@@ -29,25 +32,84 @@ RULES:
 5. Be factual and precise
 
 CONTEXT:
-{context}
+{context.text}
 
 QUESTION: {query}
 
 ANSWER:"""
-        
-        # Generate
-        answer = self.llm_manager.generate(prompt)
-        
-        # Extract sources
+    
+    @staticmethod
+    def extract_sources(documents: List[Document]) -> List[str]:
+        """Unique source file names, in retrieval order"""
         sources = []
         for doc in documents:
             if hasattr(doc, 'metadata') and 'source' in doc.metadata:
                 source = doc.metadata['source'].split('/')[-1]
                 if source not in sources:
                     sources.append(source)
-        
+        return sources
+    
+    def build_context(self, retrieval: RetrievalResult) -> Context:
+        """Packed context of a scored retrieval (keeps the similarity and id of each chunk used)"""
+        return self.context_builder.build(retrieval.documents, retrieval.similarities, retrieval.chunk_ids)
+    
+    def _prompt(self, query: str, context: Context) -> str:
+        prompt = self.prompt_for(query, context)
+        print(f"✓ Context: {len(context.documents)}/{len(context.documents) + context.dropped} chunks, "
+              f"{context.tokens} tokens (was {context.raw_tokens}), prompt ~{estimate_tokens(prompt)} tokens")
+        return prompt
+    
+    def _result(self, answer: str, prompt: str, context: Context) -> Dict:
         return {
             'answer': answer,
-            'sources': sources,
-            'num_docs': len(documents)
-        }
\ No newline at end of file
+            'sources': self.extract_sources(context.documents),
+            'num_docs': len(context.documents),
+            'context': {**context.stats(), 'prompt_tokens': estimate_tokens(prompt)}
+        }
+    
+    def generate_answer(self, query: str, documents: List[Document]) -> Dict:
+        """Generate answer from documents"""
+        return self.generate_from_context(query, self.context_builder.build(documents))
+    
+    async def agenerate_answer(self, query: str, documents: List[Document]) -> Dict:
+        """Async version of generate_answer"""
+        return await self.agenerate_from_context(query, self.context_builder.build(documents))
+    
+    def generate_from_context(self, query: str, context: Context) -> Dict:
+        """Generate answer from an already packed context"""
+        prompt = self._prompt(query, context)
+        answer = self.llm_manager.generate(prompt)
+        return self._result(answer, prompt, context)
+    
+    async def agenerate_from_context(self, query: str, context: Context) -> Dict:
+        """Async version of generate_from_context"""
+        prompt = self._prompt(query, context)
+        answer = await self.llm_manager.agenerate(prompt)
+        return self._result(answer, prompt, context)
+    
+    async def astream_answer(self, query: str, documents: List[Document]) -> AsyncIterator[str]:
+        """Stream answer tokens for the documents"""
+        async for token in self.astream_from_context(query, self.context_builder.build(documents)):
+            yield token
+    
+    async def astream_from_context(self, query: str, context: Context) -> AsyncIterator[str]:
+        """Stream answer tokens for an already packed context"""
+        async for token in self.llm_manager.agenerate_stream(self._prompt(query, context)):
+            yield token
+    
+    def generate_from_retrieval(self, retrieval: RetrievalResult) -> Dict:
+        """Generate answer from a scored retrieval, scoring the same chunks sent to the LLM"""
+        context = self.build_context(retrieval)
+        return self.attach_scores(self.generate_from_context(retrieval.query, context), context)
+    
+    async def agenerate_from_retrieval(self, retrieval: RetrievalResult) -> Dict:
+        """Async version of generate_from_retrieval"""
+        context = self.build_context(retrieval)
+        return self.attach_scores(await self.agenerate_from_context(retrieval.query, context), context)
+    
+    @staticmethod
+    def attach_scores(result: Dict, context: Context) -> Dict:
+        """Add the confidence and chunk ids of the chunks in the prompt to an answer"""
+        result['confidence'] = context.confidence
+        result['chunk_ids'] = list(context.chunk_ids)
+        return result
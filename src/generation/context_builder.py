@@ -0,0 +1,144 @@
+"""Token-budgeted LLM context from retrieved chunks"""
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+from langchain_core.documents import Document
+from ..config.settings import settings
+
+SEPARATOR = "\n\n---\n\n"
+
+# Report boilerplate that carries no facts: ===== / ----- rules, the generation timestamp, end marker
+BOILERPLATE_PATTERNS = [
+    re.compile(r"^\s*[=\-_*]{5,}\s*$"),
+    re.compile(r"^\s*Report Generated:.*$"),
+    re.compile(r"^\s*End of Report\s*$"),
+]
+MIN_OVERLAP = 20  # shorter shared text is treated as coincidence
+
+
+def estimate_tokens(text: str, chars_per_token: float = None) -> int:
+    """Approximate LLM token count (characters / CONTEXT_CHARS_PER_TOKEN)"""
+    return math.ceil(len(text) / (chars_per_token or settings.CONTEXT_CHARS_PER_TOKEN))
+
+
+def strip_boilerplate(text: str) -> str:
+    """Drop banner/rule lines and collapse the blank lines they leave"""
+    lines = [line for line in text.splitlines() if not any(p.match(line) for p in BOILERPLATE_PATTERNS)]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def overlap(left: str, right: str, limit: int) -> int:
+    """Length of the longest suffix of `left` (at most `limit` chars) that starts `right`"""
+    limit = min(limit, len(left), len(right))
+    if limit < MIN_OVERLAP:
+        return 0
+    tail, probe = left[-limit:], right[:MIN_OVERLAP]
+    start = tail.find(probe)
+    while start != -1:
+        if right.startswith(tail[start:]):
+            return len(tail) - start
+        start = tail.find(probe, start + 1)
+    return 0
+
+
+@dataclass
+class Context:
+    """What goes into the prompt, with token accounting"""
+    text: str
+    documents: List[Document] = field(default_factory=list)  # chunks used, in prompt order
+    similarities: List[float] = field(default_factory=list)  # of `documents`, when built from a scored retrieval
+    chunk_ids: List[str] = field(default_factory=list)
+    tokens: int = 0        # estimated tokens of `text`
+    raw_tokens: int = 0    # estimated tokens of the plain join of all chunks
+    dropped: int = 0       # chunks left out (over budget or fully duplicated)
+    budget: int = 0
+    
+    @property
+    def confidence(self) -> float:
+        """Mean similarity of the chunks in the prompt"""
+        if not self.similarities:
+            return 0.0
+        return sum(self.similarities) / len(self.similarities)
+    
+    def stats(self) -> Dict:
+        return {
+            'tokens': self.tokens,
+            'raw_tokens': self.raw_tokens,
+            'saved_tokens': self.raw_tokens - self.tokens,
+            'chunks': len(self.documents),
+            'dropped': self.dropped,
+            'budget': self.budget
+        }
+
+
+class ContextBuilder:
+    """
+    Packs retrieved chunks into a context under a token budget
+    
+    Chunks arrive best first. Text a chunk shares with an already-packed
+    chunk of the same source (the splitter's CHUNK_OVERLAP) is cut,
+    report boilerplate is stripped, and chunks are added in rank order
+    while they fit; the best chunk is truncated rather than dropped.
+    """
+    
+    def __init__(self, max_tokens: int = None, chars_per_token: float = None, overlap_chars: int = None):
+        self.max_tokens = max_tokens or settings.CONTEXT_MAX_TOKENS
+        self.chars_per_token = chars_per_token or settings.CONTEXT_CHARS_PER_TOKEN
+        # Overlapping spans are at most CHUNK_OVERLAP plus the separator the splitter kept
+        self.overlap_chars = overlap_chars or settings.CHUNK_OVERLAP * 2
+    
+    def _tokens(self, text: str) -> int:
+        return estimate_tokens(text, self.chars_per_token)
+    
+    def _dedupe(self, text: str, packed: List[str]) -> str:
+        """Cut text shared with packed chunks of the same source at either end"""
+        for other in packed:
+            cut = overlap(other, text, self.overlap_chars)
+            if cut:
+                text = text[cut:]
+            cut = overlap(text, other, self.overlap_chars)
+            if cut:
+                text = text[:-cut]
+        return text
+    
+    def build(self, documents: List[Document], similarities: List[float] = None,
+              chunk_ids: List[str] = None) -> Context:
+        """Pack `documents`; their `similarities` and `chunk_ids`, if given, follow the chunks kept"""
+        raw_tokens = self._tokens(SEPARATOR.join(doc.page_content for doc in documents))
+        budget = self.max_tokens
+        
+        parts, used, kept = [], [], []
+        packed: Dict[str, List[str]] = {}  # source -> raw text already in the context
+        tokens = 0
+        for i, doc in enumerate(documents):
+            source = doc.metadata.get('source', '')
+            text = self._dedupe(doc.page_content, packed.get(source, []))
+            text = strip_boilerplate(text)
+            if not text:
+                continue
+            
+            cost = self._tokens(text) + (self._tokens(SEPARATOR) if parts else 0)
+            if tokens + cost > budget:
+                if parts:
+                    continue  # a lower-ranked, shorter chunk may still fit
+                text = text[:int(budget * self.chars_per_token)]
+                cost = self._tokens(text)
+            
+            parts.append(text)
+            used.append(doc)
+            kept.append(i)
+            packed.setdefault(source, []).append(doc.page_content)
+            tokens += cost
+        
+        text = SEPARATOR.join(parts)
+        return Context(
+            text=text,
+            documents=used,
+            similarities=[similarities[i] for i in kept] if similarities else [],
+            chunk_ids=[chunk_ids[i] for i in kept] if chunk_ids else [],
+            tokens=self._tokens(text),
+            raw_tokens=raw_tokens,
+            dropped=len(documents) - len(used),
+            budget=budget
+        )
@@ -1,7 +1,10 @@
 # src/generation/llm_manager.py
 """LLM management"""
-from google import genai  # UPDATED
-from google.genai import types  # UPDATED
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import AsyncIterator, Dict, Iterator, Optional, Set, Tuple
 from ..config.settings import settings
 
 
@@ -15,19 +18,143 @@ class LLMManager:
         if not self.api_key:
             raise ValueError("Google API key not set")
         
-        # Configure client
-        self.client = genai.Client(api_key=self.api_key)
+        # google-genai is imported and the client built on first use (or warmup())
+        self._client = None
+        self._lock = threading.Lock()
         
-        print(f"✓ LLM ready: {self.model_name}")
+        # Single-flight: prompt hash -> the upstream call in progress (shared by sync and async callers)
+        self._in_flight: Dict[str, Future] = {}
+        self._flight_lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        
+        # Stats
+        self.upstream_calls = 0
+        self.coalesced = 0
+    
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from google import genai
+                    self._client = genai.Client(api_key=self.api_key)
+                    print(f"✓ LLM ready: {self.model_name}")
+        return self._client
+    
+    def warmup(self) -> None:
+        """Create the client ahead of the first question"""
+        self.client
+    
+    def _key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{prompt}".encode('utf-8')).hexdigest()
+    
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """The call in flight for this prompt, and whether the caller has to make it"""
+        with self._flight_lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._in_flight[key] = Future()
+            self.upstream_calls += 1
+            return future, True
+    
+    def _land(self, key: str, future: Future, result: Optional[str] = None,
+              error: Optional[BaseException] = None) -> None:
+        """Finish a call: later identical prompts start a new one, waiters get this outcome"""
+        with self._flight_lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
     
     def generate(self, prompt: str) -> str:
-        """Generate response from prompt"""
+        """Generate response from prompt (identical prompts in flight share one call)"""
+        if not settings.LLM_COALESCE:
+            return self._generate(prompt)
+        
+        key = self._key(prompt)
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = self._generate(prompt)
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result)
+        return result
+    
+    async def agenerate(self, prompt: str) -> str:
+        """Generate response from prompt without blocking the event loop (coalesced like generate)"""
+        if not settings.LLM_COALESCE:
+            return await self._agenerate(prompt)
+        
+        key = self._key(prompt)
+        future, leader = self._join(key)
+        if leader:
+            # Runs as its own task so a cancelled caller does not cancel everyone waiting on it
+            task = asyncio.ensure_future(self._agenerate(prompt))
+            self._tasks.add(task)
+            
+            def done(task: asyncio.Task) -> None:
+                self._tasks.discard(task)
+                if task.cancelled():
+                    self._land(key, future, error=asyncio.CancelledError())
+                elif task.exception() is not None:
+                    self._land(key, future, error=task.exception())
+                else:
+                    self._land(key, future, task.result())
+            
+            task.add_done_callback(done)
+        return await asyncio.shield(asyncio.wrap_future(future))
+    
+    def _generate(self, prompt: str) -> str:
         response = self.client.models.generate_content(
             model=self.model_name,
             contents=prompt
         )
         return response.text
     
+    async def _agenerate(self, prompt: str) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents=prompt
+        )
+        return response.text
+    
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """Yield response text chunks as they arrive"""
+        for chunk in self.client.models.generate_content_stream(
+            model=self.model_name,
+            contents=prompt
+        ):
+            if chunk.text:
+                yield chunk.text
+    
+    async def agenerate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Async version of generate_stream"""
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model_name,
+            contents=prompt
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+    
     def get_model(self):
         """Get the LLM client"""
-        return self.client
\ No newline at end of file
+        return self.client
+    
+    def get_stats(self) -> Dict:
+        """Upstream calls made, and calls that shared another caller's result instead"""
+        with self._flight_lock:
+            in_flight = len(self._in_flight)
+        total = self.upstream_calls + self.coalesced
+        return {
+            'upstream_calls': self.upstream_calls,
+            'coalesced': self.coalesced,
+            'coalesced_rate': round(self.coalesced / total, 4) if total else 0.0,
+            'in_flight': in_flight
+        }
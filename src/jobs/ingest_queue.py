@@ -0,0 +1,211 @@
+# src/jobs/ingest_queue.py
+"""Background ingestion jobs"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from ..config.settings import settings
+
+
+@dataclass(eq=False)
+class TickerTask:
+    """Ingestion of one ticker (shared by every job that asked for it)"""
+    ticker: str
+    status: str = "queued"  # queued | running | success | failed
+    error: Optional[str] = None
+    saved: bool = False
+    queued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    
+    @property
+    def done(self) -> bool:
+        return self.status in ("success", "failed") and (self.saved or self.status == "failed")
+    
+    def to_dict(self) -> Dict:
+        return {
+            'ticker': self.ticker,
+            'status': self.status,
+            'error': self.error,
+            'queued_at': self.queued_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'wait_time': round(self.started_at - self.queued_at, 3) if self.started_at else None,
+            'duration': round(self.finished_at - self.started_at, 3) if self.finished_at and self.started_at else None
+        }
+
+
+@dataclass
+class IngestJob:
+    """A submitted ingestion request"""
+    job_id: str
+    tasks: Dict[str, TickerTask]
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    
+    @property
+    def status(self) -> str:
+        statuses = [task.status for task in self.tasks.values()]
+        if self._done.is_set():
+            return "completed"
+        if all(s == "queued" for s in statuses):
+            return "queued"
+        return "running"
+    
+    def wait(self, timeout: float = None) -> bool:
+        """Block until every ticker is ingested and saved"""
+        return self._done.wait(timeout)
+    
+    def to_dict(self) -> Dict:
+        tasks = list(self.tasks.values())
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'duration': round(self.finished_at - self.created_at, 3) if self.finished_at else None,
+            'total': len(tasks),
+            'success_count': sum(t.status == "success" for t in tasks),
+            'failed_count': sum(t.status == "failed" for t in tasks),
+            'successful': [t.ticker for t in tasks if t.status == "success"],
+            'failed': [t.ticker for t in tasks if t.status == "failed"],
+            'tickers': [t.to_dict() for t in tasks]
+        }
+
+
+class IngestJobQueue:
+    """
+    In-process ingestion queue.
+    
+    A dispatcher thread drains everything queued so far into one batch and
+    hands it to RAGPipeline.ingest_multiple_stocks (concurrent fetch, one
+    embedding pass, one FAISS add), then saves the vector store once for
+    the whole batch. A ticker that is already queued or running is not queued
+    again - the new job just tracks the existing task.
+    """
+    
+    def __init__(self, pipeline, max_batch: int = None, history: int = None):
+        self.pipeline = pipeline
+        self.max_batch = max_batch or settings.INGEST_MAX_BATCH
+        self.history = history or settings.INGEST_JOB_HISTORY
+        
+        self._cond = threading.Condition()
+        self._pending: List[TickerTask] = []
+        self._inflight: Dict[str, TickerTask] = {}
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._stopping = False
+        
+        self._dispatcher = threading.Thread(target=self._run, name="rag-ingest-dispatcher", daemon=True)
+        self._dispatcher.start()
+    
+    def submit(self, tickers: List[str]) -> IngestJob:
+        """Queue tickers for ingestion and return the job tracking them"""
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        if not tickers:
+            raise ValueError("No tickers given")
+        
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Ingestion queue is shut down")
+            
+            tasks = {}
+            for ticker in tickers:
+                task = self._inflight.get(ticker)
+                if task is None:
+                    task = TickerTask(ticker)
+                    self._inflight[ticker] = task
+                    self._pending.append(task)
+                tasks[ticker] = task
+            
+            # Same tickers already in flight under one job -> hand back that job
+            for job in reversed(self._jobs.values()):
+                if not job._done.is_set() and job.tasks == tasks:
+                    return job
+            
+            job = IngestJob(job_id=uuid.uuid4().hex[:12], tasks=tasks)
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs.values()))
+                if not oldest._done.is_set():
+                    break
+                self._jobs.popitem(last=False)
+            
+            self._cond.notify()
+            return job
+    
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """Look up a job"""
+        with self._cond:
+            return self._jobs.get(job_id)
+    
+    def list_jobs(self) -> List[IngestJob]:
+        """Recent jobs, newest first"""
+        with self._cond:
+            return list(reversed(self._jobs.values()))
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; finish what is queued"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if wait:
+            self._dispatcher.join()
+    
+    def _run(self) -> None:
+        """Dispatcher loop"""
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            
+            self._run_batch(batch)
+    
+    def _run_batch(self, batch: List[TickerTask]) -> None:
+        print(f"\n📦 Ingestion batch: {len(batch)} tickers")
+        tasks = {task.ticker: task for task in batch}
+        
+        def on_progress(ticker: str, stage: str, error: str = None) -> None:
+            task = tasks[ticker]
+            if stage == 'fetching':
+                task.status, task.started_at = "running", time.time()
+            elif stage in ('failed', 'indexed'):
+                task.status = "success" if stage == 'indexed' else "failed"
+                task.error = error
+                task.finished_at = time.time()
+        
+        # Concurrent fetch, then one embedding batch + FAISS add for the batch
+        try:
+            self.pipeline.ingest_multiple_stocks(list(tasks), on_progress=on_progress)
+        except Exception as e:
+            for task in batch:
+                if task.status not in ("success", "failed"):
+                    task.status, task.error, task.finished_at = "failed", str(e), time.time()
+        
+        # One save for the whole batch
+        saved = False
+        if any(task.status == "success" for task in batch):
+            try:
+                self.pipeline.save_vectorstore()
+                saved = True
+            except Exception as e:
+                print(f"✗ Failed to save vector store: {e}")
+                for task in batch:
+                    if task.status == "success":
+                        task.status, task.error = "failed", f"Save failed: {e}"
+        
+        with self._cond:
+            for task in batch:
+                task.saved = saved
+                self._inflight.pop(task.ticker, None)
+            now = time.time()
+            for job in self._jobs.values():
+                if not job._done.is_set() and all(t.done for t in job.tasks.values()):
+                    job.finished_at = now
+                    job._done.set()
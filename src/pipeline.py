@@ -1,22 +1,33 @@
 """Main RAG Pipeline"""
-from typing import Dict, List, Optional
+import asyncio
+import threading
+import time
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
+from langchain_core.documents import Document
 
 from .config.settings import settings
 from .data_sources.yahoo_finance import YahooFinanceSource
+from .data_sources.metrics_store import MetricsStore, MetricValue
 from .document_processing.loaders import DocumentLoader
 from .document_processing.chunkers import TextChunker
 from .embeddings.embedding_manager import EmbeddingManager
-from .vectorstore.vector_manager import VectorStoreManager
+from .vectorstore.vector_manager import VectorStoreManager, RetrievalResult, SearchFilter
+from .vectorstore.snapshot_watcher import SnapshotWatcher
 from .retrieval.retriever import Retriever
+from .retrieval.metric_router import MetricRouter
+from .retrieval.screener import Screener
 from .generation.llm_manager import LLMManager
 from .generation.answer_generator import AnswerGenerator
+from .generation.answer_cache import AnswerCache
 
 
 class RAGPipeline:
     """Complete RAG Pipeline"""
     
-    def __init__(self, store_name: str = "default", api_key: str = None):
+    def __init__(self, store_name: str = "default", api_key: str = None, read_only: bool = False):
         print("\n" + "="*60)
         print("Initializing RAG Pipeline")
         print("="*60)
@@ -29,24 +40,57 @@ class RAGPipeline:
         self.loader = DocumentLoader()
         self.chunker = TextChunker()
         self.embedding_manager = EmbeddingManager()
-        self.vector_manager = VectorStoreManager(self.embedding_manager, store_name)
+        self.vector_manager = VectorStoreManager(self.embedding_manager, store_name, read_only=read_only)
         self.retriever = Retriever(self.vector_manager)
+        self.metrics_store = MetricsStore(settings.METRICS_DIR / f"{store_name}.parquet")
+        self.metric_router = MetricRouter(self.metrics_store)
+        self.screener = Screener(self.metrics_store)
         self.llm_manager = LLMManager(api_key=self.api_key)
         self.answer_generator = AnswerGenerator(self.llm_manager)
+        self.answer_cache = AnswerCache(
+            max_entries=settings.ANSWER_CACHE_SIZE,
+            max_bytes=settings.ANSWER_CACHE_MAX_BYTES,
+            similarity_threshold=settings.ANSWER_CACHE_SIMILARITY
+        )
+        
+        # Bounded pool for embedding/FAISS work on the async query path
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.QUERY_WORKERS,
+            thread_name_prefix="rag-query"
+        )
+        
+        # Serializes vector store writes (ingest, delete, save)
+        self._write_lock = threading.RLock()
+        
+        # Read-only workers follow the writer's published snapshots
+        self.watcher: Optional[SnapshotWatcher] = None
         
         print("\n✓ RAG Pipeline ready!")
     
     def ingest_stock(self, ticker: str, save_doc: bool = True) -> bool:
         """Ingest stock data"""
+        ticker = ticker.strip().upper()
         print(f"\n{'='*60}")
         print(f"Ingesting {ticker}")
         print('='*60)
         
+        prepared = self.prepare_stock(ticker, save_doc=save_doc)
+        if prepared is None:
+            return False
+        
+        chunks, metrics = prepared
+        self.index_stock(ticker, chunks, metrics)
+        
+        print(f"✓ {ticker} ingested successfully!")
+        return True
+    
+    def prepare_stock(self, ticker: str, save_doc: bool = True) -> Optional[Tuple[List[Document], List[MetricValue]]]:
+        """Fetch, render and chunk a ticker, and extract its metrics (safe to run concurrently)"""
         # Fetch data
         data = self.data_source.fetch_company_data(ticker)
         if not data:
             print("✗ Failed to fetch data")
-            return False
+            return None
         
         # Create document
         doc_text = self.data_source.create_document(data)
@@ -56,86 +100,491 @@ class RAGPipeline:
             filepath = settings.DOCUMENTS_DIR / f"{ticker.replace('.', '_')}_report.txt"
             self.loader.save_text_file(doc_text, str(filepath))
         
-        # Chunk
-        chunks = self.chunker.chunk_text(doc_text, metadata={'source': f"{ticker}_report.txt"})
-        
-        # Add to vector store
-        if self.vector_manager.vectorstore is None:
-            self.vector_manager.create_vectorstore(chunks)
-        else:
-            self.vector_manager.add_documents(chunks)
+        # Chunk (company fields drive filtered retrieval and ticker detection)
+        metadata = {
+            'source': f"{ticker}_report.txt",
+            'ticker': ticker,
+            **self.data_source.company_metadata(data),
+            'report_date': date.today().isoformat()
+        }
+        chunks = self.chunker.chunk_text(doc_text, metadata=metadata)
         
-        print(f"✓ {ticker} ingested successfully!")
-        return True
+        # Structured values for direct metric lookups (stored with the chunks)
+        return chunks, self.data_source.extract_metrics(data)
     
-    def ingest_multiple_stocks(self, tickers: List[str]) -> Dict:
-        """Ingest multiple stocks"""
+    def index_stock(self, ticker: str, chunks: List[Document], metrics: List[MetricValue] = None) -> None:
+        """Embed and store a ticker's chunks and metrics (writes are serialized)"""
+        self.index_stocks({ticker: chunks}, None if metrics is None else {ticker: metrics})
+    
+    def index_stocks(self, chunks_by_ticker: Dict[str, List[Document]],
+                     metrics_by_ticker: Dict[str, List[MetricValue]] = None) -> None:
+        """Embed and store chunks (and metrics) for several tickers in one batch"""
+        with self._write_lock:
+            # Replace any chunks from a previous ingest of these tickers
+            self.vector_manager.upsert_tickers(chunks_by_ticker)
+            
+            # Metrics only once their chunks are in, so both describe the same ingest
+            for ticker, metrics in (metrics_by_ticker or {}).items():
+                self.metrics_store.upsert(ticker, metrics)
+            
+            # Cached answers about these tickers may now be stale
+            for ticker in chunks_by_ticker:
+                self.answer_cache.invalidate_ticker(ticker)
+    
+    def ingest_multiple_stocks(self, tickers: List[str], on_progress: Callable = None) -> Dict:
+        """
+        Ingest multiple stocks
+        
+        Fetching runs concurrently (rate-limited by the data source); all
+        chunks are then embedded in one batch and added to FAISS in one go.
+        `on_progress(ticker, stage, error)` is called with stage
+        'fetching', 'fetched', 'failed' or 'indexed'.
+        """
         print(f"\n{'='*60}")
         print(f"Ingesting {len(tickers)} stocks")
         print('='*60)
         
-        results = {'success': [], 'failed': []}
+        notify = on_progress or (lambda ticker, stage, error=None: None)
+        results = {'success': [], 'failed': [], 'timings': {}}
+        prepared, metrics = {}, {}
         
-        for ticker in tickers:
-            if self.ingest_stock(ticker):
-                results['success'].append(ticker)
+        def fetch(ticker: str) -> Optional[Tuple[List[Document], List[MetricValue]]]:
+            notify(ticker, 'fetching')
+            start = time.time()
+            try:
+                return self.prepare_stock(ticker)
+            finally:
+                results['timings'][ticker] = {'fetch': round(time.time() - start, 3)}
+        
+        # Stage 1: concurrent fetch + render + chunk
+        with ThreadPoolExecutor(max_workers=settings.FETCH_WORKERS, thread_name_prefix="rag-fetch") as pool:
+            futures = {pool.submit(fetch, ticker): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result, error = None, str(e)
+                else:
+                    error = None if result and result[0] else f"Failed to fetch data for {ticker}"
+                
+                if not error:
+                    prepared[ticker], metrics[ticker] = result
+                    notify(ticker, 'fetched')
+                else:
+                    print(f"✗ {ticker}: {error}")
+                    results['failed'].append(ticker)
+                    notify(ticker, 'failed', error)
+        
+        # Stage 2: one embedding pass and one FAISS add for everything fetched
+        if prepared:
+            start = time.time()
+            try:
+                self.index_stocks(prepared, metrics)
+            except Exception as e:
+                for ticker in prepared:
+                    results['failed'].append(ticker)
+                    notify(ticker, 'failed', str(e))
             else:
-                results['failed'].append(ticker)
+                elapsed = round(time.time() - start, 3)
+                for ticker in prepared:
+                    results['success'].append(ticker)
+                    results['timings'][ticker]['index'] = elapsed
+                    notify(ticker, 'indexed')
         
         print(f"\n✓ Success: {len(results['success'])}, Failed: {len(results['failed'])}")
         return results
     
+    def delete_stock(self, ticker: str) -> bool:
+        """Remove a ticker's chunks and report from the system"""
+        ticker = ticker.strip().upper()  # as the ingest queue stores it
+        with self._write_lock:
+            removed = self.vector_manager.delete_ticker(ticker)
+            self.metrics_store.delete(ticker)
+        
+        filepath = settings.DOCUMENTS_DIR / f"{ticker.replace('.', '_')}_report.txt"
+        had_file = filepath.exists()
+        if had_file:
+            filepath.unlink()
+        
+        self.answer_cache.invalidate_ticker(ticker)
+        
+        if not removed and not had_file:
+            return False
+        print(f"✓ {ticker} deleted")
+        return True
+    
     def save_vectorstore(self) -> None:
         """Save vector store to disk"""
-        self.vector_manager.save()
+        with self._write_lock:
+            self.vector_manager.save()
+            self.metrics_store.save()
     
     def load_vectorstore(self) -> bool:
         """Load vector store from disk"""
         try:
-            self.vector_manager.load()
+            with self._write_lock:
+                self.vector_manager.load()
+                self.metrics_store.load()
+                self.answer_cache.clear()
             return True
         except Exception as e:
             print(f"✗ Failed to load: {e}")
             return False
     
-    def query(self, question: str, k: int = 3) -> Dict:
+    def watch_snapshots(self) -> None:
+        """Reload whenever the writer publishes a new snapshot (read-only workers)"""
+        if self.watcher is None:
+            self.watcher = SnapshotWatcher(
+                self.vector_manager.log, self.load_vectorstore, interval=settings.SNAPSHOT_POLL_INTERVAL
+            )
+            self.watcher.start(self.vector_manager.loaded_version)
+    
+    def warmup(self) -> Dict[str, float]:
+        """Load the embedding model and LLM client now instead of on the first question"""
+        timings = {}
+        for name, warm in (('embeddings', self.embedding_manager.warmup), ('llm', self.llm_manager.warmup)):
+            start = time.time()
+            warm()
+            timings[name] = round(time.time() - start, 2)
+        print(f"✓ Warmed up ({timings['embeddings']}s embeddings, {timings['llm']}s LLM)")
+        return timings
+    
+    def query(self, question: str, k: int = 3, nprobe: int = None, ef_search: int = None,
+              search_filter: SearchFilter = None, detect_tickers: bool = True) -> Dict:
         """Query the RAG system"""
-        print(f"\n{'='*60}")
-        print(f"Query: {question}")
-        print('='*60)
+        self._print_query(question)
+        
+        routed = self._metric_answer(question, search_filter, detect_tickers)
+        if routed:
+            return routed
         
-        # Retrieve
-        docs = self.retriever.retrieve(question, k=k)
+        # Retrieve (one embedding, one search)
+        retrieval = self.retriever.retrieve_scored(
+            question, k=k, nprobe=nprobe, ef_search=ef_search,
+            search_filter=search_filter, detect_tickers=detect_tickers
+        )
+        if not retrieval.documents:
+            return self._no_results(question)
         
-        if not docs:
-            return {
+        # Reuse the answer to a near-identical question over the same chunks
+        cached = self._cached_answer(retrieval)
+        if cached:
+            result = cached
+        else:
+            result = self.answer_generator.generate_from_retrieval(retrieval)
+            self._cache_answer(retrieval, result)
+        
+        return self._format_result(question, result, cached=bool(cached))
+    
+    async def aquery(self, question: str, k: int = 3, nprobe: int = None, ef_search: int = None,
+                     search_filter: SearchFilter = None, detect_tickers: bool = True) -> Dict:
+        """Query the RAG system without blocking the event loop"""
+        self._print_query(question)
+        
+        routed = self._metric_answer(question, search_filter, detect_tickers)
+        if routed:
+            return routed
+        
+        # Embedding + FAISS run on the bounded query executor
+        loop = asyncio.get_running_loop()
+        retrieval = await loop.run_in_executor(
+            self.executor, self.retriever.retrieve_scored,
+            question, k, nprobe, ef_search, search_filter, detect_tickers
+        )
+        if not retrieval.documents:
+            return self._no_results(question)
+        
+        cached = self._cached_answer(retrieval)
+        if cached:
+            result = cached
+        else:
+            result = await self.answer_generator.agenerate_from_retrieval(retrieval)
+            self._cache_answer(retrieval, result)
+        
+        return self._format_result(question, result, cached=bool(cached))
+    
+    async def aquery_stream(self, question: str, k: int = 3, nprobe: int = None, ef_search: int = None,
+                            search_filter: SearchFilter = None, detect_tickers: bool = True) -> AsyncIterator[Dict]:
+        """
+        Query the RAG system, streaming the answer.
+        
+        Yields a 'meta' event (sources, confidence of the chunks in the
+        prompt) as soon as the context is packed, then 'token' events as the
+        LLM produces text, then 'done'.
+        """
+        self._print_query(question)
+        
+        routed = self._metric_answer(question, search_filter, detect_tickers)
+        if routed:
+            yield {'event': 'meta', 'data': {k: v for k, v in routed.items() if k != 'answer'}}
+            yield {'event': 'token', 'data': {'text': routed['answer']}}
+            yield {'event': 'done', 'data': {'answer': routed['answer']}}
+            return
+        
+        loop = asyncio.get_running_loop()
+        retrieval = await loop.run_in_executor(
+            self.executor, self.retriever.retrieve_scored,
+            question, k, nprobe, ef_search, search_filter, detect_tickers
+        )
+        if not retrieval.documents:
+            result = self._no_results(question)
+            yield {'event': 'meta', 'data': {k: v for k, v in result.items() if k != 'answer'}}
+            yield {'event': 'token', 'data': {'text': result['answer']}}
+            yield {'event': 'done', 'data': {'answer': result['answer']}}
+            return
+        
+        cached = self._cached_answer(retrieval)
+        if cached:
+            yield {'event': 'meta', 'data': {
                 'question': question,
-                'answer': 'No relevant information found',
-                'sources': [],
-                'confidence': 0.0
-            }
+                **{key: cached[key] for key in ('sources', 'confidence', 'num_docs', 'chunk_ids')},
+                'cached': True
+            }}
+            yield {'event': 'token', 'data': {'text': cached['answer']}}
+            yield {'event': 'done', 'data': {'answer': cached['answer']}}
+            return
         
-        # Generate answer
-        result = self.answer_generator.generate_answer(question, docs)
+        # Meta describes the chunks that actually go into the prompt
+        context = self.answer_generator.build_context(retrieval)
+        result = AnswerGenerator.attach_scores({
+            'sources': AnswerGenerator.extract_sources(context.documents),
+            'num_docs': len(context.documents),
+            'context': context.stats()
+        }, context)
+        yield {'event': 'meta', 'data': {'question': question, **result, 'cached': False}}
         
-        # Get scores
-        docs_with_scores = self.retriever.retrieve_with_scores(question, k=k)
-        scores = [1 - score for _, score in docs_with_scores]
-        avg_score = sum(scores) / len(scores) if scores else 0
+        tokens = []
+        async for token in self.answer_generator.astream_from_context(question, context):
+            tokens.append(token)
+            yield {'event': 'token', 'data': {'text': token}}
         
+        answer = "".join(tokens)
+        self._cache_answer(retrieval, {'answer': answer, **result})
+        yield {'event': 'done', 'data': {'answer': answer}}
+    
+    def query_batch(self, questions: List[str], k: int = 3, nprobe: int = None, ef_search: int = None,
+                    search_filter: SearchFilter = None, detect_tickers: bool = True,
+                    max_concurrency: int = None) -> Dict:
+        """
+        Answer many questions: one embedding batch and one matrix search for
+        retrieval, then at most `max_concurrency` LLM calls in flight.
+        """
+        self._print_batch(questions)
+        start = time.time()
+        
+        retrievals = self.retriever.retrieve_batch(
+            questions, k=k, nprobe=nprobe, ef_search=ef_search,
+            search_filter=search_filter, detect_tickers=detect_tickers
+        )
+        retrieval_time = time.time() - start
+        
+        workers = max_concurrency or settings.BATCH_LLM_CONCURRENCY
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-batch") as pool:
+            results = list(pool.map(self._answer_retrieval, retrievals))
+        
+        return self._batch_result(results, retrieval_time, start)
+    
+    async def aquery_batch(self, questions: List[str], k: int = 3, nprobe: int = None, ef_search: int = None,
+                           search_filter: SearchFilter = None, detect_tickers: bool = True,
+                           max_concurrency: int = None) -> Dict:
+        """Async version of query_batch (LLM calls are awaited under a semaphore)"""
+        self._print_batch(questions)
+        start = time.time()
+        
+        loop = asyncio.get_running_loop()
+        retrievals = await loop.run_in_executor(
+            self.executor, self.retriever.retrieve_batch,
+            questions, k, nprobe, ef_search, search_filter, detect_tickers
+        )
+        retrieval_time = time.time() - start
+        
+        semaphore = asyncio.Semaphore(max_concurrency or settings.BATCH_LLM_CONCURRENCY)
+        
+        async def answer(retrieval: RetrievalResult) -> Dict:
+            async with semaphore:
+                started = time.time()
+                try:
+                    if not retrieval.documents:
+                        return self._timed(self._no_results(retrieval.query), started)
+                    cached = self._cached_answer(retrieval)
+                    if cached:
+                        result = cached
+                    else:
+                        result = await self.answer_generator.agenerate_from_retrieval(retrieval)
+                        self._cache_answer(retrieval, result)
+                    return self._timed(self._format_result(retrieval.query, result, cached=bool(cached)), started)
+                except Exception as e:
+                    return self._timed(self._failed(retrieval.query, e), started)
+        
+        results = await asyncio.gather(*(answer(retrieval) for retrieval in retrievals))
+        return self._batch_result(list(results), retrieval_time, start)
+    
+    def screen(self, where: str = "", sort_by: str = None, limit: int = 20, columns: List[str] = None,
+               search_filter: SearchFilter = None) -> Dict:
+        """
+        Screen every ingested company on its latest metrics, e.g.
+        screen("roe > 20% and debt_to_equity < 1", sort_by="pe")
+        
+        search_filter (tickers, sectors, industries) narrows the universe;
+        raises ValueError for expressions it cannot parse.
+        """
+        start = time.time()
+        companies = self.vector_manager.get_companies()
+        universe = None
+        if search_filter is not None and not search_filter.is_empty():
+            universe = [ticker for ticker, company in companies.items() if search_filter.matches(ticker, company)]
+        
+        result = self.screener.screen(where, sort_by=sort_by, limit=limit, columns=columns, tickers=universe)
+        for row in result['results']:
+            company = companies.get(row['ticker'], {})
+            row['company'] = company.get('company', row['ticker'])
+            row['sector'] = company.get('sector')
+        result['response_time'] = round(time.time() - start, 4)
+        
+        print(f"✓ Screen matched {result['matched']}/{result['total']} companies")
+        return result
+    
+    def _answer_retrieval(self, retrieval: RetrievalResult) -> Dict:
+        """Answer one question of a batch from its retrieval (errors are returned, not raised)"""
+        started = time.time()
+        try:
+            if not retrieval.documents:
+                return self._timed(self._no_results(retrieval.query), started)
+            cached = self._cached_answer(retrieval)
+            if cached:
+                result = cached
+            else:
+                result = self.answer_generator.generate_from_retrieval(retrieval)
+                self._cache_answer(retrieval, result)
+            return self._timed(self._format_result(retrieval.query, result, cached=bool(cached)), started)
+        except Exception as e:
+            return self._timed(self._failed(retrieval.query, e), started)
+    
+    @staticmethod
+    def _print_batch(questions: List[str]) -> None:
+        print(f"\n{'='*60}")
+        print(f"Batch query: {len(questions)} questions")
+        print('='*60)
+    
+    @staticmethod
+    def _timed(result: Dict, started: float) -> Dict:
+        result['response_time'] = round(time.time() - started, 3)
+        return result
+    
+    @classmethod
+    def _failed(cls, question: str, error: Exception) -> Dict:
+        print(f"✗ {question}: {error}")
+        return {**cls._no_results(question), 'answer': '', 'error': str(error)}
+    
+    @staticmethod
+    def _batch_result(results: List[Dict], retrieval_time: float, start: float) -> Dict:
+        total = time.time() - start
+        failed = sum(1 for result in results if result.get('error'))
+        print(f"\n✓ Answered {len(results) - failed}/{len(results)} questions in {total:.2f}s")
+        return {
+            'results': results,
+            'timings': {
+                'retrieval': round(retrieval_time, 3),
+                'generation': round(total - retrieval_time, 3),
+                'total': round(total, 3)
+            }
+        }
+    
+    @staticmethod
+    def _print_query(question: str) -> None:
+        print(f"\n{'='*60}")
+        print(f"Query: {question}")
+        print('='*60)
+    
+    @staticmethod
+    def _no_results(question: str) -> Dict:
+        return {
+            'question': question,
+            'answer': 'No relevant information found',
+            'sources': [],
+            'confidence': 0.0,
+            'num_docs': 0,
+            'cached': False
+        }
+    
+    def _metric_answer(self, question: str, search_filter: Optional[SearchFilter],
+                       detect_tickers: bool) -> Optional[Dict]:
+        """Answer a direct metric lookup about one company from the metrics table (no retrieval, no LLM)"""
+        if not settings.METRICS_ROUTER or not len(self.metrics_store):
+            return None
+        if search_filter is not None and not search_filter.is_empty():
+            tickers = [ticker.upper() for ticker in search_filter.tickers or []]
+        else:
+            tickers = self.retriever.detect_tickers(question) if detect_tickers else []
+        if len(tickers) != 1:
+            return None
+        
+        value = self.metric_router.route(question, tickers[0])
+        if value is None:
+            return None
+        
+        company = self.vector_manager.get_companies().get(value.ticker, {}).get('company', value.ticker)
+        print(f"✓ Answered from metrics table: {value.ticker} {value.metric} ({value.period})")
+        return {
+            'question': question,
+            'answer': MetricRouter.describe(value, company),
+            'sources': [value.source],
+            'confidence': 1.0,
+            'num_docs': 0,
+            'chunk_ids': [],
+            'cached': False,
+            'route': 'metrics'
+        }
+    
+    def _cached_answer(self, retrieval: RetrievalResult) -> Optional[Dict]:
+        """Cached answer for a near-identical question over the same chunks"""
+        if not settings.ANSWER_CACHE_ENABLED:
+            return None
+        cached = self.answer_cache.lookup(retrieval.query_vector, retrieval.chunk_ids)
+        if cached:
+            print("✓ Answer served from cache")
+        return cached
+    
+    def _cache_answer(self, retrieval: RetrievalResult, result: Dict) -> None:
+        if settings.ANSWER_CACHE_ENABLED:
+            self.answer_cache.store(
+                retrieval.query_vector, retrieval.chunk_ids, retrieval.tickers, result
+            )
+    
+    @staticmethod
+    def _format_result(question: str, result: Dict, cached: bool) -> Dict:
         return {
             'question': question,
             'answer': result['answer'],
             'sources': result['sources'],
-            'confidence': avg_score,
-            'num_docs': result['num_docs']
+            'confidence': result['confidence'],
+            'num_docs': result['num_docs'],
+            'chunk_ids': result['chunk_ids'],
+            'cached': cached,
+            'context': result.get('context')  # token accounting of the prompt
         }
     
+    def close(self) -> None:
+        """Flush pending vector store writes and release worker threads"""
+        if self.watcher is not None:
+            self.watcher.stop()
+        with self._write_lock:
+            self.vector_manager.close()
+        self.executor.shutdown(wait=True)
+        self.embedding_manager.close()
+    
     def get_stats(self) -> Dict:
         """Get pipeline statistics"""
         return {
             'store_name': self.store_name,
             'num_documents': self.vector_manager.get_count(),
+            'index': self.vector_manager.get_index_info(),
             'embedding_model': self.embedding_manager.model_name,
-            'llm_model': self.llm_manager.model_name
+            'llm_model': self.llm_manager.model_name,
+            'query_cache': self.embedding_manager.get_stats()['query_cache'],
+            'micro_batch': self.embedding_manager.get_stats()['micro_batch'],
+            'metrics': {**self.metrics_store.get_stats(), **self.metric_router.get_stats()},
+            'answer_cache': self.answer_cache.get_stats(),
+            'llm': self.llm_manager.get_stats()
         }
\ No newline at end of file
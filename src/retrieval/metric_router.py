@@ -0,0 +1,218 @@
+"""Routes direct metric lookups to the metrics store instead of RAG"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from ..data_sources.metrics_store import MetricsStore, MetricValue
+
+
+# Question phrases -> stored metric names, in order of preference
+# (company info first, so "TCS revenue" is the TTM figure, not one quarter)
+METRIC_ALIASES: List[Tuple[Tuple[str, ...], Tuple[str, ...]]] = [
+    (("revenue", "revenues", "total revenue", "sales", "turnover", "top line", "topline"),
+     ("Revenue (TTM)", "Total Revenue")),
+    (("net profit", "net income", "profit after tax", "pat", "profit", "earnings", "bottom line"),
+     ("Net Income", "Net Income Common Stockholders")),
+    (("operating income", "operating profit"), ("Operating Income",)),
+    (("ebitda",), ("EBITDA", "Normalized EBITDA")),
+    (("gross profit",), ("Gross Profit",)),
+    (("eps", "earnings per share"), ("EPS", "Diluted EPS", "Basic EPS")),
+    (("p/e", "p/e ratio", "pe ratio", "pe", "price to earnings", "price-to-earnings"), ("P/E Ratio",)),
+    (("net profit margin", "profit margin", "net margin"), ("Net Profit Margin",)),
+    (("operating margin",), ("Operating Margin",)),
+    (("return on equity", "roe"), ("Return on Equity",)),
+    (("debt to equity", "debt-to-equity", "debt/equity", "d/e"), ("Debt to Equity",)),
+    (("current ratio",), ("Current Ratio",)),
+    (("market cap", "market capitalization", "market capitalisation", "mcap"), ("Market Cap",)),
+    (("employees", "headcount", "employee count", "number of employees"), ("Employees",)),
+    (("total assets", "assets"), ("Total Assets",)),
+    (("total debt", "debt"), ("Total Debt",)),
+    (("cash", "cash and cash equivalents"), ("Cash And Cash Equivalents",)),
+    (("shareholders equity", "shareholders' equity", "stockholders equity", "net worth", "book value"),
+     ("Stockholders Equity", "Common Stock Equity")),
+]
+
+ALIAS_LOOKUP = {alias: metrics for aliases, metrics in METRIC_ALIASES for alias in aliases}
+
+# Longest first, so "net profit margin" is not read as "net profit"
+METRIC_PATTERN = re.compile(
+    r"(?<![\w/])(" + "|".join(
+        r"\s+".join(re.escape(word) for word in alias.split())
+        for alias in sorted(ALIAS_LOOKUP, key=len, reverse=True)
+    ) + r")(?![\w/])",
+    re.IGNORECASE
+)
+
+MONTHS = {month: i for i, month in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1
+)}
+MONTH_PATTERN = re.compile(
+    r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s*'?(\d{4}|\d{2})\b", re.IGNORECASE
+)
+# "Q2 FY26" (Indian fiscal year, ends in March) or calendar "Q3 2025"
+QUARTER_PATTERN = re.compile(r"\bq([1-4])\s*(fy)?\s*'?(\d{4}|\d{2})\b", re.IGNORECASE)
+LATEST_PATTERN = re.compile(
+    r"\b(?:latest|last|recent|most\s+recent|previous|this)\s+quarter(?:ly)?\b|\bquarterly\b", re.IGNORECASE
+)
+TTM_PATTERN = re.compile(r"\b(?:ttm|ltm|trailing(?:\s+twelve\s+months)?|last\s+twelve\s+months)\b", re.IGNORECASE)
+# Any period left over that the table cannot answer exactly (fiscal years, bare years)
+OTHER_PERIOD_PATTERN = re.compile(r"\b(?:fy\s*'?\d{2,4}|(?:19|20)\d{2}|h[12]|half)\b", re.IGNORECASE)
+
+# Anything analytical, comparative or multi-period goes through RAG
+REJECT_PATTERN = re.compile(
+    r"\b(?:why|how(?!\s+(?:much|many))|compare[ds]?|comparison|versus|vs|trend|trends|change[ds]?|growth|grow|grew|"
+    r"increase[ds]?|decrease[ds]?|decline[ds]?|explain|analy[sz]e|should|outlook|forecast|predict|between|"
+    r"history|historical|over|each|all|quarters|years|average|highest|lowest|best|worst|rank|summar(?:y|ize|ise))\b",
+    re.IGNORECASE
+)
+MAX_WORDS = 16
+
+# Words that, right before or after a metric alias, make it a different
+# metric the table does not hold ("free cash flow", "net debt", "profit
+# before tax", "revenue per employee", "forward P/E")
+PREFIX_QUALIFIERS = {
+    "free", "operating", "net", "gross", "current", "non-current", "noncurrent", "long-term", "short-term",
+    "forward", "fwd", "projected", "expected", "estimated", "adjusted", "core", "segment", "other",
+    "interest", "pre-tax", "pretax", "average", "incremental",
+}
+SUFFIX_QUALIFIERS = {
+    "flow", "flows", "per", "before", "margin", "margins", "ratio", "yield", "coverage", "to", "from",
+    "burn", "multiple", "estimate", "estimates", "guidance", "target", "conversion", "generation",
+}
+WORD_BEFORE = re.compile(r"([\w/-]+)[^\w/-]*$")
+WORD_AFTER = re.compile(r"^[^\w/-]*([\w/-]+)")
+
+STATEMENT_LABELS = {
+    'info': "company profile",
+    'financials': "quarterly financials",
+    'balance_sheet': "quarterly balance sheet",
+}
+
+
+@dataclass
+class MetricQuery:
+    """A parsed single-metric question"""
+    metrics: Tuple[str, ...]            # candidate stored metric names
+    period_end: Optional[str] = None    # 'YYYY-MM' of the quarter asked about
+    quarterly: Optional[bool] = None    # True: a quarter's figure, False: TTM/current
+
+
+def parse_period(question: str) -> Tuple[Optional[str], Optional[bool], bool]:
+    """(period_end 'YYYY-MM', quarterly, understood) for the period named in a question"""
+    def full_year(year: str) -> int:
+        return int(year) if len(year) == 4 else 2000 + int(year)
+    
+    match = MONTH_PATTERN.search(question)
+    if match:
+        rest = question[:match.start()] + question[match.end():]
+        period = f"{full_year(match.group(2)):04d}-{MONTHS[match.group(1).lower()]:02d}"
+        return period, True, not OTHER_PERIOD_PATTERN.search(rest)
+    
+    match = QUARTER_PATTERN.search(question)
+    if match:
+        rest = question[:match.start()] + question[match.end():]
+        quarter, year = int(match.group(1)), full_year(match.group(3))
+        if match.group(2):
+            # Q1 FY26 = Apr-Jun 2025 ... Q4 FY26 = Jan-Mar 2026
+            month = quarter * 3 + 3
+            year, month = (year - 1, month) if month <= 12 else (year, month - 12)
+        else:
+            month = quarter * 3
+        return f"{year:04d}-{month:02d}", True, not OTHER_PERIOD_PATTERN.search(rest)
+    
+    if OTHER_PERIOD_PATTERN.search(question):
+        return None, None, False
+    if LATEST_PATTERN.search(question):
+        return None, True, True
+    if TTM_PATTERN.search(question):
+        return None, False, True
+    return None, None, True
+
+
+def format_value(value: MetricValue) -> str:
+    """A value in the units the reports use"""
+    if value.unit == 'INR':
+        if abs(value.value) >= 1e7:
+            return f"₹{value.value / 10000000:,.2f} Cr"
+        return f"₹{value.value:,.2f}"
+    if value.unit == 'INR/share':
+        return f"₹{value.value:,.2f}"
+    if value.unit == 'percent':
+        return f"{value.value:.2%}"
+    if value.unit == 'count':
+        return f"{value.value:,.0f}"
+    return f"{value.value:,.2f}"
+
+
+class MetricRouter:
+    """
+    Answers single-company, single-metric questions ("What was TCS's net
+    profit in Sep 2025?") from the metrics store
+    
+    Anything it does not fully understand - several metrics, an unknown
+    period, comparisons or explanations - is left to RAG.
+    """
+    
+    def __init__(self, store: MetricsStore):
+        self.store = store
+        
+        # Stats
+        self.routed = 0
+        self.missed = 0  # understood, but the value is not in the table
+    
+    def parse(self, question: str) -> Optional[MetricQuery]:
+        """The metric and period asked about, or None if this is not a direct lookup"""
+        if len(question.split()) > MAX_WORDS or REJECT_PATTERN.search(question):
+            return None
+        
+        matches = list(METRIC_PATTERN.finditer(question))
+        if any(self._qualified(question, match) for match in matches):
+            return None
+        metrics = {ALIAS_LOOKUP[" ".join(match.group(1).lower().split())] for match in matches}
+        if len(metrics) != 1:
+            return None
+        
+        period_end, quarterly, understood = parse_period(question)
+        if not understood:
+            return None
+        return MetricQuery(metrics=metrics.pop(), period_end=period_end, quarterly=quarterly)
+    
+    @staticmethod
+    def _qualified(question: str, match: re.Match) -> bool:
+        """Whether the alias is part of a longer metric name ("free cash flow")"""
+        before = WORD_BEFORE.search(question[:match.start()])
+        after = WORD_AFTER.search(question[match.end():])
+        return bool(
+            (before and before.group(1).lower() in PREFIX_QUALIFIERS)
+            or (after and after.group(1).lower() in SUFFIX_QUALIFIERS)
+        )
+    
+    def route(self, question: str, ticker: str) -> Optional[MetricValue]:
+        """The stored value answering a direct lookup about one company"""
+        query = self.parse(question)
+        if query is None:
+            return None
+        
+        for metric in query.metrics:
+            value = self.store.lookup(ticker, metric, period_end=query.period_end, quarterly=query.quarterly)
+            if value is not None:
+                self.routed += 1
+                return value
+        self.missed += 1
+        return None
+    
+    @staticmethod
+    def describe(value: MetricValue, company: str) -> str:
+        """One-line answer with its provenance"""
+        if value.is_quarterly():
+            period = f"quarter ended {value.period}"
+        else:
+            period = "trailing twelve months" if value.period == 'TTM' else "latest reported"
+        label = value.metric if f"({value.period})" in value.metric else f"{value.metric} ({period})"
+        statement = STATEMENT_LABELS.get(value.statement, value.statement)
+        return (
+            f"{company} {label}: {format_value(value)}.\n"
+            f"Source: {value.source} (Yahoo Finance {statement}, as of {value.as_of})"
+        )
+    
+    def get_stats(self) -> Dict:
+        return {'routed': self.routed, 'missed': self.missed}
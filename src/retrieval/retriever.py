@@ -1,8 +1,9 @@
-
 """Document retrieval"""
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from langchain_core.documents import Document
-from ..vectorstore.vector_manager import VectorStoreManager
+from ..config.settings import settings
+from ..vectorstore.vector_manager import VectorStoreManager, RetrievalResult, SearchFilter
+from .ticker_detector import TickerDetector
 
 
 class Retriever:
@@ -10,17 +11,57 @@ class Retriever:
     
     def __init__(self, vector_manager: VectorStoreManager):
         self.vector_manager = vector_manager
+        self.detector = TickerDetector()
+    
+    def resolve_filter(self, query: str, search_filter: SearchFilter = None,
+                       detect_tickers: bool = True) -> Optional[SearchFilter]:
+        """Explicit filter, else one restricted to companies named in the query"""
+        if search_filter is not None and not search_filter.is_empty():
+            return search_filter
+        if not (detect_tickers and settings.AUTO_TICKER_FILTER):
+            return None
+        
+        tickers = self.detect_tickers(query)
+        if not tickers:
+            return None
+        print(f"✓ Restricting search to: {', '.join(tickers)}")
+        return SearchFilter(tickers=tickers)
+    
+    def detect_tickers(self, query: str) -> List[str]:
+        """Ingested companies named in the query"""
+        self.detector.refresh(self.vector_manager.get_companies(), self.vector_manager.registry_version)
+        return self.detector.detect(query)
+    
+    def retrieve_scored(self, query: str, k: int = 3, nprobe: int = None, ef_search: int = None,
+                        search_filter: SearchFilter = None, detect_tickers: bool = True) -> RetrievalResult:
+        """Retrieve documents, distances, similarities and chunk ids in one pass"""
+        print(f"Retrieving {k} documents for query...")
+        search_filter = self.resolve_filter(query, search_filter, detect_tickers)
+        result = self.vector_manager.search(
+            query, k=k, nprobe=nprobe, ef_search=ef_search, search_filter=search_filter
+        )
+        print(f"✓ Retrieved {len(result)} documents")
+        return result
+    
+    def retrieve_batch(self, queries: List[str], k: int = 3, nprobe: int = None, ef_search: int = None,
+                       search_filter: SearchFilter = None, detect_tickers: bool = True) -> List[RetrievalResult]:
+        """Retrieve for many queries with one embedding batch and one matrix search per filter"""
+        print(f"Retrieving {k} documents for {len(queries)} queries...")
+        if not self.vector_manager.vectorstore:
+            raise ValueError("Vector store not initialized")
+        
+        search_filters = [self.resolve_filter(query, search_filter, detect_tickers) for query in queries]
+        vectors = self.vector_manager.embedding_manager.embed_query_vectors(queries)
+        results = self.vector_manager.search_by_vectors(
+            queries, vectors, k, nprobe=nprobe, ef_search=ef_search, search_filters=search_filters
+        )
+        print(f"✓ Retrieved {sum(len(result) for result in results)} documents")
+        return results
     
     def retrieve(self, query: str, k: int = 3) -> List[Document]:
         """Retrieve relevant documents"""
-        print(f"Retrieving {k} documents for query...")
-        docs = self.vector_manager.similarity_search(query, k=k)
-        print(f"✓ Retrieved {len(docs)} documents")
-        return docs
+        return self.retrieve_scored(query, k=k).documents
     
     def retrieve_with_scores(self, query: str, k: int = 3) -> List[Tuple[Document, float]]:
         """Retrieve with similarity scores"""
-        print(f"Retrieving {k} documents with scores...")
-        results = self.vector_manager.similarity_search_with_score(query, k=k)
-        print(f"✓ Retrieved {len(results)} documents")
-        return results
\ No newline at end of file
+        return self.retrieve_scored(query, k=k).with_scores()
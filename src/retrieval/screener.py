@@ -0,0 +1,178 @@
+"""Cross-company screening over the metrics table"""
+import operator
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from ..data_sources.metrics_store import MetricsStore
+
+
+# Short field names -> stored metric names (any metric is also available as its snake_case name)
+SCREEN_FIELDS = {
+    'revenue': 'Revenue (TTM)',
+    'net_margin': 'Net Profit Margin',
+    'profit_margin': 'Net Profit Margin',
+    'operating_margin': 'Operating Margin',
+    'roe': 'Return on Equity',
+    'debt_to_equity': 'Debt to Equity',
+    'de': 'Debt to Equity',
+    'd/e': 'Debt to Equity',
+    'current_ratio': 'Current Ratio',
+    'pe': 'P/E Ratio',
+    'p/e': 'P/E Ratio',
+    'eps': 'EPS',
+    'market_cap': 'Market Cap',
+    'mcap': 'Market Cap',
+    'employees': 'Employees',
+    'quarterly_revenue': 'Total Revenue',
+    'net_income': 'Net Income',
+    'net_profit': 'Net Income',
+    'total_assets': 'Total Assets',
+    'total_debt': 'Total Debt',
+    'cash': 'Cash And Cash Equivalents',
+    'equity': 'Stockholders Equity',
+}
+
+OPERATORS: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    '>=': operator.ge, '<=': operator.le, '!=': operator.ne,
+    '==': operator.eq, '=': operator.eq, '>': operator.gt, '<': operator.lt,
+}
+
+# Number with an optional unit: 20% -> 0.2, 500cr -> 5e9 (INR crore), 2.5l -> 250000 (lakh)
+NUMBER_PATTERN = re.compile(r"^([-+]?\d+(?:\.\d+)?(?:e[-+]?\d+)?)\s*(%|cr|crore|l|lakh|k)?$", re.IGNORECASE)
+UNITS = {'%': 0.01, 'cr': 1e7, 'crore': 1e7, 'l': 1e5, 'lakh': 1e5, 'k': 1e3}
+
+CONDITION_PATTERN = re.compile(r"^(.+?)\s*(>=|<=|!=|==|=|>|<)\s*(.+)$")
+
+
+def snake_case(metric: str) -> str:
+    """'Net Income Common Stockholders' -> 'net_income_common_stockholders'"""
+    return re.sub(r"[^a-z0-9]+", "_", metric.lower()).strip("_")
+
+
+@dataclass
+class Condition:
+    """field op (number | field)"""
+    field: str
+    op: str
+    value: Union[float, str]
+
+
+def parse_where(where: str) -> List[List[Condition]]:
+    """
+    "roe > 20% and debt_to_equity < 1 or pe < 15" as OR-ed groups of AND-ed
+    conditions (and binds tighter; commas also mean and)
+    """
+    groups = []
+    for group in re.split(r"\s+or\s+", where.strip(), flags=re.IGNORECASE):
+        conditions = []
+        for part in re.split(r"\s+and\s+|\s*,\s*|\s*&&?\s*", group, flags=re.IGNORECASE):
+            if not part.strip():
+                continue
+            match = CONDITION_PATTERN.match(part.strip())
+            if not match:
+                raise ValueError(f"Cannot parse condition {part.strip()!r} (expected e.g. 'roe > 20%')")
+            field, op, value = match.group(1).strip().lower(), match.group(2), match.group(3).strip()
+            number = NUMBER_PATTERN.match(value)
+            if number:
+                value = float(number.group(1)) * UNITS.get((number.group(2) or '').lower(), 1.0)
+            else:
+                value = value.lower()
+            conditions.append(Condition(field, op, value))
+        if conditions:
+            groups.append(conditions)
+    return groups
+
+
+def parse_sort(sort_by: str) -> Tuple[str, bool]:
+    """("pe", ascending) from "pe", "pe asc", "-market_cap" or "market_cap desc" """
+    sort_by = sort_by.strip().lower()
+    if sort_by.startswith('-'):
+        return sort_by[1:].strip(), False
+    words = sort_by.split()
+    if len(words) == 2 and words[1] in ('asc', 'desc'):
+        return words[0], words[1] == 'asc'
+    return sort_by, True
+
+
+class Screener:
+    """
+    Filters and ranks every company in the metrics table at once
+    
+    Conditions and sorting run as NumPy operations over whole metric
+    columns (newest value per company), so a screen over thousands of
+    tickers costs a few array passes. Companies missing a metric fail
+    conditions on it and sort last.
+    """
+    
+    def __init__(self, store: MetricsStore):
+        self.store = store
+    
+    def fields(self, table: pd.DataFrame = None) -> Dict[str, str]:
+        """Usable field names -> metric column"""
+        table = self.store.latest() if table is None else table
+        fields = {snake_case(metric): metric for metric in table.columns}
+        fields.update(SCREEN_FIELDS)
+        return fields
+    
+    @staticmethod
+    def _column(table: pd.DataFrame, fields: Dict[str, str], name: str) -> np.ndarray:
+        if name not in fields:
+            raise ValueError(f"Unknown field {name!r} (e.g. {', '.join(sorted(SCREEN_FIELDS))})")
+        if fields[name] not in table.columns:
+            return np.full(len(table), np.nan)  # no company reports it
+        return table[fields[name]].to_numpy(dtype=float)
+    
+    def screen(self, where: str = "", sort_by: str = None, limit: int = 20,
+               columns: List[str] = None, tickers: Optional[np.ndarray] = None) -> Dict:
+        """
+        Companies matching `where`, ordered by `sort_by`
+        
+        `tickers` (optional) restricts the universe, e.g. to one sector.
+        Each result carries the fields used in the screen plus `columns`.
+        """
+        table = self.store.latest()
+        fields = self.fields(table)
+        if tickers is not None:
+            table = table[table.index.isin(tickers)]
+        groups = parse_where(where) if where else []
+        sort_field, ascending = parse_sort(sort_by) if sort_by else (None, True)
+        
+        mask = np.zeros(len(table), dtype=bool) if groups else np.ones(len(table), dtype=bool)
+        used = []
+        with np.errstate(invalid='ignore'):
+            for group in groups:
+                group_mask = np.ones(len(table), dtype=bool)
+                for condition in group:
+                    left = self._column(table, fields, condition.field)
+                    if isinstance(condition.value, str):
+                        right = self._column(table, fields, condition.value)
+                        used.append(condition.value)
+                    else:
+                        right = condition.value
+                    group_mask &= OPERATORS[condition.op](left, right)
+                    used.append(condition.field)
+                mask |= group_mask
+        
+        rows = np.flatnonzero(mask)
+        if sort_field:
+            keys = self._column(table, fields, sort_field)[rows]
+            # NaN sorts last either way
+            order = np.argsort(keys if ascending else -keys, kind='stable')
+            rows = rows[order]
+            used.append(sort_field)
+        matched = len(rows)
+        rows = rows[:limit] if limit else rows
+        
+        requested = [column.strip().lower() for column in columns or []]
+        shown = list(dict.fromkeys(used + [c if c in fields else snake_case(c) for c in requested]))
+        values = {name: self._column(table, fields, name)[rows] for name in shown}
+        results = [
+            {
+                'ticker': ticker,
+                'values': {name: (None if np.isnan(values[name][i]) else float(values[name][i])) for name in shown}
+            }
+            for i, ticker in enumerate(table.index[rows])
+        ]
+        return {'results': results, 'matched': matched, 'total': len(table), 'fields': shown}
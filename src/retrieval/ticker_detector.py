@@ -0,0 +1,87 @@
+"""Company / ticker mention detection"""
+import re
+import threading
+from typing import Dict, List, Optional
+
+
+# Dropped from company names so "HDFC Bank" matches "HDFC Bank Limited"
+NAME_SUFFIXES = (
+    "limited", "ltd", "ltd.", "inc", "inc.", "corporation", "corp", "corp.",
+    "company", "co", "co.", "plc", "group"
+)
+
+MIN_ALIAS_LENGTH = 3
+
+
+def company_aliases(ticker: str, company: dict) -> Dict[str, bool]:
+    """alias -> case_sensitive for one company (symbols match as written, names case-insensitively)"""
+    aliases = {ticker: True}
+    symbol = ticker.split('.')[0]
+    if len(symbol) >= MIN_ALIAS_LENGTH:
+        aliases.setdefault(symbol, True)
+    
+    name = (company.get('company') or '').strip()
+    if name and name != ticker:
+        aliases[name] = False
+        words = name.split()
+        while len(words) > 1 and words[-1].lower().strip(',') in NAME_SUFFIXES:
+            words = words[:-1]
+        short = " ".join(words).rstrip(',')
+        if len(short) >= MIN_ALIAS_LENGTH:
+            aliases.setdefault(short, False)
+    return aliases
+
+
+class TickerDetector:
+    """Finds ingested companies mentioned in a question with one compiled regex"""
+    
+    def __init__(self):
+        self._pattern: Optional[re.Pattern] = None
+        self._lookup: Dict[str, str] = {}
+        self._version = None
+        self._lock = threading.Lock()
+    
+    def refresh(self, companies: Dict[str, dict], version: int) -> None:
+        """Rebuild the matcher when the company registry has changed"""
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            
+            lookup = {}
+            exact, folded = [], []
+            for ticker, company in companies.items():
+                for alias, case_sensitive in company_aliases(ticker, company).items():
+                    lookup[alias if case_sensitive else alias.lower()] = ticker
+                    (exact if case_sensitive else folded).append(alias)
+            
+            def alternation(aliases: List[str]) -> str:
+                # Longest first, so "HDFC Bank" wins over "HDFC"
+                return "|".join(
+                    r"\s+".join(re.escape(word) for word in alias.split())
+                    for alias in sorted(set(aliases), key=len, reverse=True)
+                )
+            
+            parts = []
+            if exact:
+                parts.append(alternation(exact))
+            if folded:
+                parts.append(f"(?i:{alternation(folded)})")
+            self._pattern = re.compile(rf"(?<![\w.])(?:{'|'.join(parts)})(?![\w])") if parts else None
+            self._lookup = lookup
+            self._version = version
+    
+    def detect(self, question: str) -> List[str]:
+        """Tickers mentioned in the question, in order of first mention"""
+        pattern, lookup = self._pattern, self._lookup
+        if pattern is None:
+            return []
+        
+        tickers = []
+        for match in pattern.finditer(question):
+            text = " ".join(match.group(0).split())
+            ticker = lookup.get(text) or lookup.get(text.lower())
+            if ticker and ticker not in tickers:
+                tickers.append(ticker)
+        return tickers
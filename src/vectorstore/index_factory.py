@@ -0,0 +1,253 @@
+# src/vectorstore/index_factory.py
+"""FAISS index construction, training and search parameters"""
+import math
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from ..config.settings import settings
+
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+# Index type -> store size at which building it failed; no retry until the
+# store has grown by UPGRADE_RETRY_GROWTH (training on the same data fails again)
+_failed_upgrades: Dict[str, int] = {}
+UPGRADE_RETRY_GROWTH = 2
+
+
+def _faiss():
+    import faiss
+    return faiss
+
+
+def is_inner_product(vectorstore: FAISS) -> bool:
+    """Store ranks by inner product over normalized vectors (cosine)"""
+    return vectorstore.distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Unit-length copy of a (n, dim) float32 array"""
+    vectors = np.array(vectors, dtype=np.float32, copy=True)
+    _faiss().normalize_L2(vectors)
+    return vectors
+
+
+def index_kind(index) -> str:
+    """Which of INDEX_TYPES an index is"""
+    faiss = _faiss()
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    ivf = _extract_ivf(index)
+    if ivf is not None:
+        return "ivf_pq" if isinstance(ivf, faiss.IndexIVFPQ) else "ivf_flat"
+    return "flat"
+
+
+def _extract_ivf(index):
+    faiss = _faiss()
+    try:
+        return faiss.downcast_index(faiss.extract_index_ivf(index))
+    except Exception:
+        return None
+
+
+def build_index(index_type: str, vectors: np.ndarray, inner_product: bool = False):
+    """Build (and train, if needed) an index of the given type holding `vectors`"""
+    faiss = _faiss()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type: {index_type} (expected one of {INDEX_TYPES})")
+    
+    n, dim = vectors.shape
+    metric = faiss.METRIC_INNER_PRODUCT if inner_product else faiss.METRIC_L2
+    
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim) if inner_product else faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, settings.FAISS_HNSW_M, metric)
+        index.hnsw.efConstruction = settings.FAISS_HNSW_EF_CONSTRUCTION
+    else:
+        # ~4*sqrt(n) lists, with enough training points per list
+        nlist = settings.FAISS_NLIST or max(1, min(int(4 * math.sqrt(n)), n // 39))
+        quantizer = faiss.IndexFlatIP(dim) if inner_product else faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, metric)
+        else:
+            if dim % settings.FAISS_PQ_M:
+                raise ValueError(f"FAISS_PQ_M={settings.FAISS_PQ_M} must divide the embedding size {dim}")
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, settings.FAISS_PQ_M, settings.FAISS_PQ_BITS, metric)
+        print(f"Training {index_type} index ({nlist} lists) on {n} vectors...")
+        index.train(vectors)
+    
+    if n:
+        index.add(vectors)
+    return index
+
+
+def all_vectors(index) -> np.ndarray:
+    """Every stored vector, in position order (lossy for PQ)"""
+    ivf = _extract_ivf(index)
+    if ivf is not None:
+        # Hashtable map: supports reconstruct without blocking later adds
+        ivf.set_direct_map_type(_faiss().DirectMap.Hashtable)
+    if index.ntotal == 0:
+        return np.empty((0, index.d), dtype=np.float32)
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def target_index_type(count: int) -> str:
+    """Flat until the store passes FAISS_ANN_THRESHOLD, then the configured type"""
+    if count >= settings.FAISS_ANN_THRESHOLD:
+        return settings.FAISS_INDEX_TYPE
+    return "flat"
+
+
+def maybe_upgrade_index(vectorstore: FAISS) -> bool:
+    """Rebuild the index as the configured ANN type once the store is large enough"""
+    current = index_kind(vectorstore.index)
+    target = target_index_type(vectorstore.index.ntotal)
+    if current != "flat" or target == "flat":
+        return False
+    count = vectorstore.index.ntotal
+    if count < _failed_upgrades.get(target, 0) * UPGRADE_RETRY_GROWTH:
+        return False
+    
+    print(f"Switching index: flat -> {target} ({count} vectors)")
+    vectors = all_vectors(vectorstore.index)
+    try:
+        # Positions are preserved, so index_to_docstore_id stays valid
+        vectorstore.index = build_index(target, vectors, inner_product=is_inner_product(vectorstore))
+    except Exception as e:
+        # e.g. too few training points for PQ - keep serving from the flat index
+        _failed_upgrades[target] = count
+        print(f"⚠ Could not build {target} index, staying flat until {count * UPGRADE_RETRY_GROWTH} vectors: {e}")
+        return False
+    _failed_upgrades.pop(target, None)
+    print("✓ Index switched")
+    return True
+
+
+def remove_vectors(vectorstore: FAISS, ids: List[str], delete_documents: bool = True) -> None:
+    """
+    Delete chunks by id (works for index types without remove_ids).
+    Flat and IVF indexes are compacted at once; HNSW positions are only
+    unmapped (soft-deleted) until FAISS_HNSW_MAX_DELETED of the graph is dead.
+    """
+    id_to_position = {chunk_id: position for position, chunk_id in vectorstore.index_to_docstore_id.items()}
+    doomed = {id_to_position[i] for i in ids if i in id_to_position}
+    if not doomed:
+        return
+    
+    if delete_documents:
+        vectorstore.docstore.delete([vectorstore.index_to_docstore_id[p] for p in doomed])
+    
+    kind = index_kind(vectorstore.index)
+    if kind == "hnsw":
+        # HNSW cannot drop nodes and a rebuild costs O(n log n): searches mask the
+        # dead positions instead, and writing a base drops them
+        for position in doomed:
+            del vectorstore.index_to_docstore_id[position]
+        if deleted_fraction(vectorstore) > settings.FAISS_HNSW_MAX_DELETED:
+            vectorstore.index, vectorstore.index_to_docstore_id = rebuild_without_deleted(vectorstore)
+        return
+    
+    if kind == "flat":
+        vectorstore.index.remove_ids(np.fromiter(doomed, dtype=np.int64))
+    else:
+        # IVF keeps old labels on remove_ids, so re-add the surviving vectors
+        # to keep positions contiguous
+        vectors = all_vectors(vectorstore.index)
+        keep = np.array([p for p in range(vectorstore.index.ntotal) if p not in doomed], dtype=np.int64)
+        vectorstore.index.reset()  # keeps the trained quantizer
+        vectorstore.index.add(vectors[keep])
+    
+    remaining = [chunk_id for p, chunk_id in sorted(vectorstore.index_to_docstore_id.items()) if p not in doomed]
+    vectorstore.index_to_docstore_id = dict(enumerate(remaining))
+
+
+def deleted_positions(vectorstore: FAISS) -> np.ndarray:
+    """Soft-deleted positions: still in the (HNSW) index, no longer mapped to a chunk"""
+    total = vectorstore.index.ntotal
+    if total == len(vectorstore.index_to_docstore_id):
+        return np.empty(0, dtype=np.int64)
+    dead = np.ones(total, dtype=bool)
+    dead[np.fromiter(vectorstore.index_to_docstore_id, dtype=np.int64)] = False
+    return np.flatnonzero(dead)
+
+
+def deleted_fraction(vectorstore: FAISS) -> float:
+    total = vectorstore.index.ntotal
+    return 1 - len(vectorstore.index_to_docstore_id) / total if total else 0.0
+
+
+def rebuild_without_deleted(vectorstore: FAISS) -> Tuple[object, Dict[int, str]]:
+    """A new HNSW index of the live vectors only, and its (contiguous) position -> chunk id map"""
+    live = sorted(vectorstore.index_to_docstore_id)
+    if live:
+        vectors = vectorstore.index.reconstruct_batch(np.array(live, dtype=np.int64))
+    else:
+        vectors = np.empty((0, vectorstore.index.d), dtype=np.float32)
+    index = build_index("hnsw", vectors, inner_product=is_inner_product(vectorstore))
+    return index, {i: vectorstore.index_to_docstore_id[p] for i, p in enumerate(live)}
+
+
+def add_vectors(vectorstore: FAISS, text_embeddings: List[Tuple[str, np.ndarray]],
+                metadatas: List[dict], ids: List[str] = None) -> List[str]:
+    """FAISS.add_embeddings that also numbers positions correctly after soft deletes"""
+    start = vectorstore.index.ntotal
+    if start == len(vectorstore.index_to_docstore_id):
+        return vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+    
+    # LangChain numbers new vectors from len(index_to_docstore_id), which
+    # would overwrite live entries: keep the old map and append at ntotal
+    mapped = dict(vectorstore.index_to_docstore_id)
+    added = vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+    mapped.update((start + i, chunk_id) for i, chunk_id in enumerate(added))
+    vectorstore.index_to_docstore_id = mapped
+    return added
+
+
+def id_selector(positions: np.ndarray):
+    """Selector restricting a search to these positions"""
+    return _faiss().IDSelectorBatch(np.ascontiguousarray(positions, dtype=np.int64))
+
+
+def exclude_selector(positions: np.ndarray):
+    """Selector skipping these positions (soft-deleted HNSW vectors)"""
+    faiss = _faiss()
+    excluded = id_selector(positions)
+    selector = faiss.IDSelectorNot(excluded)
+    selector.excluded = excluded  # the wrapper does not own it
+    return selector
+
+
+def search_params(index, nprobe: int = None, ef_search: int = None, selector=None):
+    """Per-query SearchParameters for the index type (None when defaults are fine)"""
+    faiss = _faiss()
+    kind = index_kind(index)
+    
+    if kind == "hnsw":
+        return faiss.SearchParametersHNSW(efSearch=ef_search or settings.FAISS_EF_SEARCH, sel=selector)
+    if kind in ("ivf_flat", "ivf_pq"):
+        nlist = _extract_ivf(index).nlist
+        return faiss.SearchParametersIVF(nprobe=min(nprobe or settings.FAISS_NPROBE, nlist), sel=selector)
+    if selector is not None:
+        return faiss.SearchParameters(sel=selector)
+    return None
+
+
+def distances_to(index, vector: np.ndarray, positions: List[int], inner_product: bool = False) -> Optional[np.ndarray]:
+    """
+    Exact scores (squared L2 or inner product) between one query vector and
+    stored vectors, or None when the index cannot reconstruct them (IVF
+    without a direct map)
+    """
+    if not positions:
+        return np.empty(0, dtype=np.float32)
+    try:
+        stored = index.reconstruct_batch(np.asarray(positions, dtype=np.int64))
+    except RuntimeError:
+        return None
+    if inner_product:
+        return stored @ vector
+    return ((stored - vector) ** 2).sum(axis=1)
@@ -0,0 +1,185 @@
+# src/vectorstore/lexical_index.py
+"""In-process BM25 inverted index over chunk text"""
+import heapq
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from ..config.settings import settings
+
+# Bump when tokenize() changes so persisted indexes are rebuilt
+TOKENIZER_VERSION = 1
+
+# Keeps tickers (hdfcbank.ns), ratios (p/e), decimals (131.85) and grouped numbers (63,437.00) whole
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:(?:[.&/'-]|(?<=\d),(?=\d))[a-z0-9]+)*")
+PART_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+    a an and are as at be been but by for from has have in into is it its of on or that the their this
+    to was were will with
+""".split())
+
+# Their presence marks a natural-language question rather than a keyword lookup
+QUESTION_WORDS = frozenset("""
+    what which who whom whose how why when where does do did is are was were can could should would
+    compare explain describe tell show give list summarize summarise
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms without stopwords; compound tokens also yield their parts"""
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        parts = PART_PATTERN.findall(token)
+        if len(parts) > 1:
+            # "hdfcbank.ns" is also found by "hdfcbank"
+            terms.extend(part for part in parts if len(part) > 1 and part not in STOPWORDS)
+    return terms
+
+
+def is_keyword_query(query: str) -> bool:
+    """A few bare terms ("EPS Sep 2025", "debt to equity") rather than a question"""
+    tokens = TOKEN_PATTERN.findall(query.lower())
+    if not tokens or any(token in QUESTION_WORDS for token in tokens):
+        return False
+    return len([token for token in tokens if token not in STOPWORDS]) <= settings.KEYWORD_QUERY_MAX_TERMS
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk ids
+    
+    Lives next to the FAISS index in each store snapshot: writers change a
+    copy(), published indexes are only read.
+    """
+    
+    def __init__(self, k1: float = None, b: float = None):
+        self.k1 = settings.BM25_K1 if k1 is None else k1
+        self.b = settings.BM25_B if b is None else b
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> chunk id -> term frequency
+        self.doc_terms: Dict[str, Dict[str, int]] = {}  # chunk id -> term frequencies
+        self.lengths: Dict[str, int] = {}
+        self.total_length = 0
+    
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+    
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.doc_terms
+    
+    def ids(self) -> List[str]:
+        return list(self.doc_terms)
+    
+    def copy(self) -> "BM25Index":
+        """Independent copy for a writer (per-chunk term counts are shared, never mutated)"""
+        clone = BM25Index(self.k1, self.b)
+        clone.postings = {term: dict(chunks) for term, chunks in self.postings.items()}
+        clone.doc_terms = dict(self.doc_terms)
+        clone.lengths = dict(self.lengths)
+        clone.total_length = self.total_length
+        return clone
+    
+    # ---------- writes ----------
+    
+    def add(self, chunk_id: str, text: str) -> None:
+        """Index (or re-index) one chunk"""
+        self._add_counts(chunk_id, dict(Counter(tokenize(text))))
+    
+    def _add_counts(self, chunk_id: str, counts: Dict[str, int]) -> None:
+        if chunk_id in self.doc_terms:
+            self.remove([chunk_id])
+        self.doc_terms[chunk_id] = counts
+        length = sum(counts.values())
+        self.lengths[chunk_id] = length
+        self.total_length += length
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[chunk_id] = tf
+    
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        for chunk_id in chunk_ids:
+            counts = self.doc_terms.pop(chunk_id, None)
+            if counts is None:
+                continue
+            self.total_length -= self.lengths.pop(chunk_id)
+            for term in counts:
+                chunks = self.postings[term]
+                del chunks[chunk_id]
+                if not chunks:
+                    del self.postings[term]
+    
+    # ---------- search ----------
+    
+    def has_terms(self, query: str) -> bool:
+        """Whether every query term occurs in some chunk"""
+        terms = tokenize(query)
+        return bool(terms) and all(term in self.postings for term in terms)
+    
+    def search(self, query: str, k: int, allowed: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Top-k (chunk id, score); `allowed` restricts to those chunk ids"""
+        count = len(self.doc_terms)
+        if not count:
+            return []
+        avg_length = self.total_length / count
+        
+        scores: Dict[str, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            chunks = self.postings.get(term)
+            if not chunks:
+                continue
+            idf = math.log(1 + (count - len(chunks) + 0.5) / (len(chunks) + 0.5))
+            for chunk_id, tf in chunks.items():
+                if allowed is not None and chunk_id not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+    
+    # ---------- persistence ----------
+    
+    def save(self, path: Path) -> None:
+        """Write as CSR arrays (chunk ids x vocabulary) to an .npz file"""
+        vocabulary = {term: i for i, term in enumerate(self.postings)}
+        ids = list(self.doc_terms)
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        term_idx, tfs = [], []
+        for row, chunk_id in enumerate(ids):
+            counts = self.doc_terms[chunk_id]
+            term_idx.extend(vocabulary[term] for term in counts)
+            tfs.extend(counts.values())
+            indptr[row + 1] = len(term_idx)
+        
+        tmp = Path(path).with_name(Path(path).name + ".tmp")
+        with open(tmp, 'wb') as f:
+            np.savez(
+                f,
+                version=np.array(TOKENIZER_VERSION),
+                ids=np.array(ids, dtype=str),
+                terms=np.array(list(vocabulary), dtype=str),
+                indptr=indptr,
+                term_idx=np.array(term_idx, dtype=np.int32),
+                tf=np.array(tfs, dtype=np.int32)
+            )
+        os.replace(tmp, path)
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional["BM25Index"]:
+        """Read an index written by save(); None if missing or from another tokenizer version"""
+        if not Path(path).exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != TOKENIZER_VERSION:
+                return None
+            ids, terms = data['ids'].tolist(), data['terms'].tolist()
+            indptr, term_idx, tfs = data['indptr'], data['term_idx'].tolist(), data['tf'].tolist()
+        
+        index = cls()
+        for row, chunk_id in enumerate(ids):
+            start, end = indptr[row], indptr[row + 1]
+            index._add_counts(chunk_id, {terms[i]: tf for i, tf in zip(term_idx[start:end], tfs[start:end])})
+        return index
@@ -0,0 +1,63 @@
+# src/vectorstore/migrate.py
+"""
+Move a vector store's docstore from pickle to SQLite
+
+Usage:
+    python -m src.vectorstore.migrate indian_stocks
+"""
+import argparse
+import sys
+from langchain_community.vectorstores import FAISS
+from ..config.settings import settings
+from .persistence import SegmentLog
+from .sqlite_docstore import SQLiteDocstore
+
+
+def migrate_to_sqlite(store_name: str) -> int:
+    """Rewrite a store (legacy layout or pickle base) with an SQLite docstore"""
+    store_path = settings.VECTORSTORE_DIR / f"{store_name}_faiss"
+    log = SegmentLog(store_path)
+    
+    if log.read_manifest() is None and not log.is_legacy():
+        raise FileNotFoundError(f"No vector store at {store_path}")
+    
+    print(f"Loading from: {store_path}")
+    # Documents and vectors are copied as-is, so no embedding model is needed
+    vectorstore = log.load(None)
+    if isinstance(vectorstore.docstore, SQLiteDocstore):
+        print("✓ Already using the SQLite docstore")
+        return 0
+    
+    docstore = SQLiteDocstore(log.docstore_path)
+    docstore.clear()
+    docstore.add(dict(vectorstore.docstore._dict))
+    
+    migrated = FAISS(
+        None,
+        vectorstore.index,
+        docstore,
+        vectorstore.index_to_docstore_id,
+        normalize_L2=vectorstore._normalize_L2,
+        distance_strategy=vectorstore.distance_strategy
+    )
+    log.write_base(migrated)
+    
+    print(f"✓ Migrated {len(docstore)} chunks to {log.docstore_path}")
+    return len(docstore)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Migrate a vector store's docstore from pickle to SQLite")
+    parser.add_argument("store_name", nargs="?", default="indian_stocks", help="Store name (default: indian_stocks)")
+    args = parser.parse_args()
+    
+    try:
+        migrate_to_sqlite(args.store_name)
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+# src/vectorstore/persistence.py
+"""Incremental (append-only) vector store persistence"""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from .sqlite_docstore import SQLiteDocstore
+from .index_factory import add_vectors, deleted_positions, rebuild_without_deleted, remove_vectors
+from .lexical_index import BM25Index
+
+
+# (chunk id, text, metadata, vector) for every chunk added since the last save
+PendingAdd = Tuple[str, str, dict, np.ndarray]
+
+
+class SegmentLog:
+    """
+    On-disk layout:
+    
+        manifest.json        current base snapshot + ordered list of segments
+        published.json       newest base + version, watched by read-only workers
+        docstore.sqlite      chunk text + metadata (SQLite docstore backend)
+        base-000012/         full snapshot: index.faiss + store.json (SQLite
+                             backend) or index.faiss + index.pkl (pickle),
+                             plus lexical.npz (BM25 index) when hybrid search is on
+        segments/
+            seg-000013.npz   one save's delta: deleted ids, added ids/vectors/docs
+    
+    Each save appends one segment; compaction folds the segments into a
+    new base. Every file is written under a temporary name and renamed
+    into place, and the manifest is replaced last, so a crash leaves
+    either the old or the new state.
+    
+    docstore.sqlite is written as changes happen, not at save, so it may
+    hold more than the manifest describes, never less: documents of
+    removed chunks are deleted only after the removal is saved (and
+    published, for reader workers), and documents added since the last
+    save are dropped by the writer when it next loads.
+    
+    Read-only workers memory-map the published base (SQLite backend) and
+    ignore segments; a writer publishes by compacting on the segment schedule
+    or once saved changes reach SNAPSHOT_MAX_STALENESS.
+    
+    The pre-manifest layout (index.faiss + index.pkl directly in the store
+    directory) is still readable; the next save writes a base next to it
+    and the manifest takes precedence from then on.
+    """
+    
+    FORMAT = 1
+    LEXICAL_FILE = "lexical.npz"
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.segments_dir = self.path / "segments"
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+    
+    # ---------- manifest ----------
+    
+    @property
+    def docstore_path(self) -> Path:
+        return self.path / "docstore.sqlite"
+    
+    @property
+    def manifest_path(self) -> Path:
+        return self.path / "manifest.json"
+    
+    @property
+    def published_path(self) -> Path:
+        return self.path / "published.json"
+    
+    def read_manifest(self) -> Optional[Dict]:
+        if not self.manifest_path.exists():
+            return None
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_manifest(self, manifest: Dict) -> None:
+        self._write_json(self.manifest_path, manifest)
+    
+    def _write_json(self, path: Path, data: Dict) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    
+    def read_published(self) -> Optional[Dict]:
+        """{'base', 'version'} of the newest full snapshot, if any"""
+        try:
+            with open(self.published_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    
+    def published_version(self) -> int:
+        published = self.read_published()
+        return published['version'] if published else 0
+    
+    def published_ids(self) -> List[str]:
+        """Chunk ids of the published base (SQLite backend), which reader workers may be serving"""
+        published = self.read_published()
+        if not published or not published.get('base'):
+            return []
+        try:
+            with open(self.path / published['base'] / "store.json", encoding='utf-8') as f:
+                return json.load(f)['ids']
+        except (OSError, ValueError, KeyError):
+            return []
+    
+    def _publish(self, manifest: Dict) -> None:
+        self._write_json(self.published_path, {'base': manifest['base'], 'version': manifest['version']})
+    
+    def is_legacy(self) -> bool:
+        """Old single-snapshot layout without a manifest"""
+        return self.read_manifest() is None and (self.path / "index.faiss").exists()
+    
+    def version(self) -> int:
+        manifest = self.read_manifest()
+        return manifest['version'] if manifest else 0
+    
+    def segment_count(self) -> int:
+        manifest = self.read_manifest()
+        return len(manifest['segments']) if manifest else 0
+    
+    # ---------- load ----------
+    
+    def load(self, embeddings) -> FAISS:
+        """Load the base snapshot and replay every segment on top of it"""
+        manifest = self.read_manifest()
+        if manifest is None:
+            return FAISS.load_local(str(self.path), embeddings, allow_dangerous_deserialization=True)
+        
+        vectorstore = self._load_base(self.path / manifest['base'], embeddings)
+        for name in manifest['segments']:
+            self._replay(vectorstore, self.segments_dir / name)
+        return vectorstore
+    
+    def load_published(self, embeddings) -> Tuple[FAISS, int]:
+        """
+        Read-only load of the published base, memory-mapped so every worker
+        process shares one copy through the OS page cache
+        """
+        published = self.read_published()
+        if published is None:
+            manifest = self.read_manifest()
+            if manifest is None or not manifest.get('base'):
+                raise FileNotFoundError(f"No published snapshot in {self.path}")
+            published = {'base': manifest['base'], 'version': manifest['version']}
+        
+        base = self.path / published['base']
+        if not (base / "store.json").exists():
+            print("⚠ Pickled docstore snapshot cannot be memory-mapped; loading a private copy")
+        return self._load_base(base, embeddings, mmap=True), published['version']
+    
+    def _load_base(self, base: Path, embeddings, mmap: bool = False) -> FAISS:
+        if not (base / "store.json").exists():
+            return FAISS.load_local(str(base), embeddings, allow_dangerous_deserialization=True)
+        
+        with open(base / "store.json", encoding='utf-8') as f:
+            meta = json.load(f)
+        index = self._read_index(base / "index.faiss", mmap)
+        return FAISS(
+            embeddings,
+            index,
+            SQLiteDocstore(self.docstore_path),
+            dict(enumerate(meta['ids'])),
+            normalize_L2=meta.get('normalize_L2', False),
+            distance_strategy=DistanceStrategy[meta.get('distance_strategy', 'EUCLIDEAN_DISTANCE')]
+        )
+    
+    @staticmethod
+    def _read_index(path: Path, mmap: bool):
+        """Read an index, memory-mapped when `mmap` and the index type allows it"""
+        import faiss
+        
+        if not mmap:
+            return faiss.read_index(str(path))
+        # MMAP_IFC maps flat/HNSW codes in place, but IVF inverted lists
+        # reject it ("mmap only supported for File objects"); plain MMAP
+        # works there, and a private copy is the last resort
+        attempts = [faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY, faiss.IO_FLAG_MMAP]
+        if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+            attempts.insert(0, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        for flags in attempts:
+            try:
+                return faiss.read_index(str(path), flags)
+            except RuntimeError:
+                continue
+        print(f"⚠ {path} cannot be memory-mapped; loading a private copy")
+        return faiss.read_index(str(path))
+    
+    def load_lexical(self, published: bool = False) -> Optional[BM25Index]:
+        """
+        BM25 index saved with the current (or published) base; chunks added
+        or removed by later segments are reconciled by the caller
+        """
+        source = self.read_published() if published else None
+        source = source or self.read_manifest()
+        if not source or not source.get('base'):
+            return None
+        try:
+            return BM25Index.load(self.path / source['base'] / self.LEXICAL_FILE)
+        except (OSError, ValueError, KeyError) as e:
+            # e.g. the base was compacted away mid-read: rebuilt from the documents instead
+            print(f"⚠ Could not read BM25 index: {e}")
+            return None
+    
+    @staticmethod
+    def _replay(vectorstore: FAISS, segment: Path) -> None:
+        with np.load(segment, allow_pickle=False) as data:
+            deleted = [str(i) for i in data['deleted']]
+            ids = [str(i) for i in data['ids']]
+            vectors = data['vectors']
+            docs = [json.loads(d) for d in data['docs']]
+        
+        # Deletes first; re-added ids are treated as replacements
+        existing = set(vectorstore.index_to_docstore_id.values())
+        to_delete = [i for i in dict.fromkeys(deleted + ids) if i in existing]
+        if to_delete:
+            remove_vectors(vectorstore, to_delete)
+        if ids:
+            add_vectors(
+                vectorstore,
+                [(doc['text'], vector) for doc, vector in zip(docs, vectors)],
+                metadatas=[doc['metadata'] for doc in docs],
+                ids=ids
+            )
+    
+    # ---------- write ----------
+    
+    def write_base(self, vectorstore: FAISS, lexical: BM25Index = None) -> None:
+        """Write a full snapshot (and its BM25 index) and drop all segments"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        # A running compaction would otherwise install its older snapshot over this one
+        self.wait()
+        with self._lock:
+            manifest = self.read_manifest() or {'format': self.FORMAT, 'version': 0, 'next_seq': 1, 'base': None, 'segments': []}
+            seq = manifest['next_seq']
+            manifest['next_seq'] = seq + 1
+        
+        base = self._write_snapshot(vectorstore, seq, lexical)
+        
+        with self._lock:
+            manifest = self.read_manifest() or manifest
+            old_base, old_segments = manifest.get('base'), manifest['segments']
+            manifest.update(base=base, segments=[], version=manifest['version'] + 1,
+                            next_seq=max(manifest['next_seq'], seq + 1))
+            self._write_manifest(manifest)
+            self._publish(manifest)
+        
+        self._cleanup(old_base, old_segments)
+    
+    def append_segment(self, adds: List[PendingAdd], deletes: List[str]) -> int:
+        """Persist one delta; returns the new version"""
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            manifest = self.read_manifest()
+            seq = manifest['next_seq']
+            name = f"seg-{seq:06d}.npz"
+            
+            dim = adds[0][3].shape[-1] if adds else 0
+            tmp = self.segments_dir / f"{name}.tmp"
+            with open(tmp, 'wb') as f:
+                np.savez(
+                    f,
+                    deleted=np.array(deletes, dtype=str),
+                    ids=np.array([a[0] for a in adds], dtype=str),
+                    vectors=np.array([a[3] for a in adds], dtype=np.float32).reshape(len(adds), dim),
+                    docs=np.array([json.dumps({'text': a[1], 'metadata': a[2]}) for a in adds], dtype=str)
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.segments_dir / name)
+            
+            manifest['segments'].append(name)
+            manifest['next_seq'] = seq + 1
+            manifest['version'] += 1
+            self._write_manifest(manifest)
+            return manifest['version']
+    
+    # ---------- compaction ----------
+    
+    def compact_in_background(self, snapshot: FAISS, lexical: BM25Index = None,
+                              on_publish: Callable[[], None] = None) -> bool:
+        """
+        Fold the current segments into a new base on a background thread.
+        `snapshot` (and `lexical`) must not change while it is written and
+        must match the persisted state; `on_publish` runs once it is published.
+        """
+        if self._compactor and self._compactor.is_alive():
+            return False
+        manifest = self.read_manifest()
+        if not manifest or not manifest['segments']:
+            return False
+        
+        covered = list(manifest['segments'])
+        self._compactor = threading.Thread(
+            target=self._compact, args=(snapshot, covered, lexical, on_publish), name="vectorstore-compactor", daemon=True
+        )
+        self._compactor.start()
+        return True
+    
+    def _compact(self, snapshot: FAISS, covered: List[str], lexical: Optional[BM25Index],
+                 on_publish: Optional[Callable[[], None]]) -> None:
+        try:
+            with self._lock:
+                manifest = self.read_manifest()
+                seq = manifest['next_seq']
+                manifest['next_seq'] = seq + 1
+                self._write_manifest(manifest)
+            
+            base = self._write_snapshot(snapshot, seq, lexical)
+            
+            with self._lock:
+                manifest = self.read_manifest()
+                old_base = manifest['base']
+                # Segments appended while we were writing stay on top of the new base
+                manifest['segments'] = [s for s in manifest['segments'] if s not in covered]
+                manifest['base'] = base
+                manifest['version'] += 1
+                self._write_manifest(manifest)
+                self._publish(manifest)
+            
+            self._cleanup(old_base, covered)
+            if on_publish:
+                on_publish()
+            print(f"✓ Compacted {len(covered)} segments into {base}")
+        except Exception as e:
+            print(f"✗ Compaction failed: {e}")
+    
+    def wait(self) -> None:
+        """Wait for a running compaction to finish"""
+        if self._compactor:
+            self._compactor.join()
+    
+    # ---------- helpers ----------
+    
+    def _write_snapshot(self, vectorstore: FAISS, seq: int, lexical: BM25Index = None) -> str:
+        name = f"base-{seq:06d}"
+        tmp = self.path / f"{name}.tmp"
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        
+        if len(deleted_positions(vectorstore)):
+            # Soft-deleted HNSW vectors are dropped here (usually on the compactor thread)
+            index, index_to_docstore_id = rebuild_without_deleted(vectorstore)
+            vectorstore = FAISS(
+                vectorstore.embedding_function, index, vectorstore.docstore, index_to_docstore_id,
+                normalize_L2=vectorstore._normalize_L2, distance_strategy=vectorstore.distance_strategy
+            )
+        
+        if isinstance(vectorstore.docstore, SQLiteDocstore):
+            # Documents already live in docstore.sqlite; only the index and id map go here
+            import faiss
+            
+            tmp.mkdir(parents=True)
+            faiss.write_index(vectorstore.index, str(tmp / "index.faiss"))
+            with open(tmp / "store.json", 'w', encoding='utf-8') as f:
+                json.dump({
+                    'ids': [vectorstore.index_to_docstore_id[i] for i in range(len(vectorstore.index_to_docstore_id))],
+                    'normalize_L2': vectorstore._normalize_L2,
+                    'distance_strategy': vectorstore.distance_strategy.name
+                }, f)
+        else:
+            vectorstore.save_local(str(tmp))
+        if lexical is not None:
+            lexical.save(tmp / self.LEXICAL_FILE)
+        os.rename(tmp, self.path / name)
+        return name
+    
+    def _cleanup(self, old_base: Optional[str], old_segments: List[str]) -> None:
+        if old_base:
+            shutil.rmtree(self.path / old_base, ignore_errors=True)
+        for name in old_segments:
+            (self.segments_dir / name).unlink(missing_ok=True)
+    
+
+def copy_vectorstore(vectorstore: FAISS) -> FAISS:
+    """Independent copy of a FAISS store (index, id map, and in-memory docstore)"""
+    import faiss
+    
+    docstore = vectorstore.docstore
+    if isinstance(docstore, InMemoryDocstore):
+        docstore = InMemoryDocstore(dict(docstore._dict))
+    
+    return FAISS(
+        vectorstore.embedding_function,
+        faiss.clone_index(vectorstore.index),
+        docstore,
+        dict(vectorstore.index_to_docstore_id),
+        normalize_L2=vectorstore._normalize_L2,
+        distance_strategy=vectorstore.distance_strategy
+    )
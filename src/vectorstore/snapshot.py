@@ -0,0 +1,71 @@
+# src/vectorstore/snapshot.py
+"""Immutable, versioned views of the vector store"""
+import threading
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from .index_factory import deleted_positions
+from .lexical_index import BM25Index
+
+
+class StoreSnapshot:
+    """
+    One published version of the store: FAISS index, id map, BM25 index
+    and the ticker/company registries built from it.
+    
+    Writers never modify a published snapshot; they build the next one
+    from a copy and swap the manager's reference. Queries hold the
+    snapshot they started with, and cleanup that would break it (docstore
+    deletes) waits until its last reader has left.
+    """
+    
+    def __init__(self, vectorstore: Optional[FAISS], version: int,
+                 ticker_ids: Dict[str, List[str]] = None, companies: Dict[str, dict] = None,
+                 lexical: Optional[BM25Index] = None):
+        self.vectorstore = vectorstore
+        self.version = version
+        self.ticker_ids = ticker_ids or {}
+        self.companies = companies or {}  # ticker -> company/sector/industry/report_date
+        self.lexical = lexical  # None when hybrid search is off
+        self.positions: Dict[str, int] = (
+            {chunk_id: position for position, chunk_id in vectorstore.index_to_docstore_id.items()}
+            if vectorstore is not None else {}
+        )
+        # Soft-deleted HNSW positions that searches must skip
+        self.deleted = deleted_positions(vectorstore) if vectorstore is not None else np.empty(0, dtype=np.int64)
+        self._readers = 0
+        self._retired = False
+        self._on_release: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> "StoreSnapshot":
+        with self._lock:
+            self._readers += 1
+        return self
+    
+    def in_use(self) -> bool:
+        with self._lock:
+            return self._readers > 0
+    
+    def release(self) -> None:
+        with self._lock:
+            self._readers -= 1
+            callbacks = self._drain()
+        for callback in callbacks:
+            callback()
+    
+    def retire(self, on_release: Callable[[], None] = None) -> None:
+        """Mark as replaced; `on_release` runs once no query is using it"""
+        with self._lock:
+            self._retired = True
+            if on_release:
+                self._on_release.append(on_release)
+            callbacks = self._drain()
+        for callback in callbacks:
+            callback()
+    
+    def _drain(self) -> List[Callable[[], None]]:
+        if not self._retired or self._readers:
+            return []
+        callbacks, self._on_release = self._on_release, []
+        return callbacks
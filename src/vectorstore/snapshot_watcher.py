@@ -0,0 +1,42 @@
+# src/vectorstore/snapshot_watcher.py
+"""Reload read-only workers when a writer publishes a new snapshot"""
+import threading
+from typing import Callable, Optional
+from .persistence import SegmentLog
+
+
+class SnapshotWatcher:
+    """Polls a store's published version and calls `on_change` when it moves"""
+    
+    def __init__(self, log: SegmentLog, on_change: Callable[[], bool], interval: float = 2.0):
+        self.log = log
+        self.on_change = on_change
+        self.interval = interval
+        self.version = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, version: int = 0) -> None:
+        """Start watching; `version` is the snapshot already loaded"""
+        self.version = version
+        self._thread = threading.Thread(target=self._run, name="snapshot-watcher", daemon=True)
+        self._thread.start()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                version = self.log.published_version()
+                if version == self.version:
+                    continue
+                print(f"New snapshot published (version {self.version} -> {version}), reloading...")
+                # A failed reload (e.g. base removed mid-read) is retried on the next poll
+                if self.on_change():
+                    self.version = version
+            except Exception as e:
+                print(f"⚠ Snapshot check failed: {e}")
+    
+    def stop(self) -> None:
+        """Stop polling"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
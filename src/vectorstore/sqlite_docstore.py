@@ -0,0 +1,108 @@
+# src/vectorstore/sqlite_docstore.py
+"""SQLite-backed docstore for FAISS"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    Chunk text and metadata kept on disk in SQLite.
+    
+    Nothing is loaded at startup; documents are read by id when a search
+    hits them, so memory use does not grow with the corpus and no pickle
+    is involved.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )"""
+        )
+        conn.commit()
+    
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (SQLite WAL allows concurrent readers)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _to_document(row: Tuple[str, str, str]) -> Document:
+        chunk_id, text, metadata = row
+        return Document(id=chunk_id, page_content=text, metadata=json.loads(metadata))
+    
+    def search(self, search: str) -> Union[str, Document]:
+        """Document for an id (LangChain convention: a message string if missing)"""
+        row = self._conn().execute(
+            "SELECT id, text, metadata FROM chunks WHERE id = ?", (search,)
+        ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return self._to_document(row)
+    
+    def mget(self, ids: List[str]) -> Dict[str, Document]:
+        """Documents for several ids in one query (missing ids are left out)"""
+        found = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn().execute(
+                f"SELECT id, text, metadata FROM chunks WHERE id IN ({placeholders})", batch
+            ).fetchall()
+            for row in rows:
+                found[row[0]] = self._to_document(row)
+        return found
+    
+    def ids(self) -> List[str]:
+        """Every stored chunk id"""
+        return [row[0] for row in self._conn().execute("SELECT id FROM chunks")]
+    
+    def iter_metadata(self) -> Iterator[Tuple[str, dict]]:
+        """(id, metadata) for every chunk, without reading the text"""
+        for chunk_id, metadata in self._conn().execute("SELECT id, metadata FROM chunks"):
+            yield chunk_id, json.loads(metadata)
+    
+    def add(self, texts: Dict[str, Document]) -> None:
+        """Insert or replace documents"""
+        rows = [
+            (chunk_id, doc.page_content, json.dumps(doc.metadata, default=str))
+            for chunk_id, doc in texts.items()
+        ]
+        with self._write_lock:
+            conn = self._conn()
+            conn.executemany("INSERT OR REPLACE INTO chunks (id, text, metadata) VALUES (?, ?, ?)", rows)
+            conn.commit()
+    
+    def delete(self, ids: List) -> None:
+        """Delete documents by id"""
+        with self._write_lock:
+            conn = self._conn()
+            conn.executemany("DELETE FROM chunks WHERE id = ?", [(i,) for i in ids])
+            conn.commit()
+    
+    def clear(self) -> None:
+        """Delete every document"""
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("DELETE FROM chunks")
+            conn.commit()
+    
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
@@ -1,85 +1,830 @@
 # src/vectorstore/vector_manager.py
 """Vector store management"""
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_core.documents import Document
 from ..config.settings import settings
 from ..embeddings.embedding_manager import EmbeddingManager
+from ..embeddings.embedding_cache import text_hash
+from .persistence import SegmentLog, PendingAdd, copy_vectorstore
+from .sqlite_docstore import SQLiteDocstore
+from .snapshot import StoreSnapshot
+from .lexical_index import BM25Index, is_keyword_query
+from .index_factory import (
+    add_vectors, distances_to, exclude_selector, id_selector, index_kind, is_inner_product, maybe_upgrade_index,
+    normalize_rows, remove_vectors, search_params
+)
+
+
+@dataclass
+class RetrievalResult:
+    """Documents from a single embed + search pass, with their scores"""
+    query: str
+    documents: List[Document] = field(default_factory=list)
+    distances: List[float] = field(default_factory=list)
+    similarities: List[float] = field(default_factory=list)
+    chunk_ids: List[str] = field(default_factory=list)
+    query_vector: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(self.documents)
+    
+    @property
+    def confidence(self) -> float:
+        """Mean similarity of the retrieved chunks"""
+        if not self.similarities:
+            return 0.0
+        return sum(self.similarities) / len(self.similarities)
+    
+    @property
+    def tickers(self) -> List[str]:
+        """Tickers the retrieved chunks belong to"""
+        tickers = []
+        for doc in self.documents:
+            ticker = chunk_ticker(doc.metadata)
+            if ticker and ticker not in tickers:
+                tickers.append(ticker)
+        return tickers
+    
+    def with_scores(self) -> List[Tuple[Document, float]]:
+        """(document, raw distance) pairs, as returned by LangChain"""
+        return list(zip(self.documents, self.distances))
+
+
+@dataclass
+class SearchFilter:
+    """Restrict a search to chunks of matching companies (None = no constraint)"""
+    tickers: Optional[List[str]] = None
+    sectors: Optional[List[str]] = None
+    industries: Optional[List[str]] = None
+    report_date_from: Optional[str] = None  # ISO date, inclusive
+    report_date_to: Optional[str] = None
+    
+    def is_empty(self) -> bool:
+        return not (self.tickers or self.sectors or self.industries
+                    or self.report_date_from or self.report_date_to)
+    
+    def key(self) -> tuple:
+        """Hashable form, so queries with the same filter can share a search"""
+        def values(items):
+            return tuple(sorted(item.lower() for item in items)) if items else None
+        return (values(self.tickers), values(self.sectors), values(self.industries),
+                self.report_date_from, self.report_date_to)
+    
+    def matches(self, ticker: str, company: dict) -> bool:
+        """Whether a company (registry entry) passes every constraint"""
+        if self.tickers and ticker.upper() not in {t.upper() for t in self.tickers}:
+            return False
+        if self.sectors and (company.get('sector') or '').lower() not in {s.lower() for s in self.sectors}:
+            return False
+        if self.industries and (company.get('industry') or '').lower() not in {i.lower() for i in self.industries}:
+            return False
+        report_date = company.get('report_date')
+        if self.report_date_from and (not report_date or report_date < self.report_date_from):
+            return False
+        if self.report_date_to and (not report_date or report_date > self.report_date_to):
+            return False
+        return True
+
+
+COMPANY_FIELDS = ('company', 'sector', 'industry', 'report_date')
+
+
+def chunk_ticker(metadata: dict) -> Optional[str]:
+    """Ticker a chunk belongs to (older stores only recorded the report file name)"""
+    if metadata.get('ticker'):
+        return metadata['ticker']
+    source = metadata.get('source', '').split('/')[-1]
+    if source.endswith('_report.txt'):
+        return source[:-len('_report.txt')]
+    return None
+
+
+def make_chunk_id(ticker: str, position: int, text: str) -> str:
+    """Stable id for the n-th chunk of a ticker's report (unchanged text -> same id)"""
+    return f"{ticker}:{position:04d}:{text_hash(text)[:12]}"
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = None) -> List[str]:
+    """Merge rankings of chunk ids: score = sum of 1 / (k + rank) over the rankings"""
+    k = settings.RRF_K if k is None else k
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+SEARCH_MODES = ("vector", "hybrid", "lexical")
+
+
+def distance_to_similarity(distance: float, inner_product: bool = False) -> float:
+    """
+    Map a raw FAISS score to a similarity in [0, 1]: squared L2 distance
+    between unit vectors -> cosine, or the inner product itself
+    """
+    similarity = distance if inner_product else 1.0 - distance / 2.0
+    return float(min(1.0, max(0.0, similarity)))
 
 
 class VectorStoreManager:
-    """Manages vector store operations"""
+    """
+    Manages vector store operations
     
-    def __init__(self, embedding_manager: EmbeddingManager, store_name: str = "default"):
+    The store is published as immutable StoreSnapshot versions: writers
+    change a copy and swap the reference, queries pin the snapshot they
+    start with, so reads never wait on writes or see a half-applied one.
+    """
+    
+    def __init__(self, embedding_manager: EmbeddingManager, store_name: str = "default", read_only: bool = False):
         self.embedding_manager = embedding_manager
         self.store_name = store_name
-        self.vectorstore: Optional[FAISS] = None
+        self.read_only = read_only  # serve the published snapshot (memory-mapped), never write
+        self.loaded_version = 0
         self.store_path = settings.VECTORSTORE_DIR / f"{store_name}_faiss"
+        self.log = SegmentLog(self.store_path)
+        self._snapshot = StoreSnapshot(None, 0)
+        
+        # Serializes writers; queries never take it
+        self._lock = threading.RLock()
+        # Replaced snapshots still being read, and removed chunk ids (-> the
+        # first version without them) whose shared documents they may still read
+        self._retired: List[StoreSnapshot] = []
+        self._orphans: Dict[str, int] = {}
+        # Versions published for reader workers (deletable after) and the newest they all left
+        self._published: List[Tuple[float, int]] = []
+        self._published_lock = threading.Lock()
+        self._purgeable_version = 0
+        # Newest version whose changes are in the manifest (removals are only
+        # final once saved: until then a restart goes back to the old chunks)
+        self._saved_version = 0
+        # Saved version the manifest describes (what compaction may write), and
+        # when reader workers last got a new base
+        self._saved_snapshot: Optional[StoreSnapshot] = None
+        self._published_at = 0.0
+        self._publish_timer: Optional[threading.Timer] = None
+        
+        # Changes since the last save; persisted as one segment
+        self._pending_adds: Dict[str, PendingAdd] = {}
+        self._pending_deletes: Dict[str, None] = {}
+        self._needs_base = False
         
-        print(f"VectorStoreManager: {store_name}")
+        print(f"VectorStoreManager: {store_name}{' (read-only)' if read_only else ''}")
     
-    def create_vectorstore(self, documents: List[Document]) -> FAISS:
+    # ---------- snapshots ----------
+    
+    @property
+    def vectorstore(self) -> Optional[FAISS]:
+        """FAISS store of the current snapshot"""
+        return self._snapshot.vectorstore
+    
+    @property
+    def registry_version(self) -> int:
+        """Changes whenever the ticker/company registry may have changed"""
+        return self._snapshot.version
+    
+    @contextmanager
+    def reading(self) -> Iterator[StoreSnapshot]:
+        """Pin the current snapshot for the duration of a query"""
+        while True:
+            snapshot = self._snapshot.acquire()
+            if snapshot is self._snapshot:
+                break
+            snapshot.release()  # swapped between read and acquire: retry
+        try:
+            yield snapshot
+        finally:
+            snapshot.release()
+    
+    def _commit(self, vectorstore: FAISS, ticker_ids: Dict[str, List[str]], companies: Dict[str, dict],
+                lexical: Optional[BM25Index], removed_ids: List[str] = ()) -> None:
+        """Publish a new version with one reference swap"""
+        old = self._snapshot
+        self._snapshot = StoreSnapshot(vectorstore, old.version + 1, ticker_ids, companies, lexical)
+        
+        if removed_ids and old.vectorstore is not None and old.vectorstore.docstore is vectorstore.docstore:
+            # Shared (SQLite) docstore: in-flight queries on `old` still need these documents
+            self._orphans.update(dict.fromkeys(removed_ids, self._snapshot.version))
+        old.retire(on_release=self._delete_orphans)
+        self._retired = [snapshot for snapshot in self._retired + [old] if snapshot.in_use()]
+        self._delete_orphans()
+    
+    def _on_published(self, version: int) -> None:
+        """Called (from the compactor) once a base of `version` is published"""
+        with self._published_lock:
+            self._published.append((time.monotonic() + settings.DOCSTORE_PURGE_DELAY, version))
+            self._published_at = time.monotonic()
+    
+    def _deletable_version(self) -> int:
+        """
+        Newest version that is saved and, with reader workers, published
+        long enough ago for them to have moved to it
+        """
+        if settings.SERVE_MODE != "writer":
+            return self._saved_version  # no other process reads the docstore
+        now = time.monotonic()
+        with self._published_lock:
+            ready = [version for deadline, version in self._published if deadline <= now]
+            self._published = [entry for entry in self._published if entry[0] > now]
+            self._purgeable_version = max([self._purgeable_version] + ready)
+        return min(self._purgeable_version, self._saved_version)
+    
+    def _delete_orphans(self) -> None:
+        """
+        Delete documents of removed chunks once their removal is saved and no
+        older snapshot is being read: in this process, and in reader workers,
+        which keep serving the previous published base until they pick up one
+        without the chunks
+        """
+        if not self._orphans or not self._lock.acquire(blocking=False):
+            return  # a running write retries when it commits
+        try:
+            self._retired = [snapshot for snapshot in self._retired if snapshot.in_use()]
+            if self._retired:
+                return
+            current = self._snapshot
+            version = self._deletable_version()
+            ready = [chunk_id for chunk_id, removed in self._orphans.items() if removed <= version]
+            if not ready:
+                return
+            for chunk_id in ready:
+                del self._orphans[chunk_id]
+            # Ids re-added since (same text -> same id) are live again
+            ids = [chunk_id for chunk_id in ready if chunk_id not in current.positions]
+            if ids and current.vectorstore is not None:
+                current.vectorstore.docstore.delete(ids)
+        finally:
+            self._lock.release()
+    
+    def _working_copy(self) -> Tuple[FAISS, Dict[str, List[str]], Dict[str, dict], Optional[BM25Index]]:
+        """
+        Private copy of the current version for a writer to change. The FAISS
+        index is cloned, an O(n) copy per write: batch writes (upsert_tickers,
+        delete_tickers) rather than issuing one per chunk.
+        """
+        snapshot = self._snapshot
+        return (
+            copy_vectorstore(snapshot.vectorstore),
+            {ticker: list(ids) for ticker, ids in snapshot.ticker_ids.items()},
+            {ticker: dict(company) for ticker, company in snapshot.companies.items()},
+            snapshot.lexical.copy() if snapshot.lexical is not None else None
+        )
+    
+    # ---------- writes ----------
+    
+    def create_vectorstore(self, documents: List[Document], ids: List[str] = None) -> FAISS:
         """Create new vector store from documents"""
+        self._check_writable()
         print(f"Creating vector store with {len(documents)} documents...")
         
-        self.vectorstore = FAISS.from_documents(
-            documents=documents,
-            embedding=self.embedding_manager.get_model()
-        )
+        with self._lock:
+            inner_product = settings.FAISS_METRIC == "ip"
+            texts = [doc.page_content for doc in documents]
+            vectors = self.embedding_manager.embed_documents_cached(texts)
+            if inner_product:
+                vectors = normalize_rows(vectors)
+            
+            vectorstore = FAISS.from_embeddings(
+                text_embeddings=list(zip(texts, vectors)),
+                embedding=self.embedding_manager.get_model(),
+                metadatas=[doc.metadata for doc in documents],
+                ids=ids,
+                docstore=self._new_docstore(),
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT if inner_product else DistanceStrategy.EUCLIDEAN_DISTANCE
+            )
+            maybe_upgrade_index(vectorstore)
+            positions = vectorstore.index_to_docstore_id
+            lexical = self._build_lexical(vectorstore, texts={positions[i]: text for i, text in enumerate(texts)})
+            self._commit(vectorstore, *self._build_registry(vectorstore), lexical)
+            self._reset_pending(needs_base=True)
+            
+            if isinstance(vectorstore.docstore, SQLiteDocstore):
+                # Documents of the store this one replaces (its base may still be
+                # served) go the way of removed chunks: once this one is saved
+                live = set(positions.values())
+                stale = [chunk_id for chunk_id in vectorstore.docstore.ids() if chunk_id not in live]
+                self._orphans.update(dict.fromkeys(stale, self._snapshot.version))
         
         print("✓ Vector store created")
-        return self.vectorstore
+        return vectorstore
     
-    def add_documents(self, documents: List[Document]) -> None:
+    def _new_docstore(self):
+        """Docstore for a new store (emptied only if no saved or published base uses it)"""
+        if settings.DOCSTORE_BACKEND == "sqlite":
+            docstore = SQLiteDocstore(self.log.docstore_path)
+            if self.log.read_manifest() is None and self.log.read_published() is None:
+                docstore.clear()
+            return docstore
+        return InMemoryDocstore()
+    
+    def add_documents(self, documents: List[Document], ids: List[str] = None) -> None:
         """Add documents to existing vector store"""
-        if not self.vectorstore:
-            raise ValueError("Vector store not initialized")
-        
+        self._check_writable()
+        with self._lock:
+            if not self.vectorstore:
+                raise ValueError("Vector store not initialized")
+            
+            vectorstore, ticker_ids, companies, lexical = self._working_copy()
+            self._add_to(vectorstore, ticker_ids, companies, lexical, documents, ids)
+            self._commit(vectorstore, ticker_ids, companies, lexical)
+    
+    def _add_to(self, vectorstore: FAISS, ticker_ids: Dict[str, List[str]], companies: Dict[str, dict],
+                lexical: Optional[BM25Index], documents: List[Document], ids: List[str] = None) -> None:
         print(f"Adding {len(documents)} documents...")
-        self.vectorstore.add_documents(documents)
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embedding_manager.embed_documents_cached(texts)
+        if is_inner_product(vectorstore):
+            vectors = normalize_rows(vectors)
+        added = add_vectors(
+            vectorstore,
+            list(zip(texts, vectors)),
+            metadatas=[doc.metadata for doc in documents],
+            ids=ids
+        )
+        for chunk_id, text, doc, vector in zip(added, texts, documents, vectors):
+            self._register(ticker_ids, companies, chunk_id, doc.metadata)
+            self._pending_adds[chunk_id] = (chunk_id, text, doc.metadata, vector)
+            if lexical is not None:
+                lexical.add(chunk_id, text)
+        if maybe_upgrade_index(vectorstore):
+            # Segments only carry vectors, so a new index type needs a new base
+            self._needs_base = True
         print("✓ Documents added")
     
-    def save(self) -> None:
-        """Save vector store to disk"""
-        if not self.vectorstore:
-            raise ValueError("Vector store not initialized")
+    def upsert_ticker(self, ticker: str, documents: List[Document]) -> List[str]:
+        """Replace all chunks of a ticker with these documents"""
+        return self.upsert_tickers({ticker: documents})[ticker]
+    
+    def upsert_tickers(self, documents_by_ticker: Dict[str, List[Document]]) -> Dict[str, List[str]]:
+        """Replace chunks for several tickers with one embedding batch, one FAISS add and one swap"""
+        self._check_writable()
+        ids_by_ticker = {
+            ticker: [make_chunk_id(ticker, i, doc.page_content) for i, doc in enumerate(documents)]
+            for ticker, documents in documents_by_ticker.items()
+        }
+        documents = [doc for docs in documents_by_ticker.values() for doc in docs]
+        ids = [chunk_id for chunk_ids in ids_by_ticker.values() for chunk_id in chunk_ids]
+        
+        with self._lock:
+            if self.vectorstore is None:
+                self.create_vectorstore(documents, ids=ids)
+            else:
+                vectorstore, ticker_ids, companies, lexical = self._working_copy()
+                removed = self._delete_from(vectorstore, ticker_ids, companies, lexical, list(documents_by_ticker))
+                self._add_to(vectorstore, ticker_ids, companies, lexical, documents, ids)
+                self._commit(vectorstore, ticker_ids, companies, lexical, removed_ids=removed)
+        return ids_by_ticker
+    
+    def delete_ticker(self, ticker: str) -> int:
+        """Remove a ticker's chunks; the FAISS index is compacted in place"""
+        return self.delete_tickers([ticker])
+    
+    def delete_tickers(self, tickers: List[str]) -> int:
+        """Remove chunks for several tickers in one compaction"""
+        self._check_writable()
+        with self._lock:
+            if self.vectorstore is None:
+                return 0
+            if not any(ticker in self._snapshot.ticker_ids for ticker in tickers):
+                return 0
+            
+            vectorstore, ticker_ids, companies, lexical = self._working_copy()
+            removed = self._delete_from(vectorstore, ticker_ids, companies, lexical, tickers)
+            self._commit(vectorstore, ticker_ids, companies, lexical, removed_ids=removed)
+            return len(removed)
+    
+    def _delete_from(self, vectorstore: FAISS, ticker_ids: Dict[str, List[str]], companies: Dict[str, dict],
+                     lexical: Optional[BM25Index], tickers: List[str]) -> List[str]:
+        ids = [chunk_id for ticker in tickers for chunk_id in ticker_ids.pop(ticker, [])]
+        for ticker in tickers:
+            companies.pop(ticker, None)
+        if ids:
+            # A shared SQLite docstore keeps the documents until older snapshots are released
+            remove_vectors(vectorstore, ids, delete_documents=not isinstance(vectorstore.docstore, SQLiteDocstore))
+            if lexical is not None:
+                lexical.remove(ids)
+            for chunk_id in ids:
+                self._pending_adds.pop(chunk_id, None)
+                self._pending_deletes[chunk_id] = None
+            print(f"✓ Removed {len(ids)} chunks for {', '.join(tickers)}")
+        return ids
+    
+    # ---------- registry ----------
+    
+    def get_tickers(self) -> List[str]:
+        """Tickers that have chunks in the store"""
+        return sorted(self._snapshot.ticker_ids)
+    
+    def get_companies(self) -> Dict[str, dict]:
+        """ticker -> company, sector, industry and report date"""
+        return self._snapshot.companies
+    
+    @staticmethod
+    def _register(ticker_ids: Dict[str, List[str]], companies: Dict[str, dict],
+                  chunk_id: str, metadata: dict) -> None:
+        """Record a chunk in the ticker and company registries"""
+        ticker = chunk_ticker(metadata)
+        if not ticker:
+            return
+        ticker_ids.setdefault(ticker, []).append(chunk_id)
+        company = companies.setdefault(ticker, {})
+        for key in COMPANY_FIELDS:
+            if metadata.get(key) and not company.get(key):
+                company[key] = metadata[key]
+    
+    def _build_registry(self, vectorstore: FAISS) -> Tuple[Dict[str, List[str]], Dict[str, dict]]:
+        """ticker -> chunk ids and company maps for a freshly built or loaded store"""
+        ticker_ids, companies = {}, {}
+        metadata = self._all_metadata(vectorstore)
+        dangling = []
+        for position in sorted(vectorstore.index_to_docstore_id):
+            chunk_id = vectorstore.index_to_docstore_id[position]
+            if chunk_id not in metadata:
+                dangling.append(chunk_id)
+                continue
+            self._register(ticker_ids, companies, chunk_id, metadata[chunk_id])
         
-        self.store_path.mkdir(parents=True, exist_ok=True)
-        self.vectorstore.save_local(str(self.store_path))
-        print(f"✓ Saved to: {self.store_path}")
+        # Vectors whose documents were deleted before the index delta was saved
+        # (a read-only snapshot just skips them at search time)
+        if dangling and not self.read_only:
+            remove_vectors(vectorstore, dangling)
+            print(f"⚠ Dropped {len(dangling)} vectors without documents")
+        return ticker_ids, companies
+    
+    @staticmethod
+    def _all_metadata(vectorstore: FAISS) -> Dict[str, dict]:
+        """chunk id -> metadata, without materializing chunk text where possible"""
+        docstore = vectorstore.docstore
+        if isinstance(docstore, SQLiteDocstore):
+            return dict(docstore.iter_metadata())
+        return {chunk_id: doc.metadata for chunk_id, doc in docstore._dict.items()}
+    
+    def _build_lexical(self, vectorstore: FAISS, lexical: BM25Index = None,
+                       texts: Dict[str, str] = None) -> Optional[BM25Index]:
+        """
+        BM25 index covering exactly the store's chunks: `lexical` (e.g. the
+        one saved with the base) brought up to date, or one built from scratch.
+        Missing chunks are read from `texts` or the docstore.
+        """
+        if not settings.HYBRID_SEARCH:
+            return None
+        lexical = lexical if lexical is not None else BM25Index()
+        live = set(vectorstore.index_to_docstore_id.values())
+        lexical.remove([chunk_id for chunk_id in lexical.ids() if chunk_id not in live])
+        
+        missing = [chunk_id for chunk_id in live if chunk_id not in lexical]
+        if missing:
+            if texts is None:
+                texts = {chunk_id: doc.page_content for chunk_id, doc in self._get_documents(vectorstore, missing).items()}
+            for chunk_id in missing:
+                if chunk_id in texts:
+                    lexical.add(chunk_id, texts[chunk_id])
+        return lexical
+    
+    # ---------- persistence ----------
+    
+    def save(self) -> None:
+        """Persist changes since the last save (a full snapshot only when needed)"""
+        self._check_writable()
+        with self._lock:
+            # Published snapshots are never modified, so they can be written as-is
+            snapshot = self._snapshot
+            vectorstore = snapshot.vectorstore
+            if not vectorstore:
+                raise ValueError("Vector store not initialized")
+            
+            self.store_path.mkdir(parents=True, exist_ok=True)
+            
+            if self._needs_base or self.log.read_manifest() is None:
+                self.log.write_base(vectorstore, snapshot.lexical)
+                self._on_published(snapshot.version)
+                print(f"✓ Saved snapshot to: {self.store_path}")
+            elif self.has_pending_changes():
+                self.log.append_segment(list(self._pending_adds.values()), list(self._pending_deletes))
+                print(f"✓ Saved {len(self._pending_adds)} added / {len(self._pending_deletes)} deleted chunks to: {self.store_path}")
+            else:
+                print("✓ Nothing to save")
+            self._reset_pending()
+            self._saved_version = snapshot.version
+            self._saved_snapshot = snapshot
+            # Removals are final now (and earlier ones may be past their grace period)
+            self._delete_orphans()
+            
+            # Fold segments into a new base once enough have piled up. Reader
+            # workers only see bases, so a writer serving them also publishes
+            # once saved changes are SNAPSHOT_MAX_STALENESS old: saves stay
+            # small deltas and the full rewrite happens at most that often
+            segments = self.log.segment_count()
+            if segments >= settings.VECTORSTORE_COMPACT_SEGMENTS:
+                self._compact_saved()
+            elif segments and settings.SERVE_MODE == "writer":
+                if time.monotonic() - self._published_at >= settings.SNAPSHOT_MAX_STALENESS:
+                    self._compact_saved()
+                else:
+                    self._schedule_publish()
+    
+    def _compact_saved(self) -> None:
+        """Compact the saved segments into a new (published) base, in the background"""
+        snapshot = self._saved_snapshot
+        if snapshot is None or not self.log.segment_count():
+            return
+        if settings.SERVE_MODE == "writer":
+            self.log.wait()  # a running compaction would not cover the newest segments
+            self._published_at = time.monotonic()  # staleness counts from the start of this publish
+        self.log.compact_in_background(
+            snapshot.vectorstore, snapshot.lexical, on_publish=lambda: self._on_published(snapshot.version)
+        )
+    
+    def _schedule_publish(self) -> None:
+        """Publish the saved segments when they reach SNAPSHOT_MAX_STALENESS, even if no other save comes"""
+        if self._publish_timer is not None and self._publish_timer.is_alive():
+            return
+        delay = max(0.0, self._published_at + settings.SNAPSHOT_MAX_STALENESS - time.monotonic())
+        self._publish_timer = threading.Timer(delay, self._publish_saved)
+        self._publish_timer.daemon = True
+        self._publish_timer.start()
+    
+    def _publish_saved(self) -> None:
+        with self._lock:
+            self._compact_saved()
     
     def load(self) -> FAISS:
-        """Load vector store from disk"""
+        """Load vector store from disk (queries keep using the current version until the swap)"""
         print(f"Loading from: {self.store_path}")
         
-        self.vectorstore = FAISS.load_local(
-            str(self.store_path),
-            self.embedding_manager.get_model(),
-            allow_dangerous_deserialization=True
-        )
+        with self._lock:
+            if self.read_only:
+                vectorstore, version = self.log.load_published(self.embedding_manager.get_model())
+                lexical = self._build_lexical(vectorstore, self.log.load_lexical(published=True))
+                self._commit(vectorstore, *self._build_registry(vectorstore), lexical)
+                self.loaded_version = version
+                print(f"✓ Vector store loaded (read-only, version {version})")
+                return vectorstore
+            
+            vectorstore = self.log.load(self.embedding_manager.get_model())
+            upgraded = maybe_upgrade_index(vectorstore)
+            registry = self._build_registry(vectorstore)
+            # Segments saved after the base are reconciled from the docstore
+            self._commit(vectorstore, *registry, self._build_lexical(vectorstore, self.log.load_lexical()))
+            self._saved_version = self._snapshot.version
+            self._saved_snapshot = self._snapshot
+            self._drop_unsaved_documents(vectorstore)
+            if settings.SERVE_MODE == "writer" and self.log.segment_count():
+                self._schedule_publish()  # saved before a restart, never published
+            self.loaded_version = self.log.version()
+            if settings.DOCSTORE_BACKEND == "sqlite" and not isinstance(vectorstore.docstore, SQLiteDocstore):
+                print(f"⚠ Pickled docstore in use; run: python -m src.vectorstore.migrate {self.store_name}")
+            self._reset_pending(needs_base=upgraded)
         
         print("✓ Vector store loaded")
-        return self.vectorstore
+        return vectorstore
     
-    def similarity_search(self, query: str, k: int = None) -> List[Document]:
-        """Search for similar documents"""
+    def _drop_unsaved_documents(self, vectorstore: FAISS) -> None:
+        """
+        Delete docstore rows written by adds that were never saved (the
+        process stopped before save): no saved or published version has them
+        """
+        if not isinstance(vectorstore.docstore, SQLiteDocstore):
+            return
+        referenced = set(vectorstore.index_to_docstore_id.values()) | set(self.log.published_ids())
+        unsaved = [chunk_id for chunk_id in vectorstore.docstore.ids() if chunk_id not in referenced]
+        if unsaved:
+            vectorstore.docstore.delete(unsaved)
+            print(f"⚠ Dropped {len(unsaved)} documents of unsaved changes")
+    
+    def has_pending_changes(self) -> bool:
+        """Whether there are changes not yet saved"""
+        if self.read_only:
+            return False
+        return self._needs_base or bool(self._pending_adds or self._pending_deletes)
+    
+    def close(self) -> None:
+        """Flush unsaved changes, publish them to reader workers and wait for compaction"""
+        with self._lock:
+            if self.vectorstore is not None and self.has_pending_changes():
+                self.save()
+            if self._publish_timer is not None:
+                self._publish_timer.cancel()
+            if settings.SERVE_MODE == "writer":
+                self._compact_saved()
+        self.log.wait()
+    
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise ValueError("Vector store is read-only in this worker; send writes to the writer process")
+    
+    def _reset_pending(self, needs_base: bool = False) -> None:
+        self._pending_adds = {}
+        self._pending_deletes = {}
+        self._needs_base = needs_base
+    
+    # ---------- search ----------
+    
+    def search(self, query: str, k: int = None, nprobe: int = None, ef_search: int = None,
+               search_filter: SearchFilter = None, mode: str = None) -> RetrievalResult:
+        """Embed the query once and run one FAISS (+ BM25) search"""
         if not self.vectorstore:
             raise ValueError("Vector store not initialized")
         
         k = k or settings.DEFAULT_TOP_K
-        return self.vectorstore.similarity_search(query, k=k)
+        # (1, dim) view over the cached vector - no copy on the way into FAISS
+        vector = self.embedding_manager.embed_query_vector(query)[np.newaxis, :]
+        return self.search_by_vector(query, vector, k, nprobe=nprobe, ef_search=ef_search,
+                                     search_filter=search_filter, mode=mode)
+    
+    def search_by_vector(self, query: str, vector: np.ndarray, k: int,
+                         nprobe: int = None, ef_search: int = None,
+                         search_filter: SearchFilter = None, mode: str = None) -> RetrievalResult:
+        """
+        Search with a precomputed (1, dim) float32 query vector.
+        nprobe (IVF) and ef_search (HNSW) override the Settings defaults;
+        search_filter restricts the search to matching companies' chunks;
+        mode is one of SEARCH_MODES (default: search_mode(query)).
+        """
+        return self.search_by_vectors(
+            [query], vector, k, nprobe=nprobe, ef_search=ef_search, search_filters=[search_filter], modes=[mode]
+        )[0]
+    
+    def search_by_vectors(self, queries: List[str], vectors: np.ndarray, k: int,
+                          nprobe: int = None, ef_search: int = None,
+                          search_filters: List[Optional[SearchFilter]] = None,
+                          modes: List[Optional[str]] = None) -> List[RetrievalResult]:
+        """
+        Search a (n, dim) matrix of query vectors, one filter (or None) and
+        one mode (or None) per row. Rows sharing a filter go through FAISS
+        as one matrix search.
+        """
+        modes = [mode or self.search_mode(query) for query, mode in zip(queries, modes or [None] * len(queries))]
+        for mode in modes:
+            if mode not in SEARCH_MODES:
+                raise ValueError(f"Unknown search mode {mode!r} (expected one of {', '.join(SEARCH_MODES)})")
+        with self.reading() as snapshot:
+            return self._search_snapshot(snapshot, queries, vectors, k, nprobe, ef_search, search_filters, modes)
+    
+    @staticmethod
+    def search_mode(query: str) -> str:
+        """hybrid (vector + BM25), lexical for bare keyword queries, or vector when hybrid search is off"""
+        if not settings.HYBRID_SEARCH:
+            return "vector"
+        return "lexical" if is_keyword_query(query) else "hybrid"
+    
+    def _search_snapshot(self, snapshot: StoreSnapshot, queries: List[str], vectors: np.ndarray, k: int,
+                         nprobe: Optional[int], ef_search: Optional[int],
+                         search_filters: Optional[List[Optional[SearchFilter]]],
+                         modes: List[str]) -> List[RetrievalResult]:
+        vectorstore = snapshot.vectorstore
+        inner_product = is_inner_product(vectorstore)
+        if inner_product or vectorstore._normalize_L2:
+            vectors = normalize_rows(vectors)
+        
+        results = [RetrievalResult(query=query, query_vector=vectors[row]) for row, query in enumerate(queries)]
+        search_filters = search_filters or [None] * len(queries)
+        
+        # BM25 needs the snapshot's lexical index; keyword-only search needs every term in it
+        lexical = snapshot.lexical
+        modes = [
+            "vector" if lexical is None else
+            "hybrid" if mode == "lexical" and not lexical.has_terms(query) else mode
+            for query, mode in zip(queries, modes)
+        ]
+        
+        groups: Dict[Optional[tuple], List[int]] = {}
+        for row, search_filter in enumerate(search_filters):
+            key = None if search_filter is None or search_filter.is_empty() else search_filter.key()
+            groups.setdefault(key, []).append(row)
+        
+        hits: Dict[int, List[Tuple[float, str]]] = {}
+        for key, rows in groups.items():
+            selector, allowed = None, None
+            if key is not None:
+                positions = self.filter_positions(search_filters[rows[0]], snapshot)
+                if not len(positions):
+                    continue  # nothing matches: empty results
+                if len(positions) < vectorstore.index.ntotal:
+                    selector = id_selector(positions)
+                    allowed = {vectorstore.index_to_docstore_id[position] for position in positions.tolist()}
+            elif len(snapshot.deleted):
+                selector = exclude_selector(snapshot.deleted)
+            
+            # Fusion re-ranks a deeper candidate list than the k it returns
+            fused = any(modes[row] != "vector" for row in rows)
+            fetch = max(k, settings.HYBRID_CANDIDATES) if fused else k
+            
+            params = search_params(vectorstore.index, nprobe=nprobe, ef_search=ef_search, selector=selector)
+            distances, indices = vectorstore.index.search(vectors[rows], fetch, params=params)
+            for row, row_distances, row_indices in zip(rows, distances, indices):
+                candidates = [
+                    (float(distance), vectorstore.index_to_docstore_id[position])
+                    for distance, position in zip(row_distances, row_indices)
+                    if position != -1  # fewer than k vectors in the index
+                ]
+                if modes[row] == "vector":
+                    hits[row] = candidates[:k]
+                else:
+                    hits[row] = self._fuse(snapshot, queries[row], vectors[row], candidates, k,
+                                           modes[row], allowed, inner_product)
+        
+        # Only the top-k hits are materialized, in one docstore read
+        docs = self._get_documents(
+            vectorstore, list({chunk_id for row_hits in hits.values() for _, chunk_id in row_hits})
+        )
+        
+        for row, row_hits in hits.items():
+            result = results[row]
+            for distance, chunk_id in row_hits:
+                doc = docs.get(chunk_id)
+                if doc is None:
+                    continue
+                result.documents.append(doc)
+                result.distances.append(distance)
+                result.similarities.append(distance_to_similarity(distance, inner_product))
+                result.chunk_ids.append(chunk_id)
+        return results
+    
+    @staticmethod
+    def _fuse(snapshot: StoreSnapshot, query: str, vector: np.ndarray, candidates: List[Tuple[float, str]],
+              k: int, mode: str, allowed: Optional[set], inner_product: bool) -> List[Tuple[float, str]]:
+        """Top-k (distance, chunk id) by reciprocal rank fusion of the vector and BM25 rankings (or BM25 alone)"""
+        keyword_ids = [chunk_id for chunk_id, _ in snapshot.lexical.search(query, settings.HYBRID_CANDIDATES, allowed)]
+        if mode == "lexical" and keyword_ids:
+            # Keyword hits first, topped up with the nearest vectors
+            ranked = list(dict.fromkeys(keyword_ids + [chunk_id for _, chunk_id in candidates]))[:k]
+        else:
+            ranked = reciprocal_rank_fusion([[chunk_id for _, chunk_id in candidates], keyword_ids])[:k]
+        
+        # Chunks only BM25 found still need a vector score (similarity/confidence)
+        scores = {chunk_id: distance for distance, chunk_id in candidates}
+        missing = [chunk_id for chunk_id in ranked if chunk_id not in scores]
+        if missing:
+            exact = distances_to(
+                snapshot.vectorstore.index, vector, [snapshot.positions[chunk_id] for chunk_id in missing], inner_product
+            )
+            if exact is not None:
+                scores.update(zip(missing, exact.tolist()))
+            else:
+                # Not among the vector candidates, so no closer than the last of them
+                bound = candidates[-1][0] if candidates else (0.0 if inner_product else 2.0)
+                scores.update(dict.fromkeys(missing, bound))
+        return [(scores[chunk_id], chunk_id) for chunk_id in ranked]
+    
+    def filter_positions(self, search_filter: SearchFilter, snapshot: StoreSnapshot = None) -> np.ndarray:
+        """FAISS positions of the chunks whose company passes the filter"""
+        snapshot = snapshot or self._snapshot
+        tickers = [
+            ticker for ticker in snapshot.ticker_ids
+            if search_filter.matches(ticker, snapshot.companies.get(ticker, {}))
+        ]
+        return np.array(
+            [snapshot.positions[chunk_id] for ticker in tickers for chunk_id in snapshot.ticker_ids[ticker]
+             if chunk_id in snapshot.positions],
+            dtype=np.int64
+        )
+    
+    @staticmethod
+    def _get_documents(vectorstore: FAISS, ids: List[str]) -> Dict[str, Document]:
+        if isinstance(vectorstore.docstore, SQLiteDocstore):
+            return vectorstore.docstore.mget(ids)
+        docs = {}
+        for chunk_id in ids:
+            doc = vectorstore.docstore.search(chunk_id)
+            if isinstance(doc, Document):
+                docs[chunk_id] = doc
+        return docs
+    
+    def similarity_search(self, query: str, k: int = None) -> List[Document]:
+        """Search for similar documents"""
+        return self.search(query, k=k).documents
     
     def similarity_search_with_score(self, query: str, k: int = None) -> List[Tuple[Document, float]]:
         """Search with similarity scores"""
-        if not self.vectorstore:
-            raise ValueError("Vector store not initialized")
-        
-        k = k or settings.DEFAULT_TOP_K
-        return self.vectorstore.similarity_search_with_score(query, k=k)
+        return self.search(query, k=k).with_scores()
+    
+    def get_index_info(self) -> Dict:
+        """Index type, metric, size and snapshot version"""
+        snapshot = self._snapshot
+        if not snapshot.vectorstore:
+            return {'index_type': None, 'metric': None, 'count': 0, 'soft_deleted': 0, 'version': snapshot.version,
+                    'lexical_terms': 0}
+        return {
+            'index_type': index_kind(snapshot.vectorstore.index),
+            'metric': 'ip' if is_inner_product(snapshot.vectorstore) else 'l2',
+            'count': len(snapshot.positions),
+            'soft_deleted': len(snapshot.deleted),
+            'version': snapshot.version,
+            'lexical_terms': len(snapshot.lexical.postings) if snapshot.lexical is not None else 0
+        }
     
     def get_count(self) -> int:
         """Get number of documents"""
-        if not self.vectorstore:
+        vectorstore = self.vectorstore
+        if not vectorstore:
             return 0
-        return self.vectorstore.index.ntotal
\ No newline at end of file
+        return len(vectorstore.index_to_docstore_id)
@@ -4,10 +4,13 @@ Page to add companies to the system
 """
 import streamlit as st
 import time
-from utils import check_api_health, add_company, add_multiple_companies, get_companies
+from utils import check_api_health, add_company, add_multiple_companies, get_companies, get_job
 
 st.set_page_config(page_title="Add Companies", page_icon="📊", layout="wide")
 
+JOB_POLL_INTERVAL = 2  # seconds between job progress checks
+JOB_TIMEOUT = 30 * 60  # stop watching a job after this many seconds
+
 # Header
 st.title("📊 Add Companies")
 st.write("Ingest stock data from Yahoo Finance into the RAG system")
@@ -91,13 +94,41 @@ with tab2:
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            with st.spinner(f"Processing {len(tickers)} companies..."):
-                result = add_multiple_companies(tickers)
+            # Ingestion runs as a background job on the API; poll its progress
+            job = add_multiple_companies(tickers)
+            result = job
+            
+            error = None
+            if job.get("job_id"):
+                deadline = time.time() + JOB_TIMEOUT
+                while True:
+                    result = get_job(job["job_id"])
+                    if result.get("error") or result.get("detail"):
+                        error = result.get("message") or result.get("detail")
+                        break
+                    if result.get("status") == "completed":
+                        break
+                    if time.time() > deadline:
+                        error = f"Job {job['job_id']} still running after {JOB_TIMEOUT // 60} minutes; check the Current Companies tab later"
+                        break
+                    
+                    finished = result.get("success_count", 0) + result.get("failed_count", 0)
+                    total = result.get("total", len(tickers)) or 1
+                    running = [t["ticker"] for t in result.get("tickers", []) if t["status"] == "running"]
+                    progress_bar.progress(int(100 * finished / total))
+                    status_text.text(f"Processed {finished}/{total}" + (f" - running: {', '.join(running)}" if running else ""))
+                    time.sleep(JOB_POLL_INTERVAL)
+            elif job.get("detail") or job.get("success") is False:
+                error = job.get("detail") or job.get("message", "Unknown error")
             
-            progress_bar.progress(100)
+            status_text.empty()
             
             # Show results
-            st.success(f"✅ Completed!")
+            if error:
+                st.error(f"❌ {error}")
+            else:
+                progress_bar.progress(100)
+                st.success(f"✅ Completed!")
             
             col1, col2 = st.columns(2)
             
@@ -4,7 +4,7 @@ Page to ask questions to the RAG system
 """
 import streamlit as st
 import time
-from utils import check_api_health, ask_question, get_companies
+from utils import check_api_health, ask_question_stream, get_companies
 
 st.set_page_config(page_title="Ask Questions", page_icon="💬", layout="wide")
 
@@ -71,44 +71,75 @@ with col2:
     ask_btn = st.button("🚀 Ask Question", type="primary", use_container_width=True)
 
 # Process question
+def render_answer(box, text: str):
+    """Render (partial) answer text in the answer box"""
+    box.markdown(f"""
+        <div style="padding:1.5rem; background-color:#f0f8ff; border-left:4px solid #1f77b4; border-radius:0.5rem; margin:1rem 0;">
+            <p style="font-size:1.1rem; margin:0;">{text}</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+
 if ask_btn and question:
     
-    with st.spinner("🤔 Thinking..."):
-        start_time = time.time()
-        result = ask_question(question, num_results)
-        elapsed_time = time.time() - start_time
+    start_time = time.time()
+    result = {"answer": "", "sources": [], "confidence": 0.0, "num_docs": 0}
     
-    if result.get("error"):
-        st.error(f"❌ Error: {result.get('message')}")
-    else:
-        # Success - show answer
-        st.markdown("---")
-        st.markdown("### 💡 Answer")
+    st.markdown("---")
+    st.markdown("### 💡 Answer")
+    
+    status_box = st.empty()
+    status_box.info("🤔 Thinking...")
+    answer_box = st.empty()
+    metrics_box = st.empty()
+    sources_box = st.empty()
+    
+    # Sources arrive first, then answer tokens as the LLM writes them
+    for event in ask_question_stream(question, num_results):
+        data = event["data"]
         
-        # Answer box
-        st.markdown(f"""
-            <div style="padding:1.5rem; background-color:#f0f8ff; border-left:4px solid #1f77b4; border-radius:0.5rem; margin:1rem 0;">
-                <p style="font-size:1.1rem; margin:0;">{result['answer']}</p>
-            </div>
-        """, unsafe_allow_html=True)
+        if event["event"] == "meta":
+            status_box.empty()
+            result.update(data)
+            with sources_box.container():
+                st.markdown("### 📚 Sources")
+                for source in result['sources']:
+                    st.markdown(f"- 📄 {source}")
         
-        # Metadata
-        col1, col2, col3 = st.columns(3)
+        elif event["event"] == "token":
+            result["answer"] += data["text"]
+            render_answer(answer_box, result["answer"] + " ▌")
         
-        with col1:
-            confidence_pct = result['confidence'] * 100
-            st.metric("Confidence", f"{confidence_pct:.0f}%")
-        
-        with col2:
-            st.metric("Response Time", f"{result['response_time']:.2f}s")
+        elif event["event"] == "done":
+            result["answer"] = data.get("answer", result["answer"])
+            result["response_time"] = data.get("response_time", time.time() - start_time)
         
-        with col3:
-            st.metric("Sources Used", result['num_docs'])
+        elif event["event"] == "error":
+            result = {"error": True, "message": data.get("detail", "Unknown error")}
+            break
+    
+    status_box.empty()
+    
+    if result.get("error"):
+        answer_box.empty()
+        st.error(f"❌ Error: {result.get('message')}")
+    else:
+        render_answer(answer_box, result["answer"])
         
-        # Sources
-        st.markdown("### 📚 Sources")
-        for source in result['sources']:
-            st.markdown(f"- 📄 {source}")
+        # Metadata
+        with metrics_box.container():
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                confidence_pct = result['confidence'] * 100
+                st.metric("Confidence", f"{confidence_pct:.0f}%")
+            
+            with col2:
+                response_time = result.get('response_time', time.time() - start_time)
+                st.metric("Response Time", f"{response_time:.2f}s")
+            
+            with col3:
+                st.metric("Sources Used", result['num_docs'])
         
         # Feedback
         st.markdown("---")
@@ -3,9 +3,10 @@
 Helper functions for Streamlit app
 Handles all API communication
 """
+import json
 import requests
 import streamlit as st
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 # API Base URL
 API_URL = "http://localhost:8000"
@@ -57,7 +58,7 @@ def add_company(ticker: str) -> Dict:
 
 
 def add_multiple_companies(tickers: List[str]) -> Dict:
-    """Add multiple companies"""
+    """Queue multiple companies for ingestion (returns a job id)"""
     try:
         response = requests.post(
             f"{API_URL}/ingest/multiple",
@@ -68,6 +69,21 @@ def add_multiple_companies(tickers: List[str]) -> Dict:
         return {"success": False, "message": str(e)}
 
 
+def get_job(job_id: str) -> Dict:
+    """Get ingestion job progress"""
+    try:
+        response = requests.get(f"{API_URL}/jobs/{job_id}", timeout=10)
+        if response.status_code == 200:
+            return response.json()
+        try:
+            detail = response.json().get("detail", "Unknown error")
+        except ValueError:
+            detail = f"HTTP {response.status_code}"
+        return {"error": True, "message": detail}
+    except Exception as e:
+        return {"error": True, "message": str(e)}
+
+
 def ask_question(question: str, num_results: int = 3) -> Dict:
     """Ask a question to the RAG system"""
     try:
@@ -87,4 +103,37 @@ def ask_question(question: str, num_results: int = 3) -> Dict:
                 "message": error_data.get("detail", "Unknown error")
             }
     except Exception as e:
-        return {"error": True, "message": str(e)}
\ No newline at end of file
+        return {"error": True, "message": str(e)}
+
+
+def ask_question_stream(question: str, num_results: int = 3) -> Iterator[Dict]:
+    """
+    Ask a question and yield Server-Sent Events as they arrive
+    
+    Each item is {"event": "meta" | "token" | "done" | "error", "data": {...}}
+    """
+    try:
+        with requests.post(
+            f"{API_URL}/ask/stream",
+            json={
+                "question": question,
+                "num_results": num_results
+            },
+            stream=True,
+            timeout=(5, 120)
+        ) as response:
+            if response.status_code != 200:
+                error_data = response.json()
+                yield {"event": "error", "data": {"detail": error_data.get("detail", "Unknown error")}}
+                return
+            
+            event = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    yield {"event": event, "data": json.loads(line[len("data:"):].strip())}
+    except Exception as e:
+        yield {"event": "error", "data": {"detail": str(e)}}
\ No newline at end of file
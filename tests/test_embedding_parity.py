@@ -0,0 +1,40 @@
+# tests/test_embedding_parity.py
+"""ONNX embedding backends must match the torch vectors (PARITY thresholds of benchmark_embeddings)"""
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+pytest.importorskip("langchain_huggingface")
+
+from benchmark_embeddings import PARITY, QUESTIONS, cosine, load_texts
+from src.config.settings import settings
+from src.embeddings.onnx_embeddings import OnnxEmbeddings
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return load_texts() + QUESTIONS
+
+
+@pytest.fixture(scope="module")
+def torch_vectors(texts):
+    from langchain_huggingface import HuggingFaceEmbeddings
+    try:
+        embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL, model_kwargs={'device': 'cpu'})
+    except Exception as e:
+        pytest.skip(f"{settings.EMBEDDING_MODEL} not available: {e}")
+    return np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+
+
+@pytest.mark.parametrize("variant", sorted(PARITY))
+def test_onnx_matches_torch(variant, texts, torch_vectors):
+    try:
+        embeddings = OnnxEmbeddings(settings.EMBEDDING_MODEL, settings.EMBEDDING_ONNX_DIR,
+                                    quantize=variant == "onnx-int8")
+    except Exception as e:
+        pytest.skip(f"ONNX export of {settings.EMBEDDING_MODEL} not available: {e}")
+    
+    similarity = cosine(torch_vectors, embeddings.embed_array(texts))
+    worst = int(similarity.argmin())
+    assert similarity.min() >= PARITY[variant], f"{variant}: cosine {similarity.min():.4f} on {texts[worst][:80]!r}"
@@ -0,0 +1,48 @@
+# tests/test_metric_router.py
+"""Direct metric lookups: what the router answers and what it leaves to RAG"""
+import pytest
+from src.retrieval.metric_router import MetricRouter
+
+router = MetricRouter(store=None)  # parse() never reads the store
+
+
+@pytest.mark.parametrize("question", [
+    "What is TCS's free cash flow?",
+    "INFY operating cash flow",
+    "What is the net debt of Reliance?",
+    "TCS profit before tax",
+    "HDFC Bank current assets",
+    "TCS revenue per employee",
+    "What is TCS's forward PE?",
+    "Infosys book value per share",
+    "TCS EBITDA margin",
+])
+def test_longer_metric_names_go_to_rag(question):
+    assert router.parse(question) is None
+
+
+@pytest.mark.parametrize("question, metric", [
+    ("What was TCS revenue?", "Revenue (TTM)"),
+    ("TCS net profit in Sep 2025", "Net Income"),
+    ("TCS profit after tax", "Net Income"),
+    ("What is the P/E ratio of TCS?", "P/E Ratio"),
+    ("TCS earnings per share", "EPS"),
+    ("TCS debt to equity", "Debt to Equity"),
+    ("TCS current ratio", "Current Ratio"),
+    ("TCS operating margin", "Operating Margin"),
+    ("How much debt does TCS have?", "Total Debt"),
+    ("TCS cash and cash equivalents", "Cash And Cash Equivalents"),
+])
+def test_single_metric_lookups(question, metric):
+    query = router.parse(question)
+    assert query is not None and query.metrics[0] == metric
+
+
+@pytest.mark.parametrize("question", [
+    "Compare TCS and Infosys revenue",
+    "Why did TCS net profit decline?",
+    "TCS revenue and net profit",
+    "TCS revenue in FY24",
+])
+def test_analytical_questions_go_to_rag(question):
+    assert router.parse(question) is None
@@ -0,0 +1,12 @@
+# tests/test_startup.py
+"""Import-time budget: the API must start without loading models, FAISS or LangChain integrations"""
+import pytest
+from check_startup import checks, probe
+
+
+@pytest.mark.parametrize("module", sorted(checks))
+def test_import_budget(module):
+    budget, forbidden = checks[module]
+    report = probe(module, forbidden)
+    assert not report["loaded"], f"{module} imports {', '.join(report['loaded'])} at startup"
+    assert report["elapsed"] <= budget, f"{module} took {report['elapsed']:.2f}s (budget {budget:.2f}s)"